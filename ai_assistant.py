@@ -3,15 +3,23 @@ AI Assistant Integration
 Supports: ChatGPT (OpenAI), Gemini (Google), Claude (Anthropic)
 """
 import os
+import time
 from config import AI_CONFIG
+from metrics import AI_REQUEST_SECONDS
 
 class AIAssistant:
     def __init__(self):
-        self.providers = {
-            'openai': OpenAIProvider(),
-            'gemini': GeminiProvider(),
-            'claude': ClaudeProvider()
+        self.provider_classes = {
+            'openai': OpenAIProvider,
+            'gemini': GeminiProvider,
+            'claude': ClaudeProvider
         }
+        self.providers = {}  # created on first use; SDKs are imported per request
+    
+    def _provider(self, name):
+        if name not in self.providers:
+            self.providers[name] = self.provider_classes[name]()
+        return self.providers[name]
         
     def get_available_providers(self):
         """Return list of enabled AI providers"""
@@ -30,13 +38,18 @@ class AIAssistant:
         Returns:
             (success, response, error)
         """
-        if provider not in self.providers:
+        if provider not in self.provider_classes:
             return False, None, f"Unknown provider: {provider}"
         
         if not AI_CONFIG[provider].get('enabled', False):
             return False, None, f"{provider} is not enabled. Check config.py"
         
-        return self.providers[provider].send_message(message, context)
+        started = time.perf_counter()
+        result = self._provider(provider).send_message(message, context)
+        AI_REQUEST_SECONDS.labels(provider=provider, success=str(bool(result[0])).lower()).observe(
+            time.perf_counter() - started
+        )
+        return result
     
     def explain_code(self, provider, code, language):
         """Ask AI to explain code"""
@@ -1,28 +1,167 @@
 """
 Main Flask Application
 """
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_socketio import SocketIO
 import subprocess
-import threading
 import os
-from config import SECRET_KEY, FLASK_PORT, TEMPLATE_DIR, STATIC_DIR
+import json
+import threading
+import time
+from config import (
+    SECRET_KEY, FLASK_PORT, TEMPLATE_DIR, STATIC_DIR, MAX_CONCURRENT_RUNS, BATCH_SERVER_SHARE,
+    TEST_CASE_PARALLELISM, TEST_CASE_MAX, TEST_CASE_MAX_TIME_LIMIT,
+    SERVER_ASYNC_MODE, SERVER_WORKERS, SERVER_MESSAGE_QUEUE, SYNTAX_CHECK_ENABLED
+)
 from compiler_handler import CompilerHandler
 from ai_assistant import ai_assistant
 from extensions_manager import extensions_manager
+from sessions import SessionManager
+from scheduler import ExecutionScheduler
+from warm_pool import WarmPool
+from output_stream import OutputPump
+from sandbox import Sandbox, rlimit_popen_kwargs
+from run_metrics import RunMetricsStore, wait_with_rusage
+from batch_runner import BatchRunner
+from case_runner import run_cases
+from languages import language_registry
+from toolchains import toolchains
+from startup import startup_profile
+from diagnostics import DiagnosticsService, ResyncNeeded
+from syntax_check import SyntaxChecker
+import metrics as prom
 from utils import resource_path
 
 app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
 app.config['SECRET_KEY'] = SECRET_KEY
-socketio = SocketIO(app, cors_allowed_origins="*")
+
+class InstrumentedSocketIO(SocketIO):
+    """SocketIO that counts emitted messages per event"""
+    
+    def emit(self, event, *args, **kwargs):
+        prom.SOCKETIO_EMITS.labels(event=event).inc()
+        return super().emit(event, *args, **kwargs)
+
+# async_mode is explicit: auto-detection would pick gevent/eventlet whenever
+# installed, even without the monkey patching server.py does first
+socketio = InstrumentedSocketIO(
+    app, cors_allowed_origins="*",
+    async_mode=SERVER_ASYNC_MODE,
+    message_queue=SERVER_MESSAGE_QUEUE
+)
 
 compiler = CompilerHandler()
-current_process = None
-process_lock = threading.Lock()
+
+def load_deferred():
+    """
+    Startup work kept off the path to the first page: extensions (and the
+    languages they add), then probing every compiler/interpreter
+    """
+    executables = language_registry.executables()
+    startup_profile.mark('extensions_loaded')
+    toolchains.start(executables)
+    toolchains.wait()
+    startup_profile.mark('toolchains_probed')
+
+threading.Thread(target=load_deferred, name='noc-deferred', daemon=True).start()
+sessions = SessionManager()
+run_metrics = RunMetricsStore()
+
+# Every server.py worker process has its own scheduler and batch pool: they
+# share the host's slots, and the batch pool's processes come out of the
+# scheduler's so a batch request cannot add load on top of interactive runs
+run_slots = max(1, MAX_CONCURRENT_RUNS // SERVER_WORKERS)
+batch_slots = max(1, int(run_slots * BATCH_SERVER_SHARE))
+batch_runner = BatchRunner(max_workers=batch_slots)
+
+def report_queue_position(job, position):
+    """Tell a client where its run sits in the queue (0 = started)"""
+    socketio.emit('queue_position', {
+        'run_id': job.run_id,
+        'position': position
+    }, to=job.sid)
+
+scheduler = ExecutionScheduler(
+    workers=max(1, run_slots - batch_slots),
+    on_position=report_queue_position
+)
+
+diagnostics = DiagnosticsService(
+    extensions_manager,
+    on_result=lambda sid, payload: socketio.emit('diagnostics', payload, to=sid),
+    checker=SyntaxChecker(compiler) if SYNTAX_CHECK_ENABLED else None
+)
+
+def build_popen_kwargs():
+    """Popen arguments shared by every executed program"""
+    startupinfo = None
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = 0
+        startupinfo.creationflags = subprocess.CREATE_NO_WINDOW
+    
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    env["PYTHONUNBUFFERED"] = "1"
+    
+    return {
+        'stdin': subprocess.PIPE,
+        'stdout': subprocess.PIPE,
+        'stderr': subprocess.PIPE,
+        'bufsize': 0,
+        'startupinfo': startupinfo,
+        'env': env
+    }
+
+warm_pool = WarmPool(build_popen_kwargs(), worker_kwargs=rlimit_popen_kwargs)
+
+# Scrape-time views of component state
+prom.CallbackMetric('noc_compile_cache_hits_total', 'Compile cache hits',
+                    lambda: compiler.cache.hits, type='counter')
+prom.CallbackMetric('noc_compile_cache_misses_total', 'Compile cache misses',
+                    lambda: compiler.cache.misses, type='counter')
+prom.CallbackMetric('noc_compile_cache_bytes', 'Compile cache size on disk',
+                    lambda: compiler.cache.total_bytes)
+prom.CallbackMetric('noc_pch_hits_total', 'C++ compiles that used a precompiled header',
+                    lambda: compiler.pch.hits, type='counter')
+prom.CallbackMetric('noc_pch_misses_total', 'C++ compiles whose include set had no precompiled header',
+                    lambda: compiler.pch.misses, type='counter')
+prom.CallbackMetric('noc_queue_depth', 'Runs waiting for a scheduler worker',
+                    lambda: scheduler.queued)
+prom.CallbackMetric('noc_running_jobs', 'Scheduler workers busy compiling or running',
+                    lambda: scheduler.running)
+prom.CallbackMetric('noc_rejected_runs_total', 'Runs rejected by admission control',
+                    lambda: scheduler.rejected, type='counter')
+prom.CallbackMetric('noc_sessions', 'Connected Socket.IO sessions',
+                    lambda: sessions.active_count())
+prom.CallbackMetric('noc_warm_pool_hits_total', 'Runs started on a warm interpreter',
+                    lambda: {(name,): data['warm_hits'] for name, data in warm_pool.stats()['interpreters'].items()},
+                    labelnames=['interpreter'], type='counter')
+
+def record_run(metrics, status):
+    """Publish a finished run to the Prometheus instruments"""
+    metrics.status = status
+    prom.RUNS_TOTAL.labels(language=metrics.language, status=status).inc()
+    if metrics.queue_wait_seconds is not None:
+        prom.QUEUE_WAIT_SECONDS.observe(metrics.queue_wait_seconds)
+    if metrics.compile_seconds is not None:
+        prom.COMPILE_SECONDS.labels(language=metrics.language).observe(metrics.compile_seconds)
+    if metrics.wall_seconds is not None:
+        prom.RUN_WALL_SECONDS.labels(language=metrics.language).observe(metrics.wall_seconds)
+    if metrics.stdout_bytes:
+        prom.OUTPUT_BYTES.labels(language=metrics.language, stream='stdout').inc(metrics.stdout_bytes)
+    if metrics.stderr_bytes:
+        prom.OUTPUT_BYTES.labels(language=metrics.language, stream='stderr').inc(metrics.stderr_bytes)
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    # Worker processes share the port without sticky sessions, so clients
+    # must not fall back to long-polling (each poll may reach another worker)
+    socketio_options = {'transports': ['websocket']} if SERVER_WORKERS > 1 else {}
+    return render_template('index.html', socketio_options=socketio_options,
+                           languages=language_registry.describe(),
+                           diagnostic_languages=diagnostics.languages())
 
 @app.route('/api/ai/chat', methods=['POST'])
 def ai_chat():
@@ -73,6 +212,32 @@ def ai_fix_error():
         'error': error
     })
 
+@app.route('/api/languages', methods=['GET'])
+def get_languages():
+    """Registered language backends and whether their toolchains are installed"""
+    return jsonify({'languages': language_registry.describe()})
+
+@app.route('/api/startup', methods=['GET'])
+def get_startup():
+    """When each launch phase finished (ms since the launcher started)"""
+    return jsonify(startup_profile.report())
+
+@app.route('/api/toolchains', methods=['GET'])
+def get_toolchains():
+    """Probed executables (path, version) and which languages can run; ?refresh=1 re-probes"""
+    if request.args.get('refresh'):
+        toolchains.start(language_registry.executables())
+        toolchains.wait()
+    languages = {}
+    for info in language_registry.describe():
+        backend = language_registry.get(info['name'])
+        languages[info['name']] = {
+            'available': info['available'],
+            'executable': backend.detect(),
+            'error': backend.missing_toolchain()
+        }
+    return jsonify({**toolchains.stats(), 'languages': languages})
+
 @app.route('/api/extensions', methods=['GET'])
 def get_extensions():
     """Get loaded extensions"""
@@ -81,140 +246,475 @@ def get_extensions():
         'extensions': [ext.get_info() for ext in exts.values()]
     })
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(prom.REGISTRY.expose(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/runs/metrics', methods=['GET'])
+def get_run_metrics():
+    """Recent per-run metrics and per-language averages"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        'runs': run_metrics.recent(limit),
+        'summary': run_metrics.summary()
+    })
+
+@app.route('/api/runs/<run_id>/metrics', methods=['GET'])
+def get_run_metrics_by_id(run_id):
+    """Metrics of a single run"""
+    metrics = run_metrics.get(run_id)
+    if metrics is None:
+        return jsonify({'error': 'Unknown run'}), 404
+    return jsonify(metrics.to_dict())
+
+@app.route('/api/warm_pool', methods=['GET'])
+def get_warm_pool_stats():
+    """Warm interpreter pool hit rate and timings"""
+    return jsonify(warm_pool.stats())
+
+@app.route('/api/diagnostics', methods=['GET'])
+def get_diagnostics_stats():
+    """Live diagnostics work done, per-line cache reuse and compiler check results"""
+    return jsonify(diagnostics.stats())
+
+@app.route('/api/sql/fixtures', methods=['GET'])
+def get_sql_fixtures():
+    """Fixture databases SQL runs can select with `-- fixture: name[@vN]`"""
+    return jsonify({'fixtures': compiler.fixtures.list()})
+
+@app.route('/api/java_daemon', methods=['GET'])
+def get_java_daemon_stats():
+    """Resident javac server state"""
+    return jsonify(compiler.javac_server.stats())
+
+@app.route('/api/batch', methods=['POST'])
+def run_batch():
+    """
+    Run many jobs in parallel: {"jobs": [{id, language, code, stdin, expected_output}, ...]}
+    Streams one JSON result per line (application/x-ndjson) as jobs finish
+    """
+    data = request.get_json(silent=True) or {}
+    jobs = data.get('jobs')
+    if not isinstance(jobs, list):
+        return jsonify({'error': "Expected a 'jobs' list"}), 400
+    
+    try:
+        results = batch_runner.run(jobs)
+        first = next(results, None)  # surfaces validation errors before streaming
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 413
+    
+    def generate():
+        if first is not None:
+            yield json.dumps(first) + '\n'
+        for result in results:
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@socketio.on('disconnect')
+def handle_disconnect(*args):
+    """Kill the client's processes and remove its workspaces"""
+    scheduler.cancel(request.sid)
+    sessions.close(request.sid)
+    diagnostics.close(request.sid)
+
 @socketio.on('run_code')
 def handle_run_code(data):
-    """Execute code"""
-    global current_process
+    """Queue code for execution"""
+    sid = request.sid
+    session = sessions.get(sid)
     
     code = data.get('code', '')
     language = data.get('language', 'python')
     
-    # Compile/prepare code
-    success, cmd, error = compiler.compile_and_run(code, language)
+    supersede_runs(session)
     
-    if not success:
-        socketio.emit('term_output', {'data': error})
-        socketio.emit('term_stop', {'data': '\n[Execution Failed]', 'success': False})
+    # Each run gets its own workspace so concurrent jobs never share files
+    run_id, workdir = session.new_run()
+    metrics = run_metrics.create(run_id, language)
+    
+    accepted, job, error = scheduler.submit(
+        sid, run_id,
+        lambda: execute_run(session, run_id, workdir, code, language, metrics)
+    )
+    
+    if not accepted:
+        record_run(metrics, 'rejected')
+        socketio.emit('term_output', {'data': error}, to=sid)
+        socketio.emit('term_stop', {'data': '\n[Execution Rejected]', 'success': False}, to=sid)
+        session.finish_run(run_id)
+
+def supersede_runs(session):
+    """A new run supersedes this session's queued and running jobs"""
+    for job in scheduler.cancel(session.sid):
+        mark_cancelled(job.run_id)
+        session.finish_run(job.run_id)
+    session.kill_running()
+
+def mark_cancelled(run_id):
+    metrics = run_metrics.get(run_id)
+    if metrics:
+        record_run(metrics, 'cancelled')
+
+def execute_run(session, run_id, workdir, code, language, metrics):
+    """Compile and run code on a scheduler worker (blocks until exit)"""
+    sid = session.sid
+    metrics.queue_wait_seconds = time.time() - metrics.created_at
+    metrics.status = 'compiling'
+    
+    def on_compiler_output(text):
+        socketio.emit('term_output', {'data': text}, to=sid)
+        socketio.sleep(0)
+    
+    # Compile/prepare code, streaming compiler output as it arrives
+    cancel_event = session.get_cancel_event(run_id)
+    build_metrics = {}
+    prepare_started = time.perf_counter()
+    success, cmd, error = compiler.compile_and_run(
+        code, language, workdir,
+        on_output=on_compiler_output,
+        cancel_event=cancel_event,
+        metrics=build_metrics
+    )
+    metrics.prepare_seconds = time.perf_counter() - prepare_started
+    metrics.compile_seconds = build_metrics.get('compile_seconds')
+    metrics.cache_hit = build_metrics.get('cache_hit')
+    
+    if not session.is_current(run_id):
+        # Superseded by a newer run while compiling
+        record_run(metrics, 'cancelled')
+        session.finish_run(run_id)
         return
     
-    # Setup subprocess
-    startupinfo = None
-    if os.name == 'nt':
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        startupinfo.wShowWindow = 0
-        startupinfo.creationflags = subprocess.CREATE_NO_WINDOW
+    if cancel_event.is_set():
+        record_run(metrics, 'cancelled')
+        socketio.emit('term_stop', {'data': '\n[Execution Cancelled]', 'success': False}, to=sid)
+        session.finish_run(run_id)
+        return
     
+    if not success:
+        record_run(metrics, 'compile_failed')
+        socketio.emit('term_output', {'data': error}, to=sid)
+        socketio.emit('term_stop', {'data': '\n[Execution Failed]', 'success': False}, to=sid)
+        socketio.emit('run_metrics', metrics.to_dict(), to=sid)
+        session.finish_run(run_id)
+        return
+    
+    sandbox = Sandbox(language)
     try:
-        with process_lock:
-            # Kill previous process if exists
-            if current_process and current_process.poll() is None:
-                current_process.kill()
-            
-            # Start new process
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            env["PYTHONUNBUFFERED"] = "1"
-            
-            current_process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                startupinfo=startupinfo,
-                env=env
-            )
-        
-        # Start output reader thread
-        threading.Thread(
-            target=read_output, 
-            args=(current_process,), 
-            daemon=True
-        ).start()
+        # Start new process (interpreted languages reuse a pre-started worker)
+        process, warm = warm_pool.spawn(cmd, workdir, sandbox.popen_kwargs())
+        if warm:
+            sandbox.adopt(process)
+        sandbox.start(process)
+        metrics.process_started(process, warm)
+        prom.ACTIVE_PROCESSES.inc()
+        session.attach_process(run_id, process)
         
     except FileNotFoundError:
         socketio.emit('term_output', {
             'data': f"Error: Compiler/interpreter for '{language}' not found in PATH."
-        })
-        socketio.emit('term_stop', {'data': ''})
+        }, to=sid)
+        socketio.emit('term_stop', {'data': ''}, to=sid)
+        sandbox.finish(None)
+        record_run(metrics, 'failed_to_start')
+        session.finish_run(run_id)
+        return
     except Exception as e:
-        socketio.emit('term_output', {'data': f"Execution Error: {str(e)}"})
-        socketio.emit('term_stop', {'data': ''})
+        socketio.emit('term_output', {'data': f"Execution Error: {str(e)}"}, to=sid)
+        socketio.emit('term_stop', {'data': ''}, to=sid)
+        sandbox.finish(None)
+        record_run(metrics, 'failed_to_start')
+        session.finish_run(run_id)
+        return
+    
+    # Hold the worker slot until the program exits
+    read_output(process, session, run_id, sandbox, metrics)
+
+def validate_tests(data):
+    """
+    Normalize a run_tests payload
+    Returns: (cases, time_limit, memory_limit_bytes, error_message)
+    """
+    tests = data.get('tests')
+    if not isinstance(tests, list) or not tests:
+        return None, None, None, "No test cases given"
+    if len(tests) > TEST_CASE_MAX:
+        return None, None, None, f"Too many test cases ({len(tests)} > {TEST_CASE_MAX})"
+    
+    cases = []
+    for index, test in enumerate(tests):
+        if not isinstance(test, dict):
+            return None, None, None, f"Test {index + 1}: expected an object"
+        stdin = test.get('stdin', '')
+        expected = test.get('expected_output')
+        if expected == '':
+            expected = None  # nothing to compare: just show the output
+        if not isinstance(stdin, str) or (expected is not None and not isinstance(expected, str)):
+            return None, None, None, f"Test {index + 1}: input and expected output must be text"
+        cases.append({
+            'name': str(test.get('name') or f'Case {index + 1}'),
+            'stdin': stdin,
+            'expected_output': expected
+        })
+    
+    limits = []
+    for key, maximum in (('time_limit', TEST_CASE_MAX_TIME_LIMIT), ('memory_limit_mb', None)):
+        value = data.get(key)
+        if value in (None, ''):
+            limits.append(None)
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = 0
+        if value <= 0 or (maximum and value > maximum):
+            bound = f" up to {maximum}" if maximum else ""
+            return None, None, None, f"'{key}' must be a positive number{bound}"
+        limits.append(value)
+    
+    time_limit, memory_mb = limits
+    return cases, time_limit, int(memory_mb * 1024 * 1024) if memory_mb else None, None
+
+@socketio.on('run_tests')
+def handle_run_tests(data):
+    """
+    Compile once, then run every stdin test case against the build
+    Payload: {code, language, tests: [{name, stdin, expected_output}], time_limit, memory_limit_mb}
+    Emits test_result per case as it finishes, then test_summary
+    """
+    sid = request.sid
+    session = sessions.get(sid)
+    
+    code = data.get('code', '')
+    language = data.get('language', 'python')
+    cases, time_limit, memory_limit, error = validate_tests(data)
+    if error:
+        socketio.emit('test_summary', {'run_id': None, 'error': error}, to=sid)
+        return
+    
+    supersede_runs(session)
+    
+    run_id, workdir = session.new_run()
+    metrics = run_metrics.create(run_id, language)
+    
+    accepted, job, error = scheduler.submit(
+        sid, run_id,
+        lambda: execute_tests(session, run_id, workdir, code, language, cases,
+                              time_limit, memory_limit, metrics)
+    )
+    
+    if not accepted:
+        record_run(metrics, 'rejected')
+        socketio.emit('test_summary', {'run_id': run_id, 'error': error}, to=sid)
+        session.finish_run(run_id)
+
+def execute_tests(session, run_id, workdir, code, language, cases, time_limit, memory_limit, metrics):
+    """Build once and run the test cases in parallel on a scheduler worker"""
+    sid = session.sid
+    metrics.queue_wait_seconds = time.time() - metrics.created_at
+    metrics.status = 'compiling'
+    
+    def on_compiler_output(text):
+        socketio.emit('term_output', {'data': text}, to=sid)
+        socketio.sleep(0)
+    
+    cancel_event = session.get_cancel_event(run_id)
+    build_metrics = {}
+    prepare_started = time.perf_counter()
+    success, cmd, error = compiler.compile_and_run(
+        code, language, workdir,
+        on_output=on_compiler_output,
+        cancel_event=cancel_event,
+        metrics=build_metrics
+    )
+    metrics.prepare_seconds = time.perf_counter() - prepare_started
+    metrics.compile_seconds = build_metrics.get('compile_seconds')
+    metrics.cache_hit = build_metrics.get('cache_hit')
+    
+    if cancel_event.is_set() or not session.is_current(run_id):
+        record_run(metrics, 'cancelled')
+        socketio.emit('test_summary', {'run_id': run_id, 'error': 'Cancelled'}, to=sid)
+        session.finish_run(run_id)
+        return
+    
+    if not success:
+        record_run(metrics, 'compile_failed')
+        socketio.emit('term_output', {'data': error}, to=sid)
+        socketio.emit('test_summary', {
+            'run_id': run_id, 'total': len(cases), 'passed': 0, 'error': 'Compilation failed'
+        }, to=sid)
+        session.finish_run(run_id)
+        return
+    
+    def on_result(index, result):
+        case_metrics = result['metrics']
+        if case_metrics['wall_seconds'] is not None:
+            prom.RUN_WALL_SECONDS.labels(language=language).observe(case_metrics['wall_seconds'])
+        cpu = (case_metrics['user_cpu_seconds'] or 0) + (case_metrics['sys_cpu_seconds'] or 0)
+        socketio.emit('test_result', {
+            'run_id': run_id,
+            'index': index,
+            'name': result['name'],
+            'status': result['status'],
+            'passed': result['passed'],
+            'reason': result.get('reason'),
+            'error': result.get('error'),
+            'exit_code': result.get('exit_code'),
+            'stdout': result.get('stdout', ''),
+            'stderr': result.get('stderr', ''),
+            'wall_seconds': case_metrics['wall_seconds'],
+            'cpu_seconds': cpu if case_metrics['user_cpu_seconds'] is not None else None,
+            'peak_rss_bytes': case_metrics['peak_rss_bytes']
+        }, to=sid)
+        socketio.sleep(0)
+    
+    metrics.status = 'running'
+    prom.ACTIVE_PROCESSES.inc()
+    try:
+        summary = run_cases(cmd, language, workdir, cases, on_result, TEST_CASE_PARALLELISM,
+                            cancel_event, time_limit, memory_limit)
+    finally:
+        prom.ACTIVE_PROCESSES.dec()
+        session.finish_run(run_id)
+    
+    metrics.wall_seconds = summary['seconds']
+    completed = summary['statuses'].get('completed', 0)  # cases without an expected output
+    failed = summary['total'] - summary['passed'] - completed
+    if summary['cancelled']:
+        status = 'cancelled'
+    else:
+        status = 'failed' if failed else 'success'
+    record_run(metrics, status)
+    socketio.emit('test_summary', {
+        'run_id': run_id,
+        'total': summary['total'],
+        'passed': summary['passed'],
+        'failed': failed,
+        'statuses': summary['statuses'],
+        'cancelled': summary['cancelled'],
+        'seconds': summary['seconds'],
+        'compile_seconds': metrics.compile_seconds,
+        'cache_hit': metrics.cache_hit
+    }, to=sid)
+
+@socketio.on('stop_code')
+def handle_stop_code(data=None):
+    """Cancel the session's queued, compiling or running job"""
+    sid = request.sid
+    session = sessions.get(sid)
+    
+    cancelled = scheduler.cancel(sid)
+    for job in cancelled:
+        mark_cancelled(job.run_id)
+        session.finish_run(job.run_id)
+    if cancelled:
+        socketio.emit('term_stop', {'data': '\n[Execution Cancelled]', 'success': False}, to=sid)
+    
+    session.kill_running()
+
+@socketio.on('diagnostics_open')
+def handle_diagnostics_open(data):
+    """Track an editor buffer for live diagnostics (full text)"""
+    if not diagnostics.open(request.sid, str(data.get('doc_id', '')), data.get('language', ''),
+                            data.get('code', ''), data.get('version')):
+        socketio.emit('diagnostics', {
+            'doc_id': data.get('doc_id'),
+            'version': data.get('version'),
+            'source': 'extensions',
+            'diagnostics': [],
+            'skipped': True
+        }, to=request.sid)
+
+@socketio.on('diagnostics_change')
+def handle_diagnostics_change(data):
+    """Apply a tracked buffer's edits; an edit the server cannot apply asks for the full text"""
+    doc_id = str(data.get('doc_id', ''))
+    try:
+        diagnostics.change(request.sid, doc_id, data.get('base_version'), data.get('version'),
+                           data.get('changes') or [])
+    except ResyncNeeded:
+        socketio.emit('diagnostics_resync', {'doc_id': doc_id}, to=request.sid)
+
+@socketio.on('diagnostics_close')
+def handle_diagnostics_close(data):
+    diagnostics.close(request.sid, str(data.get('doc_id', '')))
+
+@socketio.on('term_ack')
+def handle_term_ack(data):
+    """Client rendered output frames up to seq (releases backpressure)"""
+    pump = sessions.get(request.sid).get_pump()
+    if pump:
+        pump.ack(int(data.get('seq', 0)))
 
 @socketio.on('send_input')
 def handle_input(data):
     """Send input to running process"""
-    global current_process
     user_input = data.get('input', '')
+    process = sessions.get(request.sid).get_process()
     
-    with process_lock:
-        if current_process and current_process.poll() is None:
-            try:
-                current_process.stdin.write(user_input + '\n')
-                current_process.stdin.flush()
-            except Exception as e:
-                print(f"Input Error: {e}")
-
-def read_output(process):
-    """Read process output and emit to frontend"""
-    has_error = False
+    if process and process.poll() is None:
+        try:
+            process.stdin.write((user_input + '\n').encode('utf-8'))
+            process.stdin.flush()
+        except Exception as e:
+            print(f"Input Error: {e}")
+
+def read_output(process, session, run_id, sandbox, metrics):
+    """Stream merged process output to the owning session"""
+    sid = session.sid
     return_code = 0
     
-    def flush_buffer(buf):
-        if buf:
-            socketio.emit('term_output', {'data': ''.join(buf)})
-            socketio.sleep(0)
-        return []
-    
-    try:
-        buffer = []
-        while True:
-            line = process.stdout.readline()
-            if not line:
-                flush_buffer(buffer)
-                break
-            
-            buffer.append(line)
-            if line.endswith('\n') or len(buffer) > 50:
-                buffer = flush_buffer(buffer)
-                
-    except Exception as e:
-        print(f"Stdout error: {e}")
+    def emit_frame(text, seq):
+        socketio.emit('term_output', {'data': text, 'seq': seq}, to=sid)
+        socketio.sleep(0)
     
+    pump = OutputPump(process, emit_frame)
+    session.attach_pump(run_id, pump)
     try:
-        if process.stderr:
-            while True:
-                line = process.stderr.readline()
-                if not line:
-                    break
-                has_error = True
-                socketio.emit('term_output', {'data': line})
-                socketio.sleep(0)
+        pump.run()
     except Exception as e:
-        print(f"Stderr error: {e}")
+        print(f"Output error: {e}")
     
+    rusage = None
     try:
-        if process.stdout:
-            process.stdout.close()
-        if process.stderr:
-            process.stderr.close()
-        return_code = process.wait()
+        return_code, rusage = wait_with_rusage(process)
     except Exception as e:
         print(f"Cleanup error: {e}")
     
-    if return_code != 0 or has_error:
+    reason = sandbox.finish(return_code, rusage)
+    session.finish_run(run_id)
+    metrics.process_finished(return_code, rusage, pump, sandbox.memory_peak)
+    metrics.kill_reason = reason
+    prom.ACTIVE_PROCESSES.dec()
+    
+    if reason:
+        record_run(metrics, 'killed')
+        socketio.emit('term_stop', {
+            'data': f'\n[Execution Killed: {sandbox.describe()}]',
+            'success': False,
+            'reason': reason,
+            'limit': sandbox.limit_value()
+        }, to=sid)
+    elif return_code != 0 or pump.stderr_bytes:
+        record_run(metrics, 'failed')
         socketio.emit('term_stop', {
             'data': '\n[Execution Failed]', 
             'success': False
-        })
+        }, to=sid)
     else:
+        record_run(metrics, 'success')
         socketio.emit('term_stop', {
             'data': '\n[Execution Successful]', 
             'success': True
-        })
+        }, to=sid)
+    
+    socketio.emit('run_metrics', metrics.to_dict(), to=sid)
+
+startup_profile.mark('app_imported')
 
-def start_server():
+def start_server(port=FLASK_PORT):
     """Start Flask-SocketIO server"""
-    socketio.run(app, port=FLASK_PORT, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, port=port, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Batch Runner
+Headless grading of many (code, language, stdin, expected output) jobs
+
+Jobs run in a process pool, one workspace each, under the same compile
+cache and resource limits as interactive runs. Results are yielded as
+they complete, so callers can stream them.
+
+CLI:
+    python batch_runner.py jobs.jsonl [-j WORKERS] [-o results.jsonl]
+
+Each input line is a JSON job:
+    {"id": "...", "language": "cpp", "code": "...", "stdin": "...", "expected_output": "..."}
+
+Optional per-job limits: "time_limit" (CPU seconds) and "memory_limit" (bytes).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import (
+    BATCH_DIR, BATCH_MAX_WORKERS, BATCH_MAX_JOBS, BATCH_OUTPUT_LIMIT
+)
+from case_runner import run_case
+from languages import language_registry
+from utils import ensure_directory
+
+# Final job states
+STATUSES = ('passed', 'wrong_answer', 'completed', 'compile_error', 'runtime_error',
+            'killed', 'invalid')
+
+_compiler = None  # one CompilerHandler per pool process
+
+
+def _get_compiler():
+    global _compiler
+    if _compiler is None:
+        from compiler_handler import CompilerHandler
+        _compiler = CompilerHandler()
+    return _compiler
+
+
+def validate_job(job, index):
+    """
+    Normalize a job dict
+    Returns: (job, error_message)
+    """
+    if not isinstance(job, dict):
+        return None, f"Job {index}: expected an object"
+    language = job.get('language')
+    if language_registry.get(language) is None:
+        return None, f"Job {index}: unsupported language {language!r}"
+    if not isinstance(job.get('code'), str):
+        return None, f"Job {index}: 'code' must be a string"
+    expected = job.get('expected_output')
+    stdin = job.get('stdin', '')
+    if not isinstance(stdin, str) or (expected is not None and not isinstance(expected, str)):
+        return None, f"Job {index}: 'stdin' and 'expected_output' must be strings"
+    limits = {}
+    for key in ('time_limit', 'memory_limit'):
+        value = job.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+            return None, f"Job {index}: '{key}' must be a positive number"
+        limits[key] = value
+    return {
+        'id': str(job.get('id', index)),
+        'language': language,
+        'code': job['code'],
+        'stdin': stdin,
+        'expected_output': expected,
+        'time_limit': limits['time_limit'],
+        'memory_limit': int(limits['memory_limit']) if limits['memory_limit'] else None
+    }, None
+
+
+def run_job(job):
+    """
+    Compile and run one validated job in a fresh workspace
+    Executed inside a pool process; returns a JSON-serializable result
+    """
+    from run_metrics import RunMetrics
+
+    result = {'id': job['id'], 'language': job['language'], 'status': None, 'passed': None}
+    workdir = ensure_directory(os.path.join(BATCH_DIR, uuid.uuid4().hex))
+    metrics = RunMetrics(job['id'], job['language'])
+    try:
+        build_metrics = {}
+        prepare_started = time.perf_counter()
+        success, cmd, error = _get_compiler().compile_and_run(
+            job['code'], job['language'], workdir, metrics=build_metrics
+        )
+        metrics.prepare_seconds = time.perf_counter() - prepare_started
+        metrics.compile_seconds = build_metrics.get('compile_seconds')
+        metrics.cache_hit = build_metrics.get('cache_hit')
+        if not success:
+            result['status'] = 'compile_error'
+            result['error'] = (error or '')[:BATCH_OUTPUT_LIMIT]
+            return result
+
+        result.update(run_case(cmd, job['language'], workdir, job['stdin'], job['expected_output'],
+                               job['time_limit'], job['memory_limit'], metrics=metrics))
+        return result
+    except Exception as e:
+        result['status'] = 'runtime_error'
+        result['error'] = str(e)
+        return result
+    finally:
+        if 'metrics' not in result:  # run_case fills these in when the program ran
+            metrics.status = result['status']
+            result['metrics'] = metrics.to_dict()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class BatchRunner:
+    """Process pool shared by all batch requests of this process"""
+
+    def __init__(self, max_workers=BATCH_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self.lock:
+            if self._executor is None:
+                # spawn: forking the threaded server could copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def run(self, jobs):
+        """
+        Run jobs in parallel, yielding each result as soon as it is ready
+        Invalid jobs are reported immediately with status 'invalid'
+        """
+        if len(jobs) > BATCH_MAX_JOBS:
+            raise ValueError(f"Too many jobs ({len(jobs)} > {BATCH_MAX_JOBS})")
+
+        valid = []
+        for index, raw in enumerate(jobs):
+            job, error = validate_job(raw, index)
+            if error:
+                job_id = raw.get('id', index) if isinstance(raw, dict) else index
+                yield {'id': str(job_id), 'status': 'invalid', 'passed': None, 'error': error}
+            else:
+                valid.append(job)
+
+        executor = self._get_executor()
+        futures = {executor.submit(run_job, job): job for job in valid}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    job = futures[future]
+                    yield {'id': job['id'], 'language': job['language'],
+                           'status': 'runtime_error', 'passed': None, 'error': str(e)}
+        finally:
+            # Consumer stopped early (e.g. HTTP client went away)
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def summarize(results):
+    """Count results per status"""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return {'total': len(results), 'statuses': counts}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a batch of NOC jobs')
+    parser.add_argument('jobs', help='JSON Lines file of jobs ("-" for stdin)')
+    parser.add_argument('-j', '--workers', type=int, default=BATCH_MAX_WORKERS,
+                        help='parallel worker processes')
+    parser.add_argument('-o', '--output', help='write results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.jobs == '-' else open(args.jobs, 'r', encoding='utf-8')
+    with source:
+        jobs = [json.loads(line) for line in source if line.strip()]
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    runner = BatchRunner(max_workers=max(1, args.workers))
+    results = []
+    started = time.perf_counter()
+    try:
+        for result in runner.run(jobs):
+            results.append(result)
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+    finally:
+        runner.shutdown()
+        if out is not sys.stdout:
+            out.close()
+
+    summary = summarize(results)
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    print(json.dumps(summary), file=sys.stderr)
+    return 0 if all(r['status'] in ('passed', 'completed') for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Benchmark
+Reproducible end-to-end latency and throughput measurements per language
+
+Scenarios (each program is run for every selected language):
+    compile  CompilerHandler.compile_and_run alone, "cold" (the source is
+             salted with a unique comment so every build misses the compile
+             cache) and "warm" (the same source again: cache hits)
+    execute  compile_and_run (warm cache) plus running the program under
+             its sandbox with file-backed stdio, as the batch runner does
+    socket   the full IDE path through a local Socket.IO test client:
+             run_code -> scheduler -> warm pool -> output pump -> term_stop
+
+Programs live in benchmarks/<program>/main.<ext>: hello (startup cost),
+compute (a prime sieve) and output (100,000 lines). Languages whose
+toolchain is missing are reported as skipped.
+
+CLI:
+    python benchmark.py [-l python cpp] [-p hello compute] [-s execute socket]
+                        [-n 20] [-c 1 4] [-o results.json] [--compare baseline.json]
+
+The JSON report holds p50/p95/p99 latency, throughput at each concurrency
+level and the cold/warm compile ratio. With --compare, entries whose p50
+or p95 grew by more than the threshold are listed as regressions and the
+exit code is 1.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config import (
+    BASE_DIR, BENCHMARK_PROGRAMS_DIR, BENCHMARK_DIR, BENCHMARK_REGRESSION_THRESHOLD
+)
+from case_runner import run_case
+from languages import language_registry
+from utils import ensure_directory
+
+SCENARIOS = ('compile', 'execute', 'socket')
+PROGRAMS = ('hello', 'compute', 'output')
+
+# Text every correct run prints (checked in the execute scenario)
+EXPECTED = {'hello': 'Hello, World!', 'compute': '78498', 'output': 'line 99999'}
+EXPECTED_OVERRIDES = {
+    ('sql', 'compute'): '500000500000',
+    ('sql', 'output'): 'line 999',  # result sets are capped at SQL_MAX_ROWS
+    ('bash', 'compute'): '20000100000'
+}
+
+OUTPUT_CHECK_LIMIT = 2 * 1024 * 1024  # bytes of stdout read back to check a run
+SOCKET_RUN_TIMEOUT = 120  # seconds before a socket run counts as failed
+SOCKET_POLL_INTERVAL = 0.002
+
+
+def load_program(language, program):
+    path = os.path.join(BENCHMARK_PROGRAMS_DIR, program, f'main{language_registry.get(language).extension}')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def salted(code, language):
+    """Source that compiles to the same program but has a new cache key"""
+    prefix = language_registry.get(language).comment_prefix
+    return f"{code}\n{prefix} benchmark {uuid.uuid4().hex}\n"
+
+
+def percentile(ordered, fraction):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(seconds):
+    """min/mean/p50/p95/p99/max in milliseconds"""
+    ordered = sorted(seconds)
+    if not ordered:
+        return None
+    ms = lambda value: round(value * 1000, 3)
+    return {
+        'min': ms(ordered[0]),
+        'mean': ms(sum(ordered) / len(ordered)),
+        'p50': ms(percentile(ordered, 0.50)),
+        'p95': ms(percentile(ordered, 0.95)),
+        'p99': ms(percentile(ordered, 0.99)),
+        'max': ms(ordered[-1])
+    }
+
+
+class Benchmark:
+    def __init__(self, iterations=10, warmup=1, concurrency=(1,)):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.root = ensure_directory(os.path.join(BENCHMARK_DIR, uuid.uuid4().hex[:8]))
+        self._compiler = None
+        self._app = None
+        self.results = []
+        self.skipped = []
+        self.cached_languages = set()  # languages whose builds go through the compile cache
+
+    @property
+    def compiler(self):
+        if self._compiler is None:
+            from compiler_handler import CompilerHandler
+            self._compiler = CompilerHandler()
+        return self._compiler
+
+    def _workdir(self):
+        return ensure_directory(os.path.join(self.root, uuid.uuid4().hex[:12]))
+
+    def _measure(self, iteration, iterations, concurrency):
+        """
+        Call iteration() `iterations` times from `concurrency` threads
+        iteration returns: (error or None, {phase: seconds})
+        """
+        samples, errors, phases = [], [], {}
+
+        def timed(_):
+            started = time.perf_counter()
+            try:
+                error, phase_times = iteration()
+            except Exception as e:
+                error, phase_times = f'{type(e).__name__}: {e}', {}
+            return time.perf_counter() - started, error, phase_times
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(timed, range(iterations)))
+        elapsed = time.perf_counter() - started
+
+        for seconds, error, phase_times in outcomes:
+            if error:
+                errors.append(error)
+                continue
+            samples.append(seconds)
+            for name, value in phase_times.items():
+                if value is not None:
+                    phases.setdefault(name, []).append(value)
+
+        result = {
+            'concurrency': concurrency,
+            'iterations': iterations,
+            'errors': len(errors),
+            'latency_ms': latency_summary(samples),
+            'throughput_per_second': round(len(samples) / elapsed, 3) if elapsed else None
+        }
+        if phases:
+            result['phases_ms'] = {
+                name: {key: summary[key] for key in ('p50', 'p95')}
+                for name, summary in ((name, latency_summary(values)) for name, values in phases.items())
+            }
+        if errors:
+            result['error_samples'] = sorted(set(errors))[:3]
+        return result
+
+    def _record(self, scenario, language, program, result, variant=None):
+        entry = {'scenario': scenario, 'language': language, 'program': program}
+        if variant:
+            entry['variant'] = variant
+        entry.update(result)
+        self.results.append(entry)
+        latency = result['latency_ms'] or {}
+        label = f"{scenario}{'/' + variant if variant else ''}"
+        print(f"{label:<14} {language:<11} {program:<8} c={result['concurrency']:<3} "
+              f"p50={latency.get('p50')}ms p95={latency.get('p95')}ms "
+              f"{result['throughput_per_second']}/s errors={result['errors']}", file=sys.stderr)
+
+    # Scenario iterations
+
+    def _compile_once(self, code, language, expect_hit=None):
+        workdir = self._workdir()
+        try:
+            build_metrics = {}
+            success, _, error = self.compiler.compile_and_run(code, language, workdir, metrics=build_metrics)
+            if not success:
+                return _first_line(error), {}
+            if 'cache_hit' in build_metrics:
+                self.cached_languages.add(language)
+            if expect_hit is not None and 'cache_hit' in build_metrics and build_metrics['cache_hit'] != expect_hit:
+                return f"expected cache_hit={expect_hit}", {}
+            return None, {'compile': build_metrics.get('compile_seconds')}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _execute_once(self, code, language, program):
+        workdir = self._workdir()
+        try:
+            prepare_started = time.perf_counter()
+            success, cmd, error = self.compiler.compile_and_run(code, language, workdir)
+            prepare = time.perf_counter() - prepare_started
+            if not success:
+                return _first_line(error), {}
+            result = run_case(cmd, language, workdir, output_limit=OUTPUT_CHECK_LIMIT)
+            if result['status'] != 'completed':
+                return f"{result['status']}: {_first_line(result.get('error') or result.get('stderr'))}", {}
+            expected = EXPECTED_OVERRIDES.get((language, program), EXPECTED[program])
+            if expected not in result['stdout']:
+                return f"output does not contain {expected!r}", {}
+            return None, {'prepare': prepare, 'run': result['metrics']['wall_seconds']}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _socket_clients(self, count):
+        if self._app is None:
+            import app as app_module
+            self._app = app_module
+        clients = queue.Queue()
+        for _ in range(count):
+            clients.put(self._app.socketio.test_client(self._app.app))
+        return clients
+
+    @staticmethod
+    def _socket_once(clients, code, language):
+        client = clients.get()
+        try:
+            client.get_received()  # drop events left over from the previous run
+            client.emit('run_code', {'code': code, 'language': language})
+            deadline = time.monotonic() + SOCKET_RUN_TIMEOUT
+            while True:
+                for event in client.get_received():
+                    data = event['args'][0] if event['args'] else {}
+                    if event['name'] == 'term_output' and data.get('seq'):
+                        client.emit('term_ack', {'seq': data['seq']})
+                    elif event['name'] == 'term_stop':
+                        return (None if data.get('success') else _first_line(data.get('data')) or 'failed'), {}
+                if time.monotonic() > deadline:
+                    client.emit('stop_code', {})
+                    return f"no term_stop within {SOCKET_RUN_TIMEOUT}s", {}
+                time.sleep(SOCKET_POLL_INTERVAL)
+        finally:
+            clients.put(client)
+
+    # Runner
+
+    def run(self, languages, programs, scenarios):
+        for language in languages:
+            for program in programs:
+                try:
+                    code = load_program(language, program)
+                except OSError:
+                    self.skipped.append({'language': language, 'program': program, 'reason': 'no program'})
+                    continue
+
+                # Warm-up doubles as the toolchain check and fills the compile cache
+                error = None
+                for _ in range(max(1, self.warmup)):
+                    error, _ = self._execute_once(code, language, program)
+                    if error:
+                        break
+                if error:
+                    self.skipped.append({'language': language, 'program': program, 'reason': error})
+                    print(f"skipped        {language:<11} {program:<8} {error}", file=sys.stderr)
+                    continue
+
+                if 'compile' in scenarios:
+                    self._record('compile', language, program, self._measure(
+                        lambda: self._compile_once(salted(code, language), language, expect_hit=False),
+                        self.iterations, 1), 'cold')
+                    self._record('compile', language, program, self._measure(
+                        lambda: self._compile_once(code, language, expect_hit=True),
+                        self.iterations, 1), 'warm')
+                for concurrency in self.concurrency:
+                    if 'execute' in scenarios:
+                        self._record('execute', language, program, self._measure(
+                            lambda: self._execute_once(code, language, program),
+                            self.iterations, concurrency))
+                    if 'socket' in scenarios:
+                        clients = self._socket_clients(concurrency)
+                        self._record('socket', language, program, self._measure(
+                            lambda: self._socket_once(clients, code, language),
+                            self.iterations, concurrency))
+                        while not clients.empty():
+                            clients.get().disconnect()
+
+    def cache_effects(self):
+        """Cold vs warm compile p50 for languages with cached builds"""
+        cold = {(r['language'], r['program']): r for r in self.results if r.get('variant') == 'cold'}
+        effects = []
+        for r in self.results:
+            if (r.get('variant') != 'warm' or r['language'] not in self.cached_languages
+                    or (r['language'], r['program']) not in cold):
+                continue
+            cold_p50 = (cold[(r['language'], r['program'])]['latency_ms'] or {}).get('p50')
+            warm_p50 = (r['latency_ms'] or {}).get('p50')
+            effects.append({
+                'language': r['language'],
+                'program': r['program'],
+                'cold_p50_ms': cold_p50,
+                'warm_p50_ms': warm_p50,
+                'speedup': round(cold_p50 / warm_p50, 2) if cold_p50 and warm_p50 else None
+            })
+        return effects
+
+    def meta(self, languages):
+        toolchains = {}
+        for language in languages:
+            tool = language_registry.get(language).detect()
+            if tool:
+                toolchains[language] = self.compiler.cache.compiler_version(tool)
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'iterations': self.iterations,
+            'warmup': self.warmup,
+            'concurrency': list(self.concurrency),
+            'toolchains': toolchains
+        }
+
+    def close(self):
+        if self._app is not None:
+            self._app.warm_pool.shutdown()
+            self._app.compiler.javac_server.shutdown()
+        if self._compiler is not None:
+            self._compiler.javac_server.shutdown()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _first_line(text):
+    text = (text or '').strip()
+    return text.splitlines()[0][:200] if text else ''
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _result_key(result):
+    return (result['scenario'], result.get('variant'), result['language'], result['program'],
+            result['concurrency'])
+
+
+def compare(results, baseline, threshold=BENCHMARK_REGRESSION_THRESHOLD):
+    """
+    Entries whose p50 or p95 latency grew by more than threshold (relative)
+    Changes under a millisecond are treated as noise
+    """
+    previous = {_result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(_result_key(result))
+        if not before or not before.get('latency_ms') or not result.get('latency_ms'):
+            continue
+        for metric in ('p50', 'p95'):
+            old, new = before['latency_ms'][metric], result['latency_ms'][metric]
+            if old and new - old > 1 and new / old > 1 + threshold:
+                regressions.append({
+                    'scenario': result['scenario'],
+                    'variant': result.get('variant'),
+                    'language': result['language'],
+                    'program': result['program'],
+                    'concurrency': result['concurrency'],
+                    'metric': metric,
+                    'baseline_ms': old,
+                    'current_ms': new,
+                    'change': round(new / old - 1, 3)
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark NOC compile and run latency')
+    parser.add_argument('-l', '--languages', nargs='+', choices=language_registry.names(),
+                        default=language_registry.names())
+    parser.add_argument('-p', '--programs', nargs='+', choices=PROGRAMS, default=list(PROGRAMS))
+    parser.add_argument('-s', '--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('-n', '--iterations', type=int, default=10, help='measured runs per entry')
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+', default=[1, 4],
+                        help='parallel runs for the execute and socket scenarios')
+    parser.add_argument('--warmup', type=int, default=1, help='unmeasured runs first')
+    parser.add_argument('-o', '--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='earlier report to check for regressions')
+    parser.add_argument('--threshold', type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                        help='relative slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    benchmark = Benchmark(max(1, args.iterations), max(0, args.warmup),
+                          [max(1, c) for c in args.concurrency])
+    # Components log to stdout (e.g. extension loading): keep it for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            benchmark.run(args.languages, args.programs, args.scenarios)
+            report = {
+                'meta': benchmark.meta(args.languages),
+                'results': benchmark.results,
+                'cache_effects': benchmark.cache_effects(),
+                'skipped': benchmark.skipped
+            }
+        finally:
+            benchmark.close()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.threshold)
+        report['comparison'] = {
+            'baseline': args.compare,
+            'baseline_commit': baseline.get('meta', {}).get('git_commit'),
+            'threshold': args.threshold,
+            'regressions': regressions
+        }
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']} {regression['language']} {regression['program']} "
+                  f"c={regression['concurrency']} {regression['metric']}: "
+                  f"{regression['baseline_ms']}ms -> {regression['current_ms']}ms", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
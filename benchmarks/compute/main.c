@@ -0,0 +1,16 @@
+#include <stdio.h>
+#include <stdlib.h>
+
+int main(void) {
+    const int N = 1000000;
+    char *composite = calloc(N, 1);
+    composite[0] = composite[1] = 1;
+    for (int i = 2; (long long)i * i < N; i++)
+        if (!composite[i])
+            for (int j = i * i; j < N; j += i) composite[j] = 1;
+    int count = 0;
+    for (int i = 0; i < N; i++) count += !composite[i];
+    printf("%d\n", count);
+    free(composite);
+    return 0;
+}
@@ -0,0 +1,15 @@
+#include <iostream>
+#include <vector>
+
+int main() {
+    const int N = 1000000;
+    std::vector<bool> sieve(N, true);
+    sieve[0] = sieve[1] = false;
+    for (int i = 2; (long long)i * i < N; i++)
+        if (sieve[i])
+            for (int j = i * i; j < N; j += i) sieve[j] = false;
+    int count = 0;
+    for (int i = 0; i < N; i++) count += sieve[i];
+    std::cout << count << std::endl;
+    return 0;
+}
@@ -0,0 +1,15 @@
+using System;
+
+class Program {
+    static void Main() {
+        const int N = 1000000;
+        bool[] composite = new bool[N];
+        composite[0] = composite[1] = true;
+        for (int i = 2; (long)i * i < N; i++)
+            if (!composite[i])
+                for (int j = i * i; j < N; j += i) composite[j] = true;
+        int count = 0;
+        for (int i = 0; i < N; i++) if (!composite[i]) count++;
+        Console.WriteLine(count);
+    }
+}
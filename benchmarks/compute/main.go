@@ -0,0 +1,23 @@
+package main
+
+import "fmt"
+
+func main() {
+	const n = 1000000
+	composite := make([]bool, n)
+	composite[0], composite[1] = true, true
+	for i := 2; i*i < n; i++ {
+		if !composite[i] {
+			for j := i * i; j < n; j += i {
+				composite[j] = true
+			}
+		}
+	}
+	count := 0
+	for _, c := range composite {
+		if !c {
+			count++
+		}
+	}
+	fmt.Println(count)
+}
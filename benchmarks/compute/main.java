@@ -0,0 +1,13 @@
+public class Main {
+    public static void main(String[] args) {
+        final int N = 1000000;
+        boolean[] composite = new boolean[N];
+        composite[0] = composite[1] = true;
+        for (int i = 2; (long) i * i < N; i++)
+            if (!composite[i])
+                for (int j = i * i; j < N; j += i) composite[j] = true;
+        int count = 0;
+        for (int i = 0; i < N; i++) if (!composite[i]) count++;
+        System.out.println(count);
+    }
+}
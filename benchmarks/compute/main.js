@@ -0,0 +1,11 @@
+const N = 1000000;
+const composite = new Uint8Array(N);
+composite[0] = composite[1] = 1;
+for (let i = 2; i * i < N; i++) {
+    if (!composite[i]) {
+        for (let j = i * i; j < N; j += i) composite[j] = 1;
+    }
+}
+let count = 0;
+for (let i = 0; i < N; i++) if (!composite[i]) count++;
+console.log(count);
@@ -0,0 +1,18 @@
+fun main() {
+    val n = 1000000
+    val composite = BooleanArray(n)
+    composite[0] = true
+    composite[1] = true
+    var i = 2
+    while (i.toLong() * i < n) {
+        if (!composite[i]) {
+            var j = i * i
+            while (j < n) {
+                composite[j] = true
+                j += i
+            }
+        }
+        i++
+    }
+    println(composite.count { !it })
+}
@@ -0,0 +1,14 @@
+local N = 1000000
+local composite = {}
+local i = 2
+while i * i < N do
+    if not composite[i] then
+        for j = i * i, N - 1, i do composite[j] = true end
+    end
+    i = i + 1
+end
+local count = 0
+for k = 2, N - 1 do
+    if not composite[k] then count = count + 1 end
+end
+print(count)
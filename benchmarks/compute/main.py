@@ -0,0 +1,8 @@
+N = 1000000
+sieve = bytearray([1]) * N
+sieve[0] = sieve[1] = 0
+for i in range(2, int(N ** 0.5) + 1):
+    if sieve[i]:
+        for j in range(i * i, N, i):
+            sieve[j] = 0
+print(sum(sieve))
@@ -0,0 +1,18 @@
+fn main() {
+    const N: usize = 1_000_000;
+    let mut composite = vec![false; N];
+    composite[0] = true;
+    composite[1] = true;
+    let mut i = 2;
+    while i * i < N {
+        if !composite[i] {
+            let mut j = i * i;
+            while j < N {
+                composite[j] = true;
+                j += i;
+            }
+        }
+        i += 1;
+    }
+    println!("{}", composite.iter().filter(|&&c| !c).count());
+}
@@ -0,0 +1,17 @@
+object Main {
+  def main(args: Array[String]): Unit = {
+    val n = 1000000
+    val composite = new Array[Boolean](n)
+    composite(0) = true
+    composite(1) = true
+    var i = 2
+    while (i.toLong * i < n) {
+      if (!composite(i)) {
+        var j = i * i
+        while (j < n) { composite(j) = true; j += i }
+      }
+      i += 1
+    }
+    println(composite.count(!_))
+  }
+}
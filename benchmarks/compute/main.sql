@@ -0,0 +1,6 @@
+WITH RECURSIVE counter(x) AS (
+    SELECT 1
+    UNION ALL
+    SELECT x + 1 FROM counter WHERE x < 1000000
+)
+SELECT sum(x) AS total FROM counter;
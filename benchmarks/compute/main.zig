@@ -0,0 +1,22 @@
+const std = @import("std");
+
+pub fn main() !void {
+    const N = 1000000;
+    const composite = try std.heap.page_allocator.alloc(bool, N);
+    defer std.heap.page_allocator.free(composite);
+    @memset(composite, false);
+    composite[0] = true;
+    composite[1] = true;
+    var i: usize = 2;
+    while (i * i < N) : (i += 1) {
+        if (!composite[i]) {
+            var j = i * i;
+            while (j < N) : (j += i) composite[j] = true;
+        }
+    }
+    var count: usize = 0;
+    for (composite) |c| {
+        if (!c) count += 1;
+    }
+    try std.io.getStdOut().writer().print("{d}\n", .{count});
+}
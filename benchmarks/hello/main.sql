@@ -0,0 +1 @@
+SELECT 'Hello, World!' AS greeting;
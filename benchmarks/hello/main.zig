@@ -0,0 +1,5 @@
+const std = @import("std");
+
+pub fn main() !void {
+    try std.io.getStdOut().writer().print("Hello, World!\n", .{});
+}
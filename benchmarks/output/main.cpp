@@ -0,0 +1,6 @@
+#include <cstdio>
+
+int main() {
+    for (int i = 0; i < 100000; i++) std::printf("line %d\n", i);
+    return 0;
+}
@@ -0,0 +1,10 @@
+using System;
+using System.IO;
+
+class Program {
+    static void Main() {
+        var stdout = new StreamWriter(Console.OpenStandardOutput());
+        for (int i = 0; i < 100000; i++) stdout.WriteLine("line " + i);
+        stdout.Flush();
+    }
+}
@@ -0,0 +1,15 @@
+package main
+
+import (
+	"bufio"
+	"fmt"
+	"os"
+)
+
+func main() {
+	out := bufio.NewWriter(os.Stdout)
+	defer out.Flush()
+	for i := 0; i < 100000; i++ {
+		fmt.Fprintf(out, "line %d\n", i)
+	}
+}
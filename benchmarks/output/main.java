@@ -0,0 +1,9 @@
+import java.io.*;
+
+public class Main {
+    public static void main(String[] args) {
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        for (int i = 0; i < 100000; i++) out.println("line " + i);
+        out.flush();
+    }
+}
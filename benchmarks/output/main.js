@@ -0,0 +1,3 @@
+const lines = [];
+for (let i = 0; i < 100000; i++) lines.push(`line ${i}`);
+process.stdout.write(lines.join('\n') + '\n');
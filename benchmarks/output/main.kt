@@ -0,0 +1,5 @@
+fun main() {
+    val out = StringBuilder()
+    for (i in 0 until 100000) out.append("line ").append(i).append('\n')
+    print(out)
+}
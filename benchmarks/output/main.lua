@@ -0,0 +1,3 @@
+for i = 0, 99999 do
+    io.write("line ", i, "\n")
+end
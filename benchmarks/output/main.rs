@@ -0,0 +1,9 @@
+use std::io::{self, BufWriter, Write};
+
+fn main() {
+    let stdout = io::stdout();
+    let mut out = BufWriter::new(stdout.lock());
+    for i in 0..100000 {
+        writeln!(out, "line {}", i).unwrap();
+    }
+}
@@ -0,0 +1,7 @@
+object Main {
+  def main(args: Array[String]): Unit = {
+    val out = new java.io.PrintWriter(new java.io.BufferedWriter(new java.io.OutputStreamWriter(System.out)))
+    for (i <- 0 until 100000) out.println("line " + i)
+    out.flush()
+  }
+}
@@ -0,0 +1,3 @@
+for ((i = 0; i < 100000; i++)); do
+    echo "line $i"
+done
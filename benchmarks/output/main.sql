@@ -0,0 +1,7 @@
+-- Result sets are capped at SQL_MAX_ROWS rows, so this prints the first 1000
+WITH RECURSIVE counter(x) AS (
+    SELECT 0
+    UNION ALL
+    SELECT x + 1 FROM counter WHERE x < 99999
+)
+SELECT 'line ' || x AS line FROM counter;
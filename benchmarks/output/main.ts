@@ -0,0 +1,3 @@
+const lines: string[] = [];
+for (let i = 0; i < 100000; i++) lines.push(`line ${i}`);
+console.log(lines.join('\n'));
@@ -0,0 +1,9 @@
+const std = @import("std");
+
+pub fn main() !void {
+    var buffered = std.io.bufferedWriter(std.io.getStdOut().writer());
+    const out = buffered.writer();
+    var i: usize = 0;
+    while (i < 100000) : (i += 1) try out.print("line {d}\n", .{i});
+    try buffered.flush();
+}
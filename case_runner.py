@@ -0,0 +1,209 @@
+"""
+Case Runner
+Runs a prepared program against stdin test cases under per-case limits
+
+Each case gets its own working directory and file-backed stdio, so cases
+can run in parallel without pipe deadlocks and RLIMIT_FSIZE bounds their
+output. Used by the batch runner and by `run_tests` in the IDE.
+"""
+import math
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import BATCH_OUTPUT_LIMIT
+from run_metrics import RunMetrics, wait_with_rusage
+from sandbox import Sandbox, REASON_MESSAGES
+from utils import ensure_directory, kill_process_tree
+
+# Final case states
+STATUSES = ('passed', 'wrong_answer', 'completed', 'runtime_error', 'killed')
+
+
+def outputs_match(actual, expected):
+    """Compare ignoring trailing whitespace on each line and trailing blank lines"""
+    def normalize(text):
+        return '\n'.join(line.rstrip() for line in text.replace('\r\n', '\n').split('\n')).rstrip('\n')
+    return normalize(actual) == normalize(expected)
+
+
+def read_limited(path, limit):
+    """
+    Decode up to limit bytes of a capture file
+    Returns: (text, truncated)
+    """
+    with open(path, 'rb') as f:
+        data = f.read(limit + 1)
+    return data[:limit].decode('utf-8', 'replace'), len(data) > limit
+
+
+def case_limits(time_limit=None, memory_limit=None):
+    """
+    Sandbox overrides for a judge-style time limit (CPU seconds, may be
+    fractional) and memory limit (bytes). RLIMIT_CPU only has whole-second
+    resolution, so exact limits are also checked after the case exits.
+    """
+    overrides = {}
+    if time_limit:
+        overrides['cpu_seconds'] = max(1, math.ceil(time_limit))
+        overrides['wall_seconds'] = max(time_limit * 3, time_limit + 2)
+    if memory_limit:
+        overrides['memory_bytes'] = memory_limit
+    return overrides
+
+
+def run_case(cmd, language, workdir, stdin='', expected_output=None, time_limit=None,
+             memory_limit=None, on_start=None, output_limit=BATCH_OUTPUT_LIMIT, metrics=None):
+    """
+    Run cmd once with stdin in workdir
+    on_start(process) is called once the process exists (e.g. to allow kills)
+    metrics: RunMetrics to fill in (e.g. already holding compile timings)
+    Returns: JSON-serializable result with status, output and metrics
+    """
+    metrics = metrics or RunMetrics(None, language)
+    result = {'status': None, 'passed': None}
+    try:
+        stdin_path = os.path.join(workdir, '.stdin')
+        stdout_path = os.path.join(workdir, '.stdout')
+        stderr_path = os.path.join(workdir, '.stderr')
+        with open(stdin_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(stdin or '')
+
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUNBUFFERED'] = '1'
+
+        overrides = case_limits(time_limit, memory_limit)
+        if memory_limit and Sandbox(language).limits.get('memory_bytes') is None:
+            # Address-space limits break runtimes that reserve large heaps
+            # (JVM, Go, V8): their memory limit is checked from the peak instead
+            overrides.pop('memory_bytes')
+        sandbox = Sandbox(language, overrides)
+        try:
+            with open(stdin_path, 'rb') as stdin_file, open(stdout_path, 'wb') as stdout_file, \
+                    open(stderr_path, 'wb') as stderr_file:
+                process = subprocess.Popen(cmd, cwd=workdir, stdin=stdin_file, stdout=stdout_file,
+                                           stderr=stderr_file, env=env, **sandbox.popen_kwargs())
+        except OSError as e:
+            sandbox.finish(None)
+            result['status'] = 'runtime_error'
+            result['error'] = f"Cannot start {cmd[0]}: {e}"
+            return result
+
+        sandbox.start(process)
+        metrics.process_started(process, False)
+        if on_start:
+            on_start(process)
+        return_code, rusage = wait_with_rusage(process)
+        reason = sandbox.finish(return_code, rusage)
+        metrics.process_finished(return_code, rusage, peak_memory=sandbox.memory_peak)
+        metrics.stdout_bytes = os.path.getsize(stdout_path)
+        metrics.stderr_bytes = os.path.getsize(stderr_path)
+
+        # Exact judge limits (the rlimits above are rounded up)
+        cpu = (metrics.user_cpu_seconds or 0) + (metrics.sys_cpu_seconds or 0)
+        if reason is None and time_limit and cpu > time_limit:
+            reason = 'cpu_time'
+        if reason is None and memory_limit and (metrics.peak_rss_bytes or 0) > memory_limit:
+            reason = 'memory'
+        metrics.kill_reason = reason
+
+        stdout, stdout_truncated = read_limited(stdout_path, output_limit)
+        stderr, _ = read_limited(stderr_path, output_limit)
+        metrics.output_truncated = stdout_truncated
+        result['stdout'] = stdout
+        result['stderr'] = stderr
+        result['exit_code'] = return_code
+
+        if reason:
+            result['status'] = 'killed'
+            result['reason'] = reason
+            if reason == 'cpu_time' and time_limit:
+                result['error'] = REASON_MESSAGES['cpu_time'].format(limit=time_limit)
+            elif reason == 'memory' and memory_limit:
+                result['error'] = REASON_MESSAGES['memory'].format(limit_mb=memory_limit // (1024 * 1024))
+            else:
+                result['error'] = sandbox.describe()
+        elif return_code != 0:
+            result['status'] = 'runtime_error'
+        elif expected_output is None:
+            result['status'] = 'completed'
+        elif stdout_truncated:
+            # Only a prefix was read: it cannot be a full match
+            result['status'] = 'wrong_answer'
+            result['passed'] = False
+        else:
+            result['passed'] = outputs_match(stdout, expected_output)
+            result['status'] = 'passed' if result['passed'] else 'wrong_answer'
+        return result
+    except Exception as e:
+        result['status'] = 'runtime_error'
+        result['error'] = str(e)
+        return result
+    finally:
+        metrics.status = result['status']
+        result['metrics'] = metrics.to_dict()
+
+
+def run_cases(cmd, language, workdir, cases, on_result, parallelism, cancel_event=None,
+              time_limit=None, memory_limit=None):
+    """
+    Run cmd against every case ({'name', 'stdin', 'expected_output'}) with
+    up to `parallelism` cases at once, calling on_result(index, result) as
+    each finishes. Setting cancel_event kills running cases and skips the rest.
+    Returns: summary dict
+    """
+    cancel_event = cancel_event or threading.Event()
+    live = set()
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def track(process):
+        with lock:
+            live.add(process)
+        if cancel_event.is_set():
+            kill_process_tree(process)
+
+    def watch_cancel():
+        cancel_event.wait()
+        with lock:
+            processes = list(live)
+        for process in processes:
+            kill_process_tree(process)
+
+    def run(index, case):
+        if cancel_event.is_set():
+            return None
+        case_dir = ensure_directory(os.path.join(workdir, f'case-{index}'))
+        result = run_case(cmd, language, case_dir, case.get('stdin', ''), case.get('expected_output'),
+                          time_limit, memory_limit, on_start=track)
+        # A case killed by the cancellation has no meaningful verdict
+        return None if cancel_event.is_set() else result
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    counts = {}
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='noc-case') as pool:
+        futures = {pool.submit(run, index, case): index for index, case in enumerate(cases)}
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            index = futures[future]
+            result['index'] = index
+            result['name'] = cases[index].get('name') or f'Case {index + 1}'
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            on_result(index, result)
+
+    if not cancel_event.is_set():
+        cancel_event.set()  # release the watcher thread
+        cancelled = False
+    else:
+        cancelled = sum(counts.values()) < len(cases)
+    return {
+        'total': len(cases),
+        'statuses': counts,
+        'passed': counts.get('passed', 0),
+        'cancelled': cancelled,
+        'seconds': time.perf_counter() - started
+    }
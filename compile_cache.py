@@ -0,0 +1,191 @@
+"""
+Compile Cache
+Content-addressed store for compiled binaries and class files
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import COMPILE_CACHE_DIR, COMPILE_CACHE_MAX_BYTES, COMPILE_CACHE_ENABLED, COMPILE_CACHE_IN_USE_SECONDS
+from utils import ensure_directory
+from toolchains import toolchains
+
+MANIFEST_NAME = 'manifest.json'
+
+class CompileCache:
+    def __init__(self, root=COMPILE_CACHE_DIR, max_bytes=COMPILE_CACHE_MAX_BYTES,
+                 in_use_seconds=COMPILE_CACHE_IN_USE_SECONDS):
+        self.root = ensure_directory(root)
+        # Per-process staging so concurrent servers/batch workers never collide
+        self.staging_parent = ensure_directory(os.path.join(root, '.staging'))
+        self.staging_root = os.path.join(self.staging_parent, str(os.getpid()))
+        self.max_bytes = max_bytes
+        self.in_use_seconds = in_use_seconds
+        self.enabled = COMPILE_CACHE_ENABLED
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._scan()
+
+    def _scan(self):
+        """Rebuild the LRU index from entries left by previous runs"""
+        shutil.rmtree(self.staging_root, ignore_errors=True)
+        ensure_directory(self.staging_root)
+        for name in os.listdir(self.staging_parent):
+            if name != str(os.getpid()) and not _pid_alive(name):
+                shutil.rmtree(os.path.join(self.staging_parent, name), ignore_errors=True)
+
+        found = []
+        for name in os.listdir(self.root):
+            manifest = os.path.join(self.root, name, MANIFEST_NAME)
+            if name.startswith('.') or not os.path.isfile(manifest):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                continue
+            try:
+                with open(manifest, 'r', encoding='utf-8') as f:
+                    size = json.load(f).get('size', 0)
+                found.append((os.path.getmtime(manifest), name, size))
+            except Exception:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def compiler_version(self, compiler):
+        """Return the compiler's version banner (probed once, see toolchains.py)"""
+        return toolchains.version(compiler)
+    
+    def make_key(self, language, code, compiler, flags=()):
+        """Hash of language, source text, compiler version and flags"""
+        digest = hashlib.sha256()
+        for part in (language, compiler, self.compiler_version(compiler), '\0'.join(flags), code):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def lookup(self, key):
+        """Return the entry directory for key, or None on a miss"""
+        path = os.path.join(self.root, key)
+        with self.lock:
+            if key not in self.entries:
+                manifest = os.path.join(path, MANIFEST_NAME)
+                if not os.path.isfile(manifest):
+                    self.misses += 1
+                    return None
+                # Stored by another process sharing this cache directory
+                self.entries[key] = _directory_size(path)
+                self.total_bytes += self.entries[key]
+
+            if not os.path.isdir(path):
+                self.total_bytes -= self.entries.pop(key)
+                self.misses += 1
+                return None
+
+            # The manifest's mtime marks the entry in use (see _evict), also
+            # for other processes sharing this cache directory
+            try:
+                os.utime(os.path.join(path, MANIFEST_NAME))
+            except OSError:
+                self.total_bytes -= self.entries.pop(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return path
+
+    def create_staging(self, key):
+        """Create a private directory to build an entry into"""
+        path = os.path.join(self.staging_root, f'{key}-{uuid.uuid4().hex[:8]}')
+        return ensure_directory(path)
+
+    def discard(self, staging):
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def store(self, key, staging, language=''):
+        """Publish a staging directory as the entry for key"""
+        size = _directory_size(staging)
+        with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump({'language': language, 'size': size, 'created': time.time()}, f)
+
+        path = os.path.join(self.root, key)
+        with self.lock:
+            try:
+                os.rename(staging, path)
+            except OSError:
+                # Another run stored the same key first
+                self.discard(staging)
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                return path
+
+            self.entries[key] = size
+            self.total_bytes += size
+            self._evict(keep=key)
+        return path
+
+    def _evict(self, keep=None):
+        """
+        Drop least recently used entries until under the size bound
+        Entries looked up or stored within in_use_seconds are skipped, since
+        a run may still be executing from them; the bound can then be
+        exceeded until they age out.
+        """
+        now = time.time()
+        for key in list(self.entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep or self._in_use(key, now):
+                continue
+            self.total_bytes -= self.entries.pop(key)
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
+    def _in_use(self, key, now):
+        try:
+            return now - os.path.getmtime(os.path.join(self.root, key, MANIFEST_NAME)) < self.in_use_seconds
+        except OSError:
+            return False
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+def _pid_alive(name):
+    """True if the staging directory's owning process may still be running"""
+    if os.name == 'nt' or not name.isdigit():
+        return True  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(int(name), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
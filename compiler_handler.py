@@ -1,182 +1,190 @@
 """
 Compiler and Code Execution Handler
+Dispatches each run to its language backend (see languages.py)
 """
 import subprocess
 import os
-import platform
-from config import TEMP_BUILD_DIR, COMPILER_PATHS
-from utils import ensure_directory, get_bash_path, get_language_extension
+import threading
+import time
+from config import TEMP_BUILD_DIR, SYNTAX_CHECK_TIMEOUT
+from utils import ensure_directory, kill_process_tree, new_process_group_kwargs
+from compile_cache import CompileCache
+from pch_cache import PrecompiledHeaders
+from java_daemon import JavaCompileServer
+from fixture_store import FixtureStore
+from extensions_manager import extensions_manager
+from languages import language_registry
 
-class CompilerHandler:
-    def __init__(self):
-        self.temp_dir = ensure_directory(TEMP_BUILD_DIR)
-        
-    def compile_and_run(self, code, language):
-        """
-        Compile (if needed) and return command to run
-        Returns: (success, command, error_message)
-        """
-        try:
-            if language == 'python':
-                return self._handle_python(code)
-            elif language == 'javascript':
-                return self._handle_javascript(code)
-            elif language == 'lua':
-                return self._handle_lua(code)
-            elif language == 'sql':
-                return self._handle_sql(code)
-            elif language == 'bash':
-                return self._handle_bash(code)
-            elif language == 'cpp':
-                return self._handle_cpp(code)
-            elif language == 'csharp':
-                return self._handle_csharp(code)
-            elif language == 'java':
-                return self._handle_java(code)
-            elif language == 'go':
-                return self._handle_go(code)
-            elif language == 'rust':
-                return self._handle_rust(code)
-            elif language == 'zig':
-                return self._handle_zig(code)
-            elif language == 'scala':
-                return self._handle_scala(code)
-            else:
-                return False, None, f"Language '{language}' not supported"
-        except Exception as e:
-            return False, None, str(e)
-    
-    def _write_file(self, filename, content):
-        """Write content to file"""
-        path = os.path.join(self.temp_dir, filename)
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return path
+class BuildContext:
+    """Per-run state and build helpers handed to the language backends"""
     
-    def _handle_python(self, code):
-        path = self._write_file('script.py', code)
-        return True, ['python', '-u', path], None
+    def __init__(self, handler, code, workdir, on_output=None, cancel_event=None, metrics=None):
+        self.handler = handler  # CompilerHandler: compile cache and shared toolchain services
+        self.code = code
+        self.workdir = workdir
+        self.on_output = on_output  # callback(text) for live compiler output
+        self.cancel_event = cancel_event or threading.Event()
+        self.metrics = metrics if metrics is not None else {}  # compile_seconds, cache_hit
     
-    def _handle_javascript(self, code):
-        path = self._write_file('script.js', code)
-        return True, ['node', path], None
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
     
-    def _handle_lua(self, code):
-        path = self._write_file('script.lua', code)
-        return True, ['lua', path], None
+    def emit(self, text):
+        if self.on_output and text:
+            self.on_output(text)
     
-    def _handle_bash(self, code):
-        path = self._write_file('script.sh', code)
-        bash_path = get_bash_path()
-        
-        if not bash_path:
-            return False, None, "Bash not found. Install Git Bash or WSL."
-        
-        if platform.system() == 'Windows' and 'System32' in bash_path:
-            # WSL - convert path
-            wsl_path = path.replace('\\', '/').replace('C:', '/mnt/c')
-            return True, [bash_path, '-c', f'bash {wsl_path}'], None
-        else:
-            return True, [bash_path, path], None
+    def add_compile_seconds(self, seconds):
+        self.metrics['compile_seconds'] = (self.metrics.get('compile_seconds') or 0) + seconds
     
-    def _handle_sql(self, code):
-        """SQLite in-memory database"""
-        sql_runner = f'''
-import sqlite3
-import sys
-
-try:
-    con = sqlite3.connect(":memory:")
-    cur = con.cursor()
-    script = """{code}"""
-    cur.executescript(script)
-    
-    # If there's a SELECT, fetch and display results
-    if "SELECT" in script.upper():
-        for row in cur.fetchall():
-            print(row)
+    def write_file(self, filename, content):
+        """Write content to file inside the run's workspace"""
+        path = os.path.join(self.workdir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
     
-    con.commit()
-except Exception as e:
-    print(f"SQL Error: {{e}}")
-    sys.exit(1)
-finally:
-    con.close()
-'''
-        path = self._write_file('sql_runner.py', sql_runner)
-        return True, ['python', '-u', path], None
+    def compile_result(self, return_code, output, ok_codes=(0,)):
+        """
+        Outcome of a finished compile whose output was already emitted
+        Returns: (success, error_message)
+        """
+        if self.cancelled:
+            return False, "Compilation cancelled"
+        if return_code not in ok_codes:
+            if self.on_output:
+                return False, f"Compilation Error (exit code {return_code})"
+            return False, f"Compilation Error:\n{output}"
+        return True, None
     
-    def _handle_cpp(self, code):
-        src = self._write_file('main.cpp', code)
-        exe = os.path.join(self.temp_dir, 'main.exe')
-        
-        # Compile
-        result = subprocess.run(
-            ['g++', src, '-o', exe],
-            capture_output=True,
-            text=True
+    def run_compiler(self, cmd, env=None, ok_codes=(0,)):
+        """
+        Run a compiler, streaming its merged stdout/stderr to the client
+        ok_codes: exit codes that still count as a successful build
+        Returns: (success, error_message)
+        """
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=self.workdir,
+            env=env,
+            **new_process_group_kwargs()
         )
         
-        if result.returncode != 0:
-            return False, None, f"Compilation Error:\n{result.stderr}"
+        def watch_cancel():
+            # Kill the whole group: g++/rustc leave worker children holding the pipe
+            while process.poll() is None:
+                if self.cancel_event.wait(0.1):
+                    kill_process_tree(process)
+                    return
         
-        return True, [exe], None
-    
-    def _handle_csharp(self, code):
-        src = self._write_file('Program.cs', code)
-        exe = os.path.join(self.temp_dir, 'Program.exe')
+        threading.Thread(target=watch_cancel, daemon=True).start()
         
-        # Compile
-        result = subprocess.run(
-            ['csc', f'/out:{exe}', src],
-            capture_output=True,
-            text=True
+        output = []
+        for line in process.stdout:
+            output.append(line)
+            self.emit(line)
+        process.stdout.close()
+        return_code = process.wait()
+        self.add_compile_seconds(time.perf_counter() - started)
+        return self.compile_result(return_code, ''.join(output), ok_codes)
+    
+    def run_check(self, cmd, env=None, timeout=SYNTAX_CHECK_TIMEOUT):
+        """
+        Run a check-only compiler pass, killed on cancel or after timeout seconds
+        Returns: (exit code, merged output); exit code None if it did not finish
+        """
+        deadline = time.monotonic() + timeout
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            cwd=self.workdir,
+            env=env,
+            **new_process_group_kwargs()
         )
         
-        if result.returncode != 0:
-            return False, None, f"Compilation Error:\n{result.stdout}"
+        def watch():
+            while process.poll() is None:
+                if self.cancel_event.wait(0.05) or time.monotonic() > deadline:
+                    kill_process_tree(process)
+                    return
+        
+        threading.Thread(target=watch, daemon=True).start()
         
-        return True, [exe], None
+        output = process.stdout.read()
+        process.stdout.close()
+        return_code = process.wait()
+        if self.cancelled or time.monotonic() > deadline:
+            return None, output
+        return return_code, output
     
-    def _handle_java(self, code):
-        src = self._write_file('Main.java', code)
+    def build_cached(self, backend, compiler, flags, build):
+        """
+        Reuse a cached build of the code or run build(out_dir) on a miss
+        build returns: (success, error_message)
+        Returns: (success, artifact_dir, error_message)
+        """
+        cache = self.handler.cache
+        if not cache.enabled or not backend.cacheable:
+            self.emit(f"Compiling with {compiler}...\n")
+            success, error = build(self.workdir)
+            return success, self.workdir, error
         
-        # Compile
-        result = subprocess.run(
-            ['javac', src],
-            capture_output=True,
-            text=True
-        )
+        key = cache.make_key(backend.name, self.code, compiler, flags)
+        entry = cache.lookup(key)
+        self.metrics['cache_hit'] = entry is not None
+        if entry:
+            return True, entry, None
         
-        if result.returncode != 0:
-            return False, None, f"Compilation Error:\n{result.stderr}"
+        self.emit(f"Compiling with {compiler}...\n")
+        staging = cache.create_staging(key)
+        success, error = build(staging)
+        if not success:
+            cache.discard(staging)
+            return False, None, error
         
-        return True, ['java', '-cp', self.temp_dir, 'Main'], None
-    
-    def _handle_go(self, code):
-        src = self._write_file('main.go', code)
-        return True, ['go', 'run', src], None
-    
-    def _handle_rust(self, code):
-        src = self._write_file('main.rs', code)
-        exe = os.path.join(self.temp_dir, 'main.exe')
+        return True, cache.store(key, staging, backend.name), None
+
+
+class CompilerHandler:
+    def __init__(self):
+        self.temp_dir = ensure_directory(TEMP_BUILD_DIR)
+        self.cache = CompileCache()
+        self.pch = PrecompiledHeaders()
+        self.javac_server = JavaCompileServer()
+        self.fixtures = FixtureStore()
+        self.extensions = extensions_manager
+        self.languages = language_registry
         
-        # Compile
-        result = subprocess.run(
-            ['rustc', src, '-o', exe],
-            capture_output=True,
-            text=True
-        )
+    def compile_and_run(self, code, language, workdir=None, on_output=None, cancel_event=None,
+                        metrics=None):
+        """
+        Compile (if needed) and return command to run
+        Sources are written to workdir (default: the shared temp dir)
+        Compiler output is streamed to on_output; setting cancel_event
+        kills an in-progress compile. If given, the metrics dict receives
+        compile_seconds and cache_hit.
+        Returns: (success, command, error_message)
+        """
+        backend = self.languages.get(language)
+        if backend is None:
+            return False, None, f"Language '{language}' not supported"
         
-        if result.returncode != 0:
-            return False, None, f"Compilation Error:\n{result.stderr}"
+        # Fail before writing or building anything (lookups are memoized)
+        missing = backend.missing_toolchain()
+        if missing:
+            return False, None, missing
         
-        return True, [exe], None
-    
-    def _handle_zig(self, code):
-        src = self._write_file('main.zig', code)
-        return True, ['zig', 'run', src], None
-    
-    def _handle_scala(self, code):
-        src = self._write_file('Main.scala', code)
-        return True, ['scala', src], None
\ No newline at end of file
+        ctx = BuildContext(self, code, workdir or self.temp_dir, on_output, cancel_event, metrics)
+        try:
+            return backend.prepare(ctx)
+        except Exception as e:
+            return False, None, str(e)
@@ -11,31 +11,148 @@ SECRET_KEY = 'noc_secret_key_2024'
 FLASK_PORT = 5000
 DEBUG_MODE = False
 
+# Desktop Launch (`python main.py`)
+STARTUP_TIMEOUT = 30  # seconds the window waits for the server to accept connections
+STARTUP_POLL_INTERVAL = 0.02  # seconds between readiness checks
+
 # Paths
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
 STATIC_DIR = os.path.join(BASE_DIR, 'static')
 TEMP_BUILD_DIR = os.path.join(BASE_DIR, 'temp_build')
 EXTENSIONS_DIR = os.path.join(BASE_DIR, 'extensions')
+SESSIONS_DIR = os.path.join(TEMP_BUILD_DIR, 'sessions')
+
+# Compile Cache (compiled artifacts reused across runs of identical code)
+COMPILE_CACHE_ENABLED = True
+COMPILE_CACHE_DIR = os.path.join(TEMP_BUILD_DIR, 'cache')
+COMPILE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+COMPILE_CACHE_IN_USE_SECONDS = 300  # entries looked up this recently are kept (runs execute from them)
+
+# C/C++ Builds
+CPP_DEFAULT_FLAGS = ['-std=c++17', '-O2']  # used when cpp_extension is not loaded
+C_DEFAULT_FLAGS = ['-std=c11', '-O2']
+CPP_PCH_ENABLED = True  # precompile the system headers programs start with
+CPP_PCH_DIR = os.path.join(TEMP_BUILD_DIR, 'pch')
+CPP_PCH_MAX_SETS = 8  # include sets kept (a <bits/stdc++.h> .gch is ~100 MB)
+CPP_CCACHE_ENABLED = False  # wrap g++ in ccache when it is installed
+
+# Toolchain Caches (shared by every build; kept between server restarts)
+TOOLCHAIN_CACHE_DIR = os.path.join(TEMP_BUILD_DIR, 'toolchains')
+GO_CACHE_DIR = os.environ.get('GOCACHE') or os.path.join(TOOLCHAIN_CACHE_DIR, 'go-build')
+ZIG_CACHE_DIR = os.path.join(TOOLCHAIN_CACHE_DIR, 'zig')
+SCALA_COMPILE_SERVER = True  # compile with the resident `fsc` daemon when installed
+
+# Toolchain Discovery (compiler paths and versions, probed at startup)
+TOOLCHAIN_PROBE_CACHE = os.path.join(TOOLCHAIN_CACHE_DIR, 'probe.json')
+TOOLCHAIN_PROBE_WORKERS = 8  # executables probed at once
+TOOLCHAIN_VERSION_TIMEOUT = 15  # seconds a version banner may take
+
+# Java Daemon (resident javac compile server; warm JVMs come from the warm pool)
+JAVA_DAEMON_ENABLED = True
+JAVA_DAEMON_DIR = os.path.join(TOOLCHAIN_CACHE_DIR, 'java')
+JAVA_DAEMON_MAX_COMPILES = 500  # recycle the server JVM after this many compiles
+JAVA_DAEMON_COMPILE_TIMEOUT = 60  # seconds before an unresponsive server is restarted
 
-# Language Support
-SUPPORTED_LANGUAGES = [
-    'python', 'cpp', 'csharp', 'java', 'javascript', 
-    'sql', 'rust', 'lua', 'bash', 'zig', 'scala', 'go'
-]
-
-# Compiler Paths (Windows)
-COMPILER_PATHS = {
-    'cpp': 'g++',
-    'csharp': 'csc',
-    'java': 'javac',
-    'rust': 'rustc',
-    'go': 'go',
-    'zig': 'zig',
-    'scala': 'scala',
-    'bash': r'C:\Program Files\Git\bin\bash.exe',  # Git Bash on Windows
-    'bash_wsl': r'C:\Windows\System32\bash.exe'     # WSL
+# SQL (sql_engine.py on in-memory SQLite)
+SQL_MAX_ROWS = 1000  # rows printed per result set
+SQL_FIXTURES_DIR = os.path.join(BASE_DIR, 'sql_fixtures')  # <name>/v<N>.sql sources
+SQL_FIXTURE_CACHE_DIR = os.path.join(TEMP_BUILD_DIR, 'fixtures')  # built images
+
+# Execution Scheduler (admission control for compile + run jobs)
+MAX_CONCURRENT_RUNS = os.cpu_count() or 4  # for the host: divided between server.py workers
+MAX_QUEUED_RUNS = 200
+QUEUE_POSITION_INTERVAL = 1.0  # seconds between position updates to the whole queue
+
+# Warm Interpreter Pool (idle pre-started interpreters per language)
+WARM_POOL_ENABLED = True
+WARM_POOL_SIZES = {
+    'python': 2,
+    'node': 1,
+    'lua': 1,
+    'java': 1  # JVMs running java_daemon's launcher (needs JAVA_DAEMON_ENABLED)
 }
+WARM_POOL_DIR = os.path.join(TEMP_BUILD_DIR, 'warm')
+
+# Output Streaming (program output is coalesced into frames)
+OUTPUT_FRAME_INTERVAL = 0.016  # seconds
+OUTPUT_FRAME_MAX_BYTES = 64 * 1024
+
+# Output Limits (beyond the caps only the tail of the output is kept)
+OUTPUT_MAX_BYTES = 1024 * 1024
+OUTPUT_MAX_LINES = 20000
+OUTPUT_TAIL_BYTES = 16 * 1024
+OUTPUT_ACK_WINDOW = 8  # unacknowledged frames before reading pauses
+OUTPUT_ACK_TIMEOUT = 30  # seconds to wait for a lagging client
+
+# Resource Limits for executed programs (None = unlimited)
+# memory_bytes is an address-space rlimit unless CGROUP_ROOT is set, so
+# runtimes that reserve large virtual ranges (JVM, Go, Node, .NET) skip it
+# in their language backend's profile (languages.py). Entries named after a
+# language here override that profile.
+# max_processes is the cgroup's pids.max when CGROUP_ROOT is set, otherwise
+# RLIMIT_NPROC: that counts every process and thread of the server's user
+# (run the server as a dedicated user) and does not apply to root.
+RESOURCE_LIMITS_ENABLED = True
+RESOURCE_LIMITS = {
+    'default': {
+        'cpu_seconds': 10,
+        'memory_bytes': 512 * 1024 * 1024,
+        'file_size_bytes': 16 * 1024 * 1024,
+        'max_processes': 256,
+        'wall_seconds': 120
+    }
+}
+CGROUP_ROOT = None  # e.g. '/sys/fs/cgroup/noc' (writable cgroup v2 directory)
+
+# Run Metrics (per-run telemetry kept in memory)
+RUN_METRICS_HISTORY = 1000
+RSS_SAMPLE_INTERVAL = 0.025  # seconds between peak memory samples (Linux)
+
+# Batch Execution (REST /api/batch and `python batch_runner.py`)
+BATCH_DIR = os.path.join(TEMP_BUILD_DIR, 'batch')
+BATCH_MAX_WORKERS = os.cpu_count() or 4  # processes in the batch pool (CLI)
+BATCH_SERVER_SHARE = 0.25  # of a server's run slots given to its /api/batch pool (at least one)
+BATCH_MAX_JOBS = 5000  # jobs accepted per request
+BATCH_OUTPUT_LIMIT = 64 * 1024  # bytes of stdout/stderr kept per result
+
+# Test Cases (Socket.IO `run_tests`: one build, many stdin cases)
+TEST_CASE_PARALLELISM = min(4, os.cpu_count() or 1)  # cases run at once per request
+TEST_CASE_MAX = 100  # cases accepted per request
+TEST_CASE_MAX_TIME_LIMIT = 30  # seconds of CPU time a case may ask for
+
+# Benchmarks (`python benchmark.py`)
+BENCHMARK_PROGRAMS_DIR = os.path.join(BASE_DIR, 'benchmarks')  # <program>/main.<ext>
+BENCHMARK_DIR = os.path.join(TEMP_BUILD_DIR, 'benchmark')  # run workspaces
+BENCHMARK_REGRESSION_THRESHOLD = 0.20  # relative slowdown flagged by --compare
+
+# Production Server (`python server.py`; the desktop app keeps the threading dev server)
+SERVER_ASYNC_MODE = os.environ.get('NOC_SERVER_MODE', 'threading')  # threading, gevent or eventlet
+SERVER_HOST = '0.0.0.0'
+SERVER_WORKERS = int(os.environ.get('NOC_SERVER_WORKERS', '1'))  # processes sharing the port
+SERVER_MESSAGE_QUEUE = os.environ.get('NOC_MESSAGE_QUEUE')  # e.g. redis://localhost:6379/0
+SERVER_BACKLOG = 4096  # pending connections per listening socket
+PROCESS_POLL_INTERVAL = 0.01  # seconds between exit checks on a cooperative server
+
+# Load Testing (`python loadtest.py`)
+LOADTEST_PORT = 5099  # port of the server the load test spawns
+LOADTEST_MAX_ERROR_RATE = 0.01  # failed or dropped runs a sustainable stage may have
+LOADTEST_SLO_SECONDS = 2.0  # p95 run latency a sustainable stage must stay under
+
+# Live Diagnostics (extension analysis of open editor buffers)
+DIAGNOSTICS_DEBOUNCE = 0.15  # seconds without edits before a document is analysed
+DIAGNOSTICS_WORKERS = 2  # documents analysed at once
+DIAGNOSTICS_LINE_CACHE_SIZE = 50000  # per-line results kept per extension and language
+DIAGNOSTICS_MAX_LINES = 100000  # larger documents are not analysed
+DIAGNOSTICS_MAX_DOCUMENTS = 32  # open documents per session
+
+# Syntax Check (compiler check-only pass, e.g. g++ -fsyntax-only, run when the editor is idle)
+SYNTAX_CHECK_ENABLED = True
+SYNTAX_CHECK_IDLE = 0.75  # seconds without edits before a document is checked
+SYNTAX_CHECK_WORKERS = 2  # compiler checks running at once
+SYNTAX_CHECK_TIMEOUT = 20  # seconds before a check is abandoned
+SYNTAX_CHECK_CACHE_SIZE = 500  # results kept, keyed by source hash
+SYNTAX_CHECK_DIR = os.path.join(TEMP_BUILD_DIR, 'check')
 
 # AI API Configuration (to be filled by user)
 AI_CONFIG = {
@@ -0,0 +1,358 @@
+"""
+Live Diagnostics
+Runs extension analysis on editor buffers while the user types
+
+Clients open a document with its full text, then send Monaco edits
+(`diagnostics_change`) instead of the whole buffer. Edits are applied to
+the server's line list and analysis is debounced: it runs once the
+document has been quiet for DIAGNOSTICS_DEBOUNCE seconds, on a worker
+pool, never twice at once for the same document. Results for a version the
+user has already typed past are dropped.
+
+Extensions that implement get_line_diagnostics have their per-line results
+cached by line text, so a keystroke re-analyses only the lines it touched;
+get_document_diagnostics still sees the whole buffer. Extensions that only
+override get_diagnostics get the joined buffer on every pass.
+
+With a SyntaxChecker, documents whose language has a check mode are also
+compiled check-only (syntax_check.py) once the editor has been idle for
+SYNTAX_CHECK_IDLE seconds; an edit cancels a check still running. Results
+are sent with source 'extensions' or 'compiler' so each replaces only its
+own markers.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    DIAGNOSTICS_DEBOUNCE, DIAGNOSTICS_WORKERS, DIAGNOSTICS_LINE_CACHE_SIZE,
+    DIAGNOSTICS_MAX_LINES, DIAGNOSTICS_MAX_DOCUMENTS, SYNTAX_CHECK_IDLE, SYNTAX_CHECK_WORKERS
+)
+from extensions_manager import BaseExtension
+import metrics as prom
+
+
+class ResyncNeeded(Exception):
+    """The client's edit does not apply to the server's copy; it must resend the text"""
+
+
+def apply_change(lines, change):
+    """
+    Apply one Monaco edit to lines in place
+    change: {'range': {startLineNumber, startColumn, endLineNumber, endColumn}, 'text'}
+    (1-based, end exclusive, as in IModelContentChange)
+    """
+    try:
+        r = change['range']
+        start_line, start_col = int(r['startLineNumber']), int(r['startColumn'])
+        end_line, end_col = int(r['endLineNumber']), int(r['endColumn'])
+        text = change['text']
+    except (KeyError, TypeError, ValueError):
+        raise ResyncNeeded('malformed change')
+    if not isinstance(text, str) or not 1 <= start_line <= end_line <= len(lines):
+        raise ResyncNeeded('range outside the document')
+    if start_col < 1 or end_col < 1 or start_col > len(lines[start_line - 1]) + 1 \
+            or end_col > len(lines[end_line - 1]) + 1:
+        raise ResyncNeeded('column outside the line')
+
+    prefix = lines[start_line - 1][:start_col - 1]
+    suffix = lines[end_line - 1][end_col - 1:]
+    replacement = (prefix + text.replace('\r\n', '\n') + suffix).split('\n')
+    lines[start_line - 1:end_line] = replacement
+
+
+def incremental(extension):
+    """True if the extension analyses line by line (see BaseExtension)"""
+    return type(extension).get_diagnostics is BaseExtension.get_diagnostics
+
+
+class LineCache:
+    """LRU of line text -> that line's diagnostics, for one extension and language"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, texts):
+        """Cached results for the texts that have one (refreshes their recency)"""
+        found = {}
+        with self.lock:
+            for text in texts:
+                result = self.entries.get(text)
+                if result is not None:
+                    self.entries.move_to_end(text)
+                    found[text] = result
+        return found
+
+    def store(self, results):
+        with self.lock:
+            self.entries.update(results)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+class Document:
+    def __init__(self, sid, doc_id, language, code, version, checkable=False):
+        self.sid = sid
+        self.doc_id = doc_id
+        self.language = language
+        self.lines = code.replace('\r\n', '\n').split('\n')
+        self.version = version
+        self.due = None  # monotonic time analysis should start (None = nothing pending)
+        self.running = False
+        self.checkable = checkable  # has a compiler check mode
+        self.check_due = None  # monotonic time the compiler check should start
+        self.check_cancel = None  # Event of the running compiler check
+        self.closed = False
+
+
+class DiagnosticsService:
+    def __init__(self, extensions, on_result, checker=None, debounce=DIAGNOSTICS_DEBOUNCE,
+                 workers=DIAGNOSTICS_WORKERS, line_cache_size=DIAGNOSTICS_LINE_CACHE_SIZE,
+                 check_idle=SYNTAX_CHECK_IDLE, check_workers=SYNTAX_CHECK_WORKERS):
+        """
+        extensions: ExtensionsManager providing the analysers
+        on_result: callback(sid, payload) delivering a 'diagnostics' message
+        checker: SyntaxChecker for compiler checks on idle (None = heuristics only)
+        """
+        self.extensions = extensions
+        self.on_result = on_result
+        self.checker = checker
+        self.debounce = debounce
+        self.check_idle = check_idle
+        self.line_cache_size = line_cache_size
+        self.documents = {}  # (sid, doc_id) -> Document
+        self.line_caches = {}  # (extension name, language) -> LineCache
+        self.cond = threading.Condition()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='noc-diagnostics')
+        # Checks mostly wait on compiler processes: separate workers keep analysis responsive
+        self.check_pool = ThreadPoolExecutor(max_workers=check_workers, thread_name_prefix='noc-syntax-check')
+        self.stats_data = {
+            'analyses': 0,
+            'superseded': 0,  # finished after the document changed again
+            'checks': 0,
+            'checks_cancelled': 0,
+            'resyncs': 0,
+            'lines_analysed': 0,
+            'lines_cached': 0,
+            'analysis_ms_total': 0.0
+        }
+        self.thread = None
+
+    def languages(self):
+        """Languages at least one loaded extension diagnoses or the compiler can check"""
+        names = set()
+        for extension in self.extensions.get_all_extensions().values():
+            names.update(extension.get_diagnostic_languages())
+        if self.checker is not None:
+            names.update(name for name in self.checker.languages.names() if self.checker.supports(name))
+        return sorted(names)
+
+    # Document lifecycle (called from Socket.IO handlers)
+
+    def open(self, sid, doc_id, language, code, version):
+        """Start tracking a document (replaces an open one with the same id)"""
+        checkable = self.checker is not None and self.checker.supports(language)
+        with self.cond:
+            key = (sid, doc_id)
+            if key not in self.documents and \
+                    sum(1 for owner, _ in self.documents if owner == sid) >= DIAGNOSTICS_MAX_DOCUMENTS:
+                return False
+            old = self.documents.get(key)
+            if old:
+                self._close(old)
+            document = Document(sid, doc_id, language, code, version, checkable)
+            self.documents[key] = document
+            self._schedule(document, immediate=True)
+            return True
+
+    def change(self, sid, doc_id, base_version, version, changes):
+        """
+        Apply edits made to base_version, producing version
+        Raises ResyncNeeded when they cannot be applied (unknown document,
+        missed edit, bad range); the client then reopens with its full text
+        """
+        with self.cond:
+            document = self.documents.get((sid, doc_id))
+            try:
+                if document is None or document.version != base_version:
+                    raise ResyncNeeded('document out of date')
+                lines = list(document.lines)
+                for change in changes:
+                    apply_change(lines, change)
+            except ResyncNeeded:
+                self.stats_data['resyncs'] += 1
+                raise
+            document.lines = lines
+            document.version = version
+            self._schedule(document)
+
+    def close(self, sid, doc_id=None):
+        """Stop tracking one document, or every document of the session"""
+        with self.cond:
+            for key in [key for key in self.documents if key[0] == sid and doc_id in (None, key[1])]:
+                self._close(self.documents.pop(key))
+
+    def _close(self, document):
+        document.closed = True
+        if document.check_cancel is not None:
+            document.check_cancel.set()
+
+    def _schedule(self, document, immediate=False):
+        """
+        Analyse the document once it has been quiet for the debounce delay,
+        and compiler-check it once idle; a running check is stale (holds cond)
+        """
+        now = time.monotonic()
+        document.due = now + (0 if immediate else self.debounce)
+        if document.checkable:
+            document.check_due = now + (0 if immediate else self.check_idle)
+            if document.check_cancel is not None:
+                document.check_cancel.set()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._debounce_loop, name='noc-diagnostics-debounce',
+                                           daemon=True)
+            self.thread.start()
+        self.cond.notify()
+
+    # Analysis
+
+    def _debounce_loop(self):
+        while True:
+            with self.cond:
+                now = time.monotonic()
+                pending = [d.due for d in self.documents.values() if d.due is not None and not d.running]
+                pending += [d.check_due for d in self.documents.values()
+                            if d.check_due is not None and d.check_cancel is None]
+                if not pending or min(pending) > now:
+                    self.cond.wait(min(pending) - now if pending else None)
+                    continue
+                jobs = []
+                for document in self.documents.values():
+                    if document.due is not None and document.due <= now and not document.running:
+                        document.due = None
+                        document.running = True
+                        jobs.append((self.pool, self._run, document, document.version, document.lines))
+                    if document.check_due is not None and document.check_due <= now \
+                            and document.check_cancel is None:
+                        document.check_due = None
+                        document.check_cancel = threading.Event()
+                        jobs.append((self.check_pool, self._check, document, document.version, document.lines))
+            for pool, job, *args in jobs:
+                pool.submit(job, *args)
+
+    def _run(self, document, version, lines):
+        try:
+            started = time.perf_counter()
+            if len(lines) > DIAGNOSTICS_MAX_LINES:
+                diagnostics, skipped = [], True
+            else:
+                diagnostics, skipped = self.analyse(document.language, lines), False
+            elapsed = time.perf_counter() - started
+            prom.DIAGNOSTICS_SECONDS.labels(language=document.language).observe(elapsed)
+            with self.cond:
+                self.stats_data['analyses'] += 1
+                self.stats_data['analysis_ms_total'] += elapsed * 1000
+                current = not document.closed and document.version == version
+                if not current:
+                    self.stats_data['superseded'] += 1
+            if current:
+                self.on_result(document.sid, {
+                    'doc_id': document.doc_id,
+                    'version': version,
+                    'source': 'extensions',
+                    'diagnostics': diagnostics,
+                    'skipped': skipped,
+                    'elapsed_ms': round(elapsed * 1000, 2)
+                })
+        except Exception as e:
+            print(f"Diagnostics: analysis of {document.doc_id} failed: {e}")
+        finally:
+            with self.cond:
+                document.running = False
+                self.cond.notify()
+
+    def _check(self, document, version, lines):
+        try:
+            if len(lines) > DIAGNOSTICS_MAX_LINES:
+                return
+            started = time.perf_counter()
+            diagnostics = self.checker.check('\n'.join(lines), document.language, document.check_cancel)
+            elapsed = time.perf_counter() - started
+            with self.cond:
+                if diagnostics is None:
+                    self.stats_data['checks_cancelled'] += 1
+                    return
+                self.stats_data['checks'] += 1
+                current = not document.closed and document.version == version
+                if not current:
+                    self.stats_data['superseded'] += 1
+            if current:
+                self.on_result(document.sid, {
+                    'doc_id': document.doc_id,
+                    'version': version,
+                    'source': 'compiler',
+                    'diagnostics': diagnostics,
+                    'skipped': False,
+                    'elapsed_ms': round(elapsed * 1000, 2)
+                })
+        except Exception as e:
+            print(f"Diagnostics: syntax check of {document.doc_id} failed: {e}")
+        finally:
+            with self.cond:
+                document.check_cancel = None
+                self.cond.notify()
+
+    def analyse(self, language, lines):
+        """Diagnostics of every extension that handles language, sorted by position"""
+        diagnostics = []
+        code = None
+        for name, extension in self.extensions.get_all_extensions().items():
+            if language not in extension.get_diagnostic_languages():
+                continue
+            try:
+                if code is None:
+                    code = '\n'.join(lines)
+                if not incremental(extension):
+                    diagnostics.extend(extension.get_diagnostics(code, language))
+                    continue
+                diagnostics.extend(self._line_diagnostics(name, extension, language, lines))
+                diagnostics.extend(extension.get_document_diagnostics(code, language))
+            except Exception as e:
+                print(f"Diagnostics: {name} failed: {e}")
+        diagnostics.sort(key=lambda d: (d.get('line', 0), d.get('column', 0)))
+        return diagnostics
+
+    def _line_diagnostics(self, name, extension, language, lines):
+        cache = self.line_caches.get((name, language))
+        if cache is None:
+            cache = self.line_caches.setdefault((name, language), LineCache(self.line_cache_size))
+
+        texts = set(lines)
+        results = cache.lookup(texts)
+        missing = {text: tuple(extension.get_line_diagnostics(text, language))
+                   for text in texts if text not in results}
+        cache.store(missing)
+        results.update(missing)
+        with self.cond:
+            self.stats_data['lines_analysed'] += len(missing)
+            self.stats_data['lines_cached'] += len(texts) - len(missing)
+
+        diagnostics = []
+        for number, text in enumerate(lines, 1):
+            for diagnostic in results[text]:
+                diagnostics.append({'line': number, **diagnostic})
+        return diagnostics
+
+    def stats(self):
+        with self.cond:
+            data = dict(self.stats_data)
+            data['documents'] = len(self.documents)
+        data['analysis_ms_total'] = round(data['analysis_ms_total'], 2)
+        data['line_cache_entries'] = {
+            f'{name}:{language}': len(cache.entries) for (name, language), cache in self.line_caches.items()
+        }
+        if self.checker is not None:
+            data['syntax_check'] = self.checker.stats()
+        return data
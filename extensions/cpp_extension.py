@@ -5,6 +5,8 @@ Provides C/C++ specific features
 from extensions_manager import BaseExtension
 import re
 
+DECLARATION_WITHOUT_SEMICOLON = re.compile(r'(int|float|double|char|bool)\s+\w+\s*=.*[^;{]\s*$')
+
 class CppExtension(BaseExtension):
     def __init__(self):
         super().__init__()
@@ -27,38 +29,38 @@ class CppExtension(BaseExtension):
         # Can add real-time analysis here
         pass
     
-    def get_diagnostics(self, code, language):
-        """Get C/C++ specific diagnostics"""
+    def get_diagnostic_languages(self):
+        return ['cpp', 'c']
+    
+    def get_line_diagnostics(self, line, language):
+        """Get C/C++ diagnostics of a single line"""
         if language not in ['cpp', 'c']:
             return []
         
-        diagnostics = []
-        
-        # Check for common issues
-        lines = code.split('\n')
+        # Check for missing semicolons (basic check)
+        if DECLARATION_WITHOUT_SEMICOLON.search(line.strip()):
+            return [{
+                'column': len(line),
+                'severity': 'error',
+                'message': 'Missing semicolon'
+            }]
+        return []
+    
+    def get_document_diagnostics(self, code, language):
+        """Get C/C++ diagnostics that depend on the whole file"""
+        if language not in ['cpp', 'c'] or 'using namespace std' not in code:
+            return []
         
-        for i, line in enumerate(lines):
-            line_num = i + 1
-            
-            # Check for missing semicolons (basic check)
-            if re.search(r'(int|float|double|char|bool)\s+\w+\s*=.*[^;{]\s*$', line.strip()):
+        # Check for using namespace in headers
+        diagnostics = []
+        for i, line in enumerate(code.split('\n')):
+            if '#include' in line:
                 diagnostics.append({
-                    'line': line_num,
-                    'column': len(line),
-                    'severity': 'error',
-                    'message': 'Missing semicolon'
+                    'line': i + 1,
+                    'column': 1,
+                    'severity': 'warning',
+                    'message': 'Avoid "using namespace std" in header files'
                 })
-            
-            # Check for using namespace in headers
-            if '#include' in line and 'using namespace' in code:
-                if 'using namespace std' in code:
-                    diagnostics.append({
-                        'line': line_num,
-                        'column': 1,
-                        'severity': 'warning',
-                        'message': 'Avoid "using namespace std" in header files'
-                    })
-        
         return diagnostics
     
     def format_code(self, code):
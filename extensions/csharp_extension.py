@@ -5,6 +5,9 @@ Provides C# specific features
 from extensions_manager import BaseExtension
 import re
 
+STATEMENT_KEYWORD = re.compile(r'int|string|var|return|Console')
+LOWERCASE_CLASS_NAME = re.compile(r'class\s+([a-z]\w+)')
+
 class CsharpExtension(BaseExtension):
     def __init__(self):
         super().__init__()
@@ -25,38 +28,35 @@ class CsharpExtension(BaseExtension):
             return
         pass
     
-    def get_diagnostics(self, code, language):
-        """Get C# specific diagnostics"""
+    def get_diagnostic_languages(self):
+        return ['csharp']
+    
+    def get_line_diagnostics(self, line, language):
+        """Get C# diagnostics of a single line"""
         if language != 'csharp':
             return []
         
         diagnostics = []
-        lines = code.split('\n')
         
-        for i, line in enumerate(lines):
-            line_num = i + 1
-            
-            # Check for missing semicolons
-            stripped = line.strip()
-            if stripped and not stripped.endswith((';', '{', '}', '//')):
-                if any(keyword in stripped for keyword in ['int', 'string', 'var', 'return', 'Console']):
-                    if '(' not in stripped or ')' in stripped:
-                        diagnostics.append({
-                            'line': line_num,
-                            'column': len(line),
-                            'severity': 'error',
-                            'message': 'Possible missing semicolon'
-                        })
-            
-            # Check naming conventions
-            class_match = re.search(r'class\s+([a-z]\w+)', line)
-            if class_match:
-                diagnostics.append({
-                    'line': line_num,
-                    'column': line.index(class_match.group(1)),
-                    'severity': 'warning',
-                    'message': f'Class name "{class_match.group(1)}" should start with uppercase (PascalCase)'
-                })
+        # Check for missing semicolons
+        stripped = line.strip()
+        if stripped and not stripped.endswith((';', '{', '}', '//')):
+            if STATEMENT_KEYWORD.search(stripped):
+                if '(' not in stripped or ')' in stripped:
+                    diagnostics.append({
+                        'column': len(line),
+                        'severity': 'error',
+                        'message': 'Possible missing semicolon'
+                    })
+        
+        # Check naming conventions
+        class_match = LOWERCASE_CLASS_NAME.search(line)
+        if class_match:
+            diagnostics.append({
+                'column': class_match.start(1),
+                'severity': 'warning',
+                'message': f'Class name "{class_match.group(1)}" should start with uppercase (PascalCase)'
+            })
         
         return diagnostics
     
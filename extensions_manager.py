@@ -4,15 +4,31 @@ Plugin system for language-specific features
 """
 import os
 import importlib
+import threading
 from config import EXTENSIONS_DIR, DEFAULT_EXTENSIONS, EXTENSIONS_ENABLED
 
 class ExtensionsManager:
     def __init__(self):
         self.extensions = {}
         self.enabled = EXTENSIONS_ENABLED
-        
-        if self.enabled:
-            self._load_extensions()
+        # Extensions are imported on first use, not at startup
+        self._loaded = False
+        self._loading = False
+        self._lock = threading.RLock()
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded or self._loading:
+                return  # loaded meanwhile, or an extension calling back while loading
+            self._loading = True
+            try:
+                if self.enabled:
+                    self._load_extensions()
+            finally:
+                self._loading = False
+                self._loaded = True
     
     def _load_extensions(self):
         """Load all extensions from extensions directory"""
@@ -38,10 +54,12 @@ class ExtensionsManager:
     
     def get_extension(self, name):
         """Get extension by name"""
+        self._ensure_loaded()
         return self.extensions.get(name)
     
     def get_all_extensions(self):
         """Get all loaded extensions"""
+        self._ensure_loaded()
         return self.extensions
     
     def call_extension_method(self, ext_name, method_name, *args, **kwargs):
@@ -81,6 +99,30 @@ class BaseExtension:
     
     def get_diagnostics(self, code, language):
         """Return syntax/semantic diagnostics"""
+        diagnostics = []
+        for i, line in enumerate(code.split('\n')):
+            for diagnostic in self.get_line_diagnostics(line, language):
+                diagnostics.append({'line': i + 1, **diagnostic})
+        diagnostics.extend(self.get_document_diagnostics(code, language))
+        return diagnostics
+    
+    def get_diagnostic_languages(self):
+        """Languages the live diagnostics service (diagnostics.py) asks this extension about"""
+        return []
+    
+    def get_line_diagnostics(self, line, language):
+        """
+        Diagnostics that depend on this line alone: [{'column', 'severity', 'message'}]
+        Results are cached by line text, so they must not depend on other lines
+        """
+        return []
+    
+    def get_document_diagnostics(self, code, language):
+        """Diagnostics that need the whole buffer: [{'line', 'column', 'severity', 'message'}]"""
+        return []
+    
+    def get_language_backends(self):
+        """Return LanguageBackend instances to add (or replace by name)"""
         return []
 
 
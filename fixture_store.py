@@ -0,0 +1,127 @@
+"""
+SQL Fixture Store
+Named, versioned sample databases that SQL runs can start from
+
+Fixture sources live in sql_fixtures/<name>/v<N>.sql. Each is executed
+once into a database image cached under temp_build (rebuilt when the
+source changes); runs then load a private in-memory copy of the image
+(see sql_engine.load_fixture) instead of replaying the setup SQL.
+
+A script selects a fixture with a comment line:
+    -- fixture: northwind        (latest version)
+    -- fixture: northwind@v1
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from config import SQL_FIXTURES_DIR, SQL_FIXTURE_CACHE_DIR
+from utils import ensure_directory
+
+_DIRECTIVE = re.compile(r'^\s*--\s*fixture:\s*([\w-]+)(?:@(v\d+))?\s*$', re.MULTILINE | re.IGNORECASE)
+_VERSION_FILE = re.compile(r'^v(\d+)\.sql$')
+
+
+def parse_directive(code):
+    """
+    The fixture a script asks for
+    Returns: (name, version or None) or None
+    """
+    match = _DIRECTIVE.search(code)
+    if not match:
+        return None
+    return match.group(1).lower(), match.group(2).lower() if match.group(2) else None
+
+
+class FixtureStore:
+    def __init__(self, source_dir=SQL_FIXTURES_DIR, cache_dir=SQL_FIXTURE_CACHE_DIR):
+        self.source_dir = source_dir
+        self.cache_dir = ensure_directory(cache_dir)
+        self.lock = threading.Lock()
+        self.builds = 0
+
+    def versions(self, name):
+        """Available versions of a fixture, oldest first"""
+        directory = os.path.join(self.source_dir, name)
+        if not os.path.isdir(directory):
+            return []
+        numbers = sorted(
+            int(match.group(1)) for match in map(_VERSION_FILE.match, os.listdir(directory)) if match
+        )
+        return [f'v{number}' for number in numbers]
+
+    def list(self):
+        """Every fixture with its versions and the first line of its description"""
+        if not os.path.isdir(self.source_dir):
+            return []
+        fixtures = []
+        for name in sorted(os.listdir(self.source_dir)):
+            versions = self.versions(name)
+            if not versions:
+                continue
+            fixtures.append({
+                'name': name,
+                'versions': versions,
+                'latest': versions[-1],
+                'description': self._description(os.path.join(self.source_dir, name, versions[-1] + '.sql'))
+            })
+        return fixtures
+
+    @staticmethod
+    def _description(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            first = f.readline().strip()
+        return first[2:].strip() if first.startswith('--') else ''
+
+    def image(self, name, version=None):
+        """
+        Path of the built database image for a fixture version
+        Returns: (path, error_message)
+        """
+        versions = self.versions(name)
+        if not versions:
+            available = ', '.join(fixture['name'] for fixture in self.list()) or 'none'
+            return None, f"Unknown SQL fixture '{name}' (available: {available})"
+        version = version or versions[-1]
+        if version not in versions:
+            return None, f"Fixture '{name}' has no version {version} (available: {', '.join(versions)})"
+
+        source = os.path.join(self.source_dir, name, version + '.sql')
+        with open(source, 'rb') as f:
+            script = f.read()
+        digest = hashlib.sha256(script).hexdigest()[:12]
+        prefix = f'{name}-{version}-'
+        path = os.path.join(self.cache_dir, f'{prefix}{digest}.db')
+
+        with self.lock:
+            if os.path.isfile(path):
+                return path, None
+            error = self._build(script.decode('utf-8'), path)
+            if error:
+                return None, f"Fixture '{name}@{version}' failed to build: {error}"
+            self.builds += 1
+            for stale in os.listdir(self.cache_dir):
+                if stale.startswith(prefix) and stale != os.path.basename(path):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, stale))
+                    except OSError:
+                        pass
+        return path, None
+
+    def _build(self, script, path):
+        """Execute the setup script into a new image file (atomic rename)"""
+        staging = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+        con = sqlite3.connect(staging)
+        try:
+            con.executescript(script)
+            con.commit()
+            con.execute('VACUUM')
+        except sqlite3.Error as e:
+            con.close()
+            os.remove(staging)
+            return str(e)
+        con.close()
+        os.replace(staging, path)  # another process may have built it too: same content
+        return None
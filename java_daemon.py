@@ -0,0 +1,354 @@
+"""
+Java Daemon
+Resident javac compile server and the launcher used by warm JVM workers
+
+The compile server is one long-lived JVM holding javac's compiler API
+(javax.tools) warm, so compiles skip JVM startup and javac class loading.
+It is restarted when it dies, stops answering or has served
+JAVA_DAEMON_MAX_COMPILES requests, and callers fall back to a `javac`
+process whenever it is unavailable or busy with another compile, so
+concurrent Java builds still run in parallel.
+
+Programs still run one per JVM so each run keeps its own stdio, limits
+and kill switch: warm_pool pre-starts JVMs running NocLauncher, which
+waits for a header line and loads the program's classes in a fresh
+URLClassLoader. A JVM cannot change its working directory, so warm_pool
+renames the worker's starting directory to the run's workspace before
+sending the header.
+"""
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from config import (
+    JAVA_DAEMON_ENABLED, JAVA_DAEMON_DIR, JAVA_DAEMON_MAX_COMPILES, JAVA_DAEMON_COMPILE_TIMEOUT
+)
+from utils import ensure_directory, kill_process_tree, new_process_group_kwargs
+from toolchains import toolchains
+
+LAUNCHER_SOURCE = r'''
+import java.io.*;
+import java.lang.reflect.*;
+import java.net.*;
+import java.nio.file.*;
+import java.util.*;
+
+public class NocLauncher {
+    public static void main(String[] args) throws Exception {
+        // Header: cwd \t classpath \t main class \t args...
+        // System.in stays shared with the program, so nothing read ahead is lost
+        ByteArrayOutputStream header = new ByteArrayOutputStream();
+        int b;
+        while ((b = System.in.read()) != -1 && b != '\n') header.write(b);
+        if (b == -1) System.exit(0);
+
+        String[] fields = header.toString("UTF-8").split("\t", -1);
+        // Only a label: the pool made the run's workspace this JVM's working directory
+        System.setProperty("user.dir", fields[0]);
+        String[] entries = fields[1].split(File.pathSeparator);
+        URL[] urls = new URL[entries.length];
+        for (int i = 0; i < entries.length; i++) urls[i] = Paths.get(entries[i]).toUri().toURL();
+
+        // Parent is the platform loader: the program cannot see launcher classes
+        URLClassLoader loader = new URLClassLoader(urls, ClassLoader.getPlatformClassLoader());
+        Thread.currentThread().setContextClassLoader(loader);
+        Method main = Class.forName(fields[2], true, loader).getMethod("main", String[].class);
+        try {
+            main.invoke(null, (Object) Arrays.copyOfRange(fields, 3, fields.length));
+        } catch (InvocationTargetException e) {
+            Throwable cause = e.getCause();
+            trimReflectionFrames(cause);
+            System.err.print("Exception in thread \"main\" ");
+            cause.printStackTrace();
+            System.exit(1);
+        }
+    }
+
+    private static void trimReflectionFrames(Throwable t) {
+        StackTraceElement[] frames = t.getStackTrace();
+        for (int i = 0; i < frames.length; i++) {
+            String name = frames[i].getClassName();
+            if (name.startsWith("jdk.internal.reflect.") || name.startsWith("java.lang.reflect.")
+                    || name.startsWith("sun.reflect.")) {
+                t.setStackTrace(Arrays.copyOf(frames, i));
+                return;
+            }
+        }
+    }
+}
+'''
+
+COMPILE_SERVER_SOURCE = r'''
+import java.io.*;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+import javax.tools.*;
+
+public class NocCompileServer {
+    public static void main(String[] args) throws Exception {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        StandardJavaFileManager files = compiler.getStandardFileManager(null, null, StandardCharsets.UTF_8);
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        OutputStream out = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+
+        // Request: out dir \t source file; response: "<status>\t<n>\n" + n bytes of diagnostics
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] fields = line.split("\t", -1);
+            StringWriter diagnostics = new StringWriter();
+            int status;
+            try {
+                List<String> options = Arrays.asList("-d", fields[0], "-encoding", "UTF-8");
+                Boolean ok = compiler.getTask(diagnostics, files, null, options, null,
+                                              files.getJavaFileObjects(fields[1])).call();
+                status = ok ? 0 : 1;
+                files.flush();
+            } catch (Throwable t) {
+                diagnostics.write(t.toString());
+                status = 2;
+            }
+            byte[] text = diagnostics.toString().getBytes(StandardCharsets.UTF_8);
+            out.write((status + "\t" + text.length + "\n").getBytes(StandardCharsets.UTF_8));
+            out.write(text);
+            out.flush();
+        }
+    }
+}
+'''
+
+_SOURCES = {
+    'NocLauncher.java': LAUNCHER_SOURCE,
+    'NocCompileServer.java': COMPILE_SERVER_SOURCE
+}
+
+_support_lock = threading.Lock()
+_support_dir = None
+
+
+def support_classes():
+    """
+    Directory holding the compiled launcher and compile server, built with
+    javac on first use and reused while the sources and JDK are unchanged
+    Returns: path or None if javac is unavailable
+    """
+    global _support_dir
+    with _support_lock:
+        if _support_dir is not None:
+            return _support_dir or None
+        _support_dir = ''
+        if not toolchains.which('javac'):
+            return None
+
+        digest = hashlib.sha256(toolchains.version('javac').encode('utf-8'))
+        for name in sorted(_SOURCES):
+            digest.update(_SOURCES[name].encode('utf-8'))
+        target = os.path.join(JAVA_DAEMON_DIR, digest.hexdigest()[:16])
+
+        if not os.path.isdir(target):
+            staging = ensure_directory(os.path.join(JAVA_DAEMON_DIR, f'.{uuid.uuid4().hex[:8]}'))
+            paths = []
+            for name, source in _SOURCES.items():
+                path = os.path.join(staging, name)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                paths.append(path)
+            result = subprocess.run(['javac', '-d', staging] + paths, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"Java daemon: cannot build support classes: {result.stderr.strip()[:300]}")
+                shutil.rmtree(staging, ignore_errors=True)
+                return None
+            try:
+                os.rename(staging, target)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)  # built by another process
+
+        _support_dir = target
+        return target
+
+
+def launcher_argv():
+    """JVM arguments for a warm worker, or None if the launcher cannot be built"""
+    classes = support_classes() if JAVA_DAEMON_ENABLED else None
+    if not classes:
+        return None
+    return ['-cp', classes, 'NocLauncher']
+
+
+class JavaCompileServer:
+    def __init__(self, enabled=JAVA_DAEMON_ENABLED, max_compiles=JAVA_DAEMON_MAX_COMPILES,
+                 timeout=JAVA_DAEMON_COMPILE_TIMEOUT):
+        self.enabled = enabled and bool(toolchains.which('java')) and bool(toolchains.which('javac'))
+        self.max_compiles = max_compiles
+        self.timeout = timeout
+        self.lock = threading.Lock()  # guards state only, never held during a compile
+        self.process = None
+        self.responses = None
+        self.busy = False  # a compile is in flight (the server takes one at a time)
+        self.compiles = 0  # served by the current process
+        self.busy_fallbacks = 0  # compiles sent to a javac process because the server was busy
+        self.restarts = 0
+        self.failed_starts = 0
+        self._starting = False
+
+    def _start(self):
+        """Launch the server JVM (called off the request path)"""
+        classes = support_classes()
+        if not classes:
+            self.enabled = False
+            return
+        try:
+            process = subprocess.Popen(
+                ['java', '-cp', classes, 'NocCompileServer'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+                **new_process_group_kwargs()
+            )
+        except OSError as e:
+            print(f"Java daemon: cannot start compile server: {e}")
+            self._note_failed_start()
+            return
+
+        responses = queue.Queue()
+        threading.Thread(target=self._read_responses, args=(process, responses),
+                         name='noc-javac-reader', daemon=True).start()
+        with self.lock:
+            self.process, self.responses, self.compiles = process, responses, 0
+            self._starting = False
+
+    def _note_failed_start(self):
+        with self.lock:
+            self._starting = False
+            self.failed_starts += 1
+            if self.failed_starts >= 3:
+                print("Java daemon: disabled after repeated start failures")
+                self.enabled = False
+
+    @staticmethod
+    def _read_responses(process, responses):
+        """Turn the server's framed replies into (status, text) items"""
+        stream = process.stdout
+        try:
+            while True:
+                header = stream.readline()
+                if not header:
+                    break
+                status, length = header.decode('ascii').strip().split('\t')
+                remaining, chunks = int(length), []
+                while remaining:
+                    chunk = stream.read(remaining)
+                    if not chunk:
+                        raise EOFError('truncated response')
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                responses.put((int(status), b''.join(chunks).decode('utf-8', 'replace')))
+        except (OSError, ValueError, EOFError):
+            pass
+        responses.put(None)  # server gone
+
+    def _healthy(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _ensure_running(self):
+        """
+        True if the server can take a request now; otherwise (re)start it in
+        the background so a later compile can use it
+        """
+        with self.lock:
+            if not self.enabled:
+                return False
+            if self._healthy() and self.compiles < self.max_compiles:
+                return True
+            if self.busy:
+                return False  # recycle once the compile in flight has finished
+            if self.process is not None:
+                self._stop_locked()
+                self.restarts += 1
+            if self._starting:
+                return False
+            self._starting = True
+        threading.Thread(target=self._start, name='noc-javac-start', daemon=True).start()
+        return False
+
+    def _stop_locked(self):
+        if self.process is not None:
+            kill_process_tree(self.process)
+            self.process = None
+            self.responses = None
+
+    def compile(self, source, out_dir, cancel_event=None):
+        """
+        Compile one source file into out_dir
+        Returns: (status, diagnostics) with status 0 on success, or None if
+        the server is unavailable and the caller should run javac itself
+        """
+        if not self._ensure_running():
+            return None
+
+        with self.lock:
+            if not self._healthy():
+                return None
+            if self.busy:
+                self.busy_fallbacks += 1
+                return None
+            self.busy = True
+            process, responses = self.process, self.responses
+
+        reply, healthy = None, False
+        try:
+            reply, healthy = self._request(process, responses, source, out_dir, cancel_event)
+        finally:
+            with self.lock:
+                self.busy = False
+                if self.process is process:
+                    if healthy:
+                        self.compiles += 1
+                    else:
+                        self._stop_locked()
+        return reply
+
+    def _request(self, process, responses, source, out_dir, cancel_event):
+        """
+        Send one compile and wait for its reply (called without the lock)
+        Returns: (reply, healthy); reply is (status, diagnostics), (1, '') if
+        cancelled or None if the server failed. An unhealthy server is restarted
+        """
+        try:
+            process.stdin.write(f'{out_dir}\t{source}\n'.encode('utf-8'))
+            process.stdin.flush()
+        except OSError:
+            return None, False
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                # The JVM cannot abandon a compile: restart it instead
+                return (1, ''), False
+            try:
+                reply = responses.get(timeout=0.1)
+                return reply, reply is not None
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    print(f"Java daemon: no reply in {self.timeout}s, restarting")
+                    return None, False
+
+    def shutdown(self):
+        with self.lock:
+            self.enabled = False
+            self._stop_locked()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'running': self._healthy(),
+                'busy': self.busy,
+                'compiles': self.compiles,
+                'busy_fallbacks': self.busy_fallbacks,
+                'restarts': self.restarts
+            }
@@ -0,0 +1,628 @@
+"""
+Language Backends
+Declarative registry of the languages NOC can build and run
+
+Each backend declares how to detect its toolchain, how to build a program
+(and whether the build goes through the compile cache), the command that
+runs it, its resource-limit profile and the warm-pool interpreter able to
+start that command. CompilerHandler dispatches on the registry, so adding
+or tuning a language never touches the core: extensions return backends
+from get_language_backends() and may replace built-in ones by name.
+
+Backends with a check_format also have a check-only mode (syntax and,
+where the compiler does it cheaply, type errors) used by live diagnostics;
+see syntax_check.py.
+"""
+import glob
+import os
+import platform
+import re
+import threading
+import time
+from config import (
+    CPP_DEFAULT_FLAGS, C_DEFAULT_FLAGS, CPP_CCACHE_ENABLED, GO_CACHE_DIR, ZIG_CACHE_DIR,
+    SCALA_COMPILE_SERVER, SQL_MAX_ROWS
+)
+from fixture_store import parse_directive
+from toolchains import toolchains
+from utils import ensure_directory, get_bash_path
+
+# Runs inside a (warm) Python worker, so SQL runs skip interpreter startup
+SQL_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql_engine.py')
+
+# Runtimes that reserve large virtual ranges: an address-space limit breaks them
+NO_ADDRESS_SPACE_LIMIT = {'memory_bytes': None}
+
+
+class LanguageBackend:
+    """Base class: one instance per language, shared by every run"""
+
+    name = None  # language id used by the editor and the API
+    label = None
+    extension = '.txt'
+    monaco = None  # Monaco editor language id (default: name)
+    comment_prefix = '//'
+    toolchain = ()  # executables tried in order; the first found is used
+    requires = ()  # further executables run commands need
+    optional = ()  # executables used when installed (probed with the rest)
+    cacheable = False  # builds are stored in the compile cache
+    warm_interpreter = None  # WarmPool interpreter that can start run commands
+    resource_limits = {}  # overrides of RESOURCE_LIMITS['default']
+    template = None  # starter program for new editors (static/js/editor.js has the built-ins')
+    check_format = None  # output parser of check_command (syntax_check.PARSERS); None = no check mode
+
+    def detect(self):
+        """Path of the first installed toolchain executable, or None"""
+        for tool in self.toolchain:
+            path = toolchains.which(tool)
+            if path:
+                return path
+        return None
+
+    def executables(self):
+        """Every executable this backend may look up (probed at startup)"""
+        return [*self.toolchain, *self.requires, *self.optional]
+
+    def missing_toolchain(self):
+        """Why runs cannot start (a message), or None if the tools are installed"""
+        if self.toolchain and self.detect() is None:
+            return f"{self.label} toolchain not found on PATH (looked for: {', '.join(self.toolchain)})"
+        for tool in self.requires:
+            if toolchains.which(tool) is None:
+                return f"{self.label} programs need '{tool}' on PATH"
+        return None
+
+    def prepare(self, ctx):
+        """
+        Build ctx.code (a BuildContext) if needed
+        Returns: (success, command, error_message)
+        """
+        raise NotImplementedError
+
+    def check_command(self, ctx, src, out_dir):
+        """
+        Command that only checks src, without building a program
+        src and out_dir are relative to the workspace the command runs in
+        """
+        return None
+
+    def check(self, ctx, src, out_dir):
+        """
+        Run the check in ctx.workdir (src is already written)
+        Returns: (exit code, output); exit code None if cancelled or timed out
+        """
+        return ctx.run_check(self.check_command(ctx, src, out_dir))
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'label': self.label,
+            'extension': self.extension,
+            'monaco': self.monaco or self.name,
+            'toolchain': list(self.toolchain),
+            'available': self.missing_toolchain() is None,
+            'cacheable': self.cacheable,
+            'warm_interpreter': self.warm_interpreter,
+            'checkable': self.check_format is not None,
+            'template': self.template
+        }
+
+
+class InterpretedBackend(LanguageBackend):
+    """Source file handed straight to an interpreter"""
+
+    source_name = 'script.txt'
+    run_flags = ()
+
+    def prepare(self, ctx):
+        path = ctx.write_file(self.source_name, ctx.code)
+        return True, [self.toolchain[0], *self.run_flags, path], None
+
+
+class CompiledBackend(LanguageBackend):
+    """Compiler writing main.exe (or classes) into the build directory"""
+
+    source_name = 'main.txt'
+    cacheable = True
+
+    def compiler(self, ctx):
+        """Compiler executable; also part of the cache key"""
+        return self.toolchain[0]
+
+    def flags(self, ctx):
+        """Flags that change the build output (part of the cache key)"""
+        return []
+
+    def build_env(self, ctx):
+        return None
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        raise NotImplementedError
+
+    def build(self, ctx, compiler, out_dir):
+        """Returns: (success, error_message)"""
+        src = ctx.write_file(self.source_name, ctx.code)
+        return ctx.run_compiler(self.build_command(ctx, compiler, src, out_dir), self.build_env(ctx))
+
+    def run_command(self, ctx, out_dir):
+        return [os.path.join(out_dir, 'main.exe')]
+
+    def prepare(self, ctx):
+        compiler = self.compiler(ctx)
+        if compiler is None:
+            return False, None, f"{self.label} compiler not found (tried: {', '.join(self.toolchain)})"
+
+        success, out_dir, error = ctx.build_cached(
+            self, compiler, self.flags(ctx), lambda out_dir: self.build(ctx, compiler, out_dir)
+        )
+        if not success:
+            return False, None, error
+
+        return True, self.run_command(ctx, out_dir), None
+
+
+# Interpreted languages
+
+class PythonBackend(InterpretedBackend):
+    name, label, extension = 'python', 'Python', '.py'
+    comment_prefix = '#'
+    toolchain = ('python',)
+    source_name = 'script.py'
+    run_flags = ('-u',)
+    warm_interpreter = 'python'
+    check_format = 'python'
+
+    def check_command(self, ctx, src, out_dir):
+        return [self.toolchain[0], '-m', 'py_compile', src]
+
+
+class JavaScriptBackend(InterpretedBackend):
+    name, label, extension = 'javascript', 'JavaScript', '.js'
+    toolchain = ('node',)
+    source_name = 'script.js'
+    warm_interpreter = 'node'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+
+class LuaBackend(InterpretedBackend):
+    name, label, extension = 'lua', 'Lua', '.lua'
+    comment_prefix = '--'
+    toolchain = ('lua',)
+    source_name = 'script.lua'
+    warm_interpreter = 'lua'
+
+
+class BashBackend(LanguageBackend):
+    name, label, extension = 'bash', 'Bash', '.sh'
+    monaco = 'shell'
+    comment_prefix = '#'
+    toolchain = ('bash',)
+
+    def detect(self):
+        path = get_bash_path()
+        return toolchains.which(path) if path else None
+
+    def prepare(self, ctx):
+        path = ctx.write_file('script.sh', ctx.code)
+        bash_path = get_bash_path()
+
+        if not bash_path:
+            return False, None, "Bash not found. Install Git Bash or WSL."
+
+        if platform.system() == 'Windows' and 'System32' in bash_path:
+            # WSL - convert path
+            wsl_path = path.replace('\\', '/').replace('C:', '/mnt/c')
+            return True, [bash_path, '-c', f'bash {wsl_path}'], None
+        else:
+            return True, [bash_path, path], None
+
+
+class SqlBackend(LanguageBackend):
+    """SQLite in-memory database, one statement at a time (see sql_engine.py)"""
+
+    name, label, extension = 'sql', 'SQL', '.sql'
+    comment_prefix = '--'
+    toolchain = ('python',)
+    warm_interpreter = 'python'
+
+    def prepare(self, ctx):
+        path = ctx.write_file('query.sql', ctx.code)
+        cmd = ['python', '-u', SQL_ENGINE, path, '--max-rows', str(SQL_MAX_ROWS)]
+
+        # `-- fixture: name[@vN]` starts the run from a prebuilt database image
+        fixture = parse_directive(ctx.code)
+        if fixture:
+            image, error = ctx.handler.fixtures.image(*fixture)
+            if error:
+                return False, None, error
+            cmd += ['--fixture', image]
+
+        return True, cmd, None
+
+
+# Compiled languages
+
+class CBackend(CompiledBackend):
+    name, label, extension = 'c', 'C', '.c'
+    toolchain = ('gcc', 'cc', 'clang')
+    optional = ('ccache',)
+    source_name = 'main.c'
+    check_format = 'gcc'
+
+    def compiler(self, ctx):
+        path = self.detect()
+        return os.path.basename(path) if path else None
+
+    def flags(self, ctx):
+        """Flags recommended by the C/C++ extension"""
+        ext = ctx.handler.extensions.get_extension('cpp_extension')
+        if ext and hasattr(ext, 'get_compile_flags'):
+            return list(ext.get_compile_flags('c11'))
+        return list(C_DEFAULT_FLAGS)
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        cmd = [compiler] + self.flags(ctx) + [src, '-o', os.path.join(out_dir, 'main.exe'), '-lm']
+        ccache = toolchains.which('ccache') if CPP_CCACHE_ENABLED else None
+        return [ccache] + cmd if ccache else cmd
+
+    def check_command(self, ctx, src, out_dir):
+        return [self.compiler(ctx)] + self.flags(ctx) + ['-fsyntax-only', src]
+
+
+class CppBackend(CompiledBackend):
+    name, label, extension = 'cpp', 'C++', '.cpp'
+    toolchain = ('g++',)
+    optional = ('ccache',)
+    source_name = 'main.cpp'
+    check_format = 'gcc'
+
+    def flags(self, ctx):
+        """Compile flags recommended by the C/C++ extension"""
+        ext = ctx.handler.extensions.get_extension('cpp_extension')
+        if ext and hasattr(ext, 'get_compile_flags'):
+            return list(ext.get_compile_flags())
+        return list(CPP_DEFAULT_FLAGS)
+
+    def _pch(self, ctx, compiler, flags):
+        """Precompiled header of the program's leading #include set, or None"""
+        return ctx.handler.pch.lookup(compiler, ctx.handler.cache.compiler_version(compiler), flags, ctx.code)
+
+    def build(self, ctx, compiler, out_dir):
+        flags = self.flags(ctx)
+        src = ctx.write_file(self.source_name, ctx.code)
+        cmd = [compiler] + flags
+        env = None
+
+        # Reuse a precompiled header of the program's leading #include set
+        pch = self._pch(ctx, compiler, flags)
+        ctx.metrics['pch_hit'] = pch is not None
+        if pch:
+            cmd += ['-Winvalid-pch', '-include', pch]
+
+        ccache = toolchains.which('ccache') if CPP_CCACHE_ENABLED else None
+        if ccache:
+            cmd = [ccache] + cmd
+            if pch:
+                cmd.append('-fpch-preprocess')
+                env = dict(os.environ, CCACHE_SLOPPINESS='pch_defines,time_macros')
+
+        return ctx.run_compiler(cmd + [src, '-o', os.path.join(out_dir, 'main.exe')], env)
+
+    def check_command(self, ctx, src, out_dir):
+        # Parsing <bits/stdc++.h> takes most of a syntax check: load its .gch instead
+        compiler = self.compiler(ctx)
+        flags = self.flags(ctx)
+        pch = self._pch(ctx, compiler, flags)
+        return [compiler] + flags + (['-Winvalid-pch', '-include', pch] if pch else []) + ['-fsyntax-only', src]
+
+
+class CSharpBackend(CompiledBackend):
+    name, label, extension = 'csharp', 'C#', '.cs'
+    toolchain = ('csc',)
+    source_name = 'Program.cs'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        return [compiler, f'/out:{os.path.join(out_dir, "Program.exe")}', src]
+
+    def run_command(self, ctx, out_dir):
+        return [os.path.join(out_dir, 'Program.exe')]
+
+
+class JavaBackend(CompiledBackend):
+    name, label, extension = 'java', 'Java', '.java'
+    toolchain = ('javac',)
+    requires = ('java',)
+    source_name = 'Main.java'
+    warm_interpreter = 'java'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+    check_format = 'javac'
+
+    def build(self, ctx, compiler, out_dir):
+        src = ctx.write_file(self.source_name, ctx.code)
+        result = self._compile_resident(ctx, src, out_dir)
+        if result is not None:
+            return result
+        return ctx.run_compiler([compiler, '-d', out_dir, src])
+
+    def _compile_resident(self, ctx, src, out_dir):
+        """
+        Compile on the resident javac server
+        Returns: (success, error_message), or None to fall back to a javac process
+        """
+        started = time.perf_counter()
+        reply = ctx.handler.javac_server.compile(src, out_dir, ctx.cancel_event)
+        if reply is None or reply[0] == 2:
+            return None  # server unavailable or javac crashed inside it
+        ctx.add_compile_seconds(time.perf_counter() - started)
+
+        status, diagnostics = reply
+        ctx.emit(diagnostics)
+        return ctx.compile_result(status, diagnostics)
+
+    def run_command(self, ctx, out_dir):
+        return ['java', '-cp', out_dir, 'Main']
+
+    def check_command(self, ctx, src, out_dir):
+        # A javac process, not the resident server: checks are cancelled
+        # whenever the text changes, and must not hold up the server runs use
+        return [self.toolchain[0], '-d', out_dir, '-proc:none', src]
+
+
+class GoBackend(CompiledBackend):
+    name, label, extension = 'go', 'Go', '.go'
+    toolchain = ('go',)
+    source_name = 'main.go'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+    def build_env(self, ctx):
+        # Shared GOCACHE keeps compiled std/packages between builds
+        return dict(os.environ, GOCACHE=ensure_directory(GO_CACHE_DIR))
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        return [compiler, 'build', '-o', os.path.join(out_dir, 'main.exe'), src]
+
+
+class RustBackend(CompiledBackend):
+    name, label, extension = 'rust', 'Rust', '.rs'
+    toolchain = ('rustc',)
+    source_name = 'main.rs'
+    check_format = 'gcc'  # --error-format=short prints file:line:col: severity: message
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        return [compiler, src, '-o', os.path.join(out_dir, 'main.exe')]
+
+    def check_command(self, ctx, src, out_dir):
+        # Metadata only: type and borrow checking without codegen or linking
+        return [self.toolchain[0], '--emit=metadata', '--crate-type=bin', '--error-format=short',
+                '-o', os.path.join(out_dir, 'main.rmeta'), src]
+
+
+class ZigBackend(CompiledBackend):
+    name, label, extension = 'zig', 'Zig', '.zig'
+    toolchain = ('zig',)
+    source_name = 'main.zig'
+    check_format = 'gcc'
+
+    def build_env(self, ctx):
+        # Without these zig writes a fresh zig-cache into every workspace
+        cache_dir = ensure_directory(ZIG_CACHE_DIR)
+        return dict(os.environ, ZIG_LOCAL_CACHE_DIR=cache_dir, ZIG_GLOBAL_CACHE_DIR=cache_dir)
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        return [compiler, 'build-exe', src, f'-femit-bin={os.path.join(out_dir, "main.exe")}']
+
+    def check_command(self, ctx, src, out_dir):
+        return [self.toolchain[0], 'ast-check', src]
+
+
+def distribution_jars(executable, predicate):
+    """Jars in the lib/ directory of the distribution an executable belongs to"""
+    path = toolchains.which(executable)
+    if not path:
+        return []
+    lib_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(path))), 'lib')
+    return sorted(jar for jar in glob.glob(os.path.join(lib_dir, '*.jar')) if predicate(os.path.basename(jar)))
+
+
+class ScalaBackend(CompiledBackend):
+    name, label, extension = 'scala', 'Scala', '.scala'
+    toolchain = ('fsc', 'scalac', 'scala')
+    source_name = 'Main.scala'
+    warm_interpreter = 'java'  # runs with plain java when the library jars are found
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+    def __init__(self):
+        self._jars = None
+
+    def compiler(self, ctx):
+        """fsc keeps a resident compile server between runs; scalac starts cold"""
+        if SCALA_COMPILE_SERVER and toolchains.which('fsc'):
+            return 'fsc'
+        return 'scalac' if toolchains.which('scalac') else None
+
+    def _runtime_classpath(self):
+        """Library jars of the scalac distribution, to run classes with plain java"""
+        if self._jars is None:
+            self._jars = distribution_jars('scalac', lambda name: 'library' in name)
+        return self._jars
+
+    def _main_class(self, code):
+        """Entry point: a Scala 3 @main method or the object defining main/extending App"""
+        match = re.search(r'@main\s+def\s+(\w+)', code)
+        if match:
+            return match.group(1)
+        for match in re.finditer(r'\bobject\s+(\w+)', code):
+            body = code[match.end():]
+            next_object = re.search(r'\bobject\s+\w+', body)
+            body = body[:next_object.start()] if next_object else body
+            if re.match(r'\s+extends\s+App\b', body) or re.search(r'\bdef\s+main\s*\(', body):
+                return match.group(1)
+        return 'Main'
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        return [compiler, '-d', out_dir, src]
+
+    def prepare(self, ctx):
+        if self.compiler(ctx) is None:
+            # Only the `scala` runner is installed: compile and run in one step
+            src = ctx.write_file(self.source_name, ctx.code)
+            return True, ['scala', src], None
+        return super().prepare(ctx)
+
+    def run_command(self, ctx, out_dir):
+        main_class = self._main_class(ctx.code)
+        jars = self._runtime_classpath()
+        if jars:
+            return ['java', '-cp', os.pathsep.join([out_dir] + jars), main_class]
+        return ['scala', '-classpath', out_dir, main_class]
+
+
+class KotlinBackend(CompiledBackend):
+    """
+    kotlinc compiles to classes run with plain java plus the Kotlin stdlib,
+    so runs start on a warm JVM; without the distribution's stdlib jar the
+    runtime is bundled into a self-contained main.jar instead
+    """
+
+    name, label, extension = 'kotlin', 'Kotlin', '.kt'
+    toolchain = ('kotlinc', 'kotlinc-jvm')
+    requires = ('java',)
+    source_name = 'Main.kt'  # top-level main() compiles to class MainKt
+    warm_interpreter = 'java'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+    def __init__(self):
+        self._jars = None
+
+    def compiler(self, ctx):
+        path = self.detect()
+        return os.path.basename(path) if path else None
+
+    def _runtime_classpath(self):
+        if self._jars is None:
+            self._jars = distribution_jars(
+                'kotlinc', lambda name: name in ('kotlin-stdlib.jar', 'kotlin-stdlib-jdk8.jar')
+            )
+        return self._jars
+
+    def build_command(self, ctx, compiler, src, out_dir):
+        if self._runtime_classpath():
+            return [compiler, src, '-d', out_dir, '-nowarn']
+        return [compiler, src, '-include-runtime', '-d', os.path.join(out_dir, 'main.jar'), '-nowarn']
+
+    def run_command(self, ctx, out_dir):
+        jars = self._runtime_classpath()
+        classpath = [out_dir] + jars if jars else [os.path.join(out_dir, 'main.jar')]
+        return ['java', '-cp', os.pathsep.join(classpath), 'MainKt']
+
+
+class TypeScriptBackend(CompiledBackend):
+    """
+    Transpiled to CommonJS and run on (warm) node. esbuild only strips
+    types and takes milliseconds; tsc also type-checks, and its type errors
+    are shown without blocking the run (exit code 2 still emits JavaScript)
+    """
+
+    name, label, extension = 'typescript', 'TypeScript', '.ts'
+    toolchain = ('esbuild', 'tsc')
+    requires = ('node',)
+    source_name = 'main.ts'
+    warm_interpreter = 'node'
+    resource_limits = NO_ADDRESS_SPACE_LIMIT
+
+    def compiler(self, ctx):
+        path = self.detect()
+        return os.path.basename(path) if path else None
+
+    def build(self, ctx, compiler, out_dir):
+        src = ctx.write_file(self.source_name, ctx.code)
+        if compiler == 'esbuild':
+            return ctx.run_compiler([
+                compiler, src, f'--outfile={os.path.join(out_dir, "main.js")}',
+                '--format=cjs', '--platform=node', '--log-level=warning'
+            ])
+        return ctx.run_compiler([
+            compiler, '--outDir', out_dir, '--target', 'es2020', '--module', 'commonjs',
+            '--skipLibCheck', '--pretty', 'false', src
+        ], ok_codes=(0, 2))
+
+    def run_command(self, ctx, out_dir):
+        return ['node', os.path.join(out_dir, 'main.js')]
+
+
+class LanguageRegistry:
+    """Language name -> backend; extensions are consulted on first use"""
+
+    def __init__(self, backends=()):
+        self.backends = {}
+        self._extensions_loaded = False
+        self._loading = False  # set while the loading thread registers backends
+        self._lock = threading.RLock()
+        for backend in backends:
+            self.register(backend)
+
+    def register(self, backend):
+        """Add a backend, replacing any registered under the same name"""
+        if not backend.name:
+            raise ValueError(f"{type(backend).__name__} has no name")
+        self.backends[backend.name] = backend
+        return backend
+
+    def _load_extensions(self):
+        if self._extensions_loaded:
+            return
+        with self._lock:
+            # A lookup made by an extension while loading sees the backends so far
+            if self._extensions_loaded or self._loading:
+                return
+            self._loading = True
+            try:
+                # Imported here: extension modules import this one to subclass the backends
+                from extensions_manager import extensions_manager
+                for ext_name, ext in extensions_manager.get_all_extensions().items():
+                    if not hasattr(ext, 'get_language_backends'):
+                        continue
+                    try:
+                        for backend in ext.get_language_backends():
+                            self.register(backend)
+                    except Exception as e:
+                        print(f"✗ Failed to load language backends of {ext_name}: {e}")
+                # Only now: other threads skip the lock once this is set
+                self._extensions_loaded = True
+            finally:
+                self._loading = False
+
+    def get(self, name):
+        """Backend for a language, or None"""
+        self._load_extensions()
+        return self.backends.get(name)
+
+    def names(self):
+        self._load_extensions()
+        return list(self.backends)
+
+    def executables(self):
+        """Every executable some backend may use"""
+        self._load_extensions()
+        return sorted({tool for backend in self.backends.values() for tool in backend.executables()})
+
+    def for_interpreter(self, interpreter):
+        """First language whose runs the given warm-pool interpreter starts"""
+        self._load_extensions()
+        for backend in self.backends.values():
+            if backend.warm_interpreter == interpreter:
+                return backend.name
+        return None
+
+    def describe(self):
+        self._load_extensions()
+        return [backend.describe() for backend in self.backends.values()]
+
+
+# Registry Singleton (order is the editor's language menu order)
+language_registry = LanguageRegistry([
+    PythonBackend(), CppBackend(), CBackend(), CSharpBackend(), JavaBackend(),
+    JavaScriptBackend(), TypeScriptBackend(), SqlBackend(), RustBackend(), LuaBackend(),
+    BashBackend(), ZigBackend(), ScalaBackend(), KotlinBackend(), GoBackend()
+])
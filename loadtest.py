@@ -0,0 +1,415 @@
+"""
+Load Test
+Simulates many browser clients against a NOC server over real Socket.IO connections
+
+Each simulated client connects, then repeatedly runs an interactive
+program: run_code, wait for its prompt, send_input a unique token, wait
+for the greeting that echoes it and for term_stop, then "thinks" for a
+random (exponential) time before the next run. Output frames are
+acknowledged with term_ack like the browser does.
+
+Clients are added in stages (e.g. -n 10 50 100 200). For each stage the
+report holds connect, first-output, input-echo and full-run latency,
+dropped messages (missing echoes, gaps in frame sequence numbers, runs
+that never stopped), and the server's CPU, memory and threads sampled
+from /proc. A stage is sustainable while its error rate and p95 run
+latency stay under LOADTEST_MAX_ERROR_RATE and LOADTEST_SLO_SECONDS; the
+largest sustainable stage is reported as the maximum concurrency.
+
+CLI:
+    python loadtest.py [-n 10 50 100] [-d 30] [--think 2] [-l python] [-o report.json]
+    python loadtest.py --url http://host:5000 ...   (existing server, no /proc sampling)
+
+Needs the python-socketio client transport: pip install websocket-client requests
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from config import (
+    BASE_DIR, LOADTEST_PORT, LOADTEST_MAX_ERROR_RATE, LOADTEST_SLO_SECONDS
+)
+from benchmark import latency_summary
+from utils import wait_for_port
+
+try:
+    import socketio
+    import websocket  # noqa: F401  (websocket transport for socketio.Client)
+    CLIENT_AVAILABLE = True
+except ImportError:
+    CLIENT_AVAILABLE = False
+
+PROMPT = 'Name?'
+
+# Interactive program per language: prompt, read a line, greet
+PROGRAMS = {
+    'python': f'name = input("{PROMPT}\\n")\nprint("Hello, " + name)\n',
+    'javascript': (
+        f'console.log("{PROMPT}");\n'
+        'process.stdin.once("data", d => { console.log("Hello, " + d.toString().trim()); process.exit(0); });\n'
+    ),
+    'bash': f'echo "{PROMPT}"\nread name\necho "Hello, $name"\n'
+}
+
+RUN_TIMEOUT = 60  # seconds before a run without term_stop counts as dropped
+SAMPLE_INTERVAL = 1.0  # seconds between server resource samples
+SERVER_START_TIMEOUT = 60
+
+
+class Recorder:
+    """Thread-safe latency samples and counters for one stage"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.counts = {}
+
+    def sample(self, name, seconds):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return {name: list(values) for name, values in self.samples.items()}, dict(self.counts)
+
+
+class SimulatedClient:
+    def __init__(self, index, url, language, recorder, think, rng):
+        self.index = index
+        self.url = url
+        self.code = PROGRAMS[language]
+        self.language = language
+        self.recorder = recorder
+        self.think = think
+        self.rng = rng
+        self.sio = socketio.Client(reconnection=False)
+        self.lock = threading.Lock()
+        self.text = ''
+        self.expect = None
+        self.last_seq = 0
+        self.prompted = threading.Event()
+        self.echoed = threading.Event()
+        self.stopped = threading.Event()
+        self.stop_data = {}
+        self.disconnected = threading.Event()
+        self.sio.on('term_output', self._on_output)
+        self.sio.on('term_stop', self._on_stop)
+        self.sio.on('disconnect', lambda *args: self.disconnected.set())
+
+    def _on_output(self, data):
+        seq = data.get('seq')
+        with self.lock:
+            if seq:
+                if seq != self.last_seq + 1:
+                    self.recorder.count('frame_gaps')
+                self.last_seq = seq
+            self.text += data.get('data', '')
+            if PROMPT in self.text:
+                self.prompted.set()
+            if self.expect and self.expect in self.text:
+                self.echoed.set()
+        if seq:
+            self.sio.emit('term_ack', {'seq': seq})
+
+    def _on_stop(self, data):
+        self.stop_data = data or {}
+        self.stopped.set()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            self.sio.connect(self.url, transports=['websocket'], wait_timeout=30)
+        except Exception:
+            self.recorder.count('connect_failures')
+            return False
+        self.recorder.sample('connect', time.perf_counter() - started)
+        return True
+
+    def run_once(self, number):
+        token = f'client{self.index}-{number}'
+        with self.lock:
+            self.text, self.expect, self.last_seq = '', f'Hello, {token}', 0
+        for event in (self.prompted, self.echoed, self.stopped):
+            event.clear()
+
+        self.recorder.count('runs_started')
+        started = time.perf_counter()
+        self.sio.emit('run_code', {'code': self.code, 'language': self.language})
+        if not self.prompted.wait(RUN_TIMEOUT):
+            return self._fail('no_prompt')
+        self.recorder.sample('first_output', time.perf_counter() - started)
+
+        sent = time.perf_counter()
+        self.sio.emit('send_input', {'input': token})
+        if not self.echoed.wait(RUN_TIMEOUT):
+            return self._fail('no_echo')
+        self.recorder.sample('input_echo', time.perf_counter() - sent)
+
+        if not self.stopped.wait(RUN_TIMEOUT):
+            return self._fail('no_stop')
+        if not self.stop_data.get('success'):
+            return self._fail('rejected' if 'Rejected' in self.stop_data.get('data', '') else 'failed')
+        self.recorder.sample('run', time.perf_counter() - started)
+        self.recorder.count('runs_completed')
+
+    def _fail(self, reason):
+        if self.disconnected.is_set():
+            reason = 'disconnected'
+        self.recorder.count(f'runs_{reason}')
+        if reason.startswith('no_') or reason == 'disconnected':
+            self.recorder.count('dropped')
+        # Leave nothing running behind the next attempt
+        if self.sio.connected:
+            self.sio.emit('stop_code', {})
+            self.stopped.wait(5)
+
+    def loop(self, stop_at):
+        number = 0
+        while time.monotonic() < stop_at and not self.disconnected.is_set():
+            self.run_once(number)
+            number += 1
+            pause = self.rng.expovariate(1 / self.think) if self.think > 0 else 0
+            if pause and time.monotonic() + pause < stop_at:
+                time.sleep(pause)
+            elif pause:
+                break
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+class ServerSampler:
+    """CPU, resident memory and thread count of the server process from /proc"""
+
+    def __init__(self, pid, interval=SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def _read(self):
+        with open(f'/proc/{self.pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / self._ticks  # utime + stime
+        status = {}
+        with open(f'/proc/{self.pid}/status', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                status[key] = value.strip()
+        rss = int(status.get('VmRSS', '0 kB').split()[0]) * 1024
+        return cpu, rss, int(status.get('Threads', 0))
+
+    def _run(self):
+        previous = None
+        while not self._stop.wait(self.interval):
+            try:
+                cpu, rss, threads = self._read()
+            except (OSError, ValueError, IndexError):
+                return
+            now = time.monotonic()
+            if previous:
+                cpu_percent = (cpu - previous[1]) / (now - previous[0]) * 100
+                self.samples.append((cpu_percent, rss, threads))
+            previous = (now, cpu)
+
+    def start(self):
+        if os.path.exists(f'/proc/{self.pid}/stat'):
+            self.samples = []
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if not self.samples:
+            return None
+        cpu, rss, threads = zip(*self.samples)
+        return {
+            'cpu_percent_mean': round(sum(cpu) / len(cpu), 1),
+            'cpu_percent_max': round(max(cpu), 1),
+            'rss_mb_mean': round(sum(rss) / len(rss) / (1024 * 1024), 1),
+            'rss_mb_max': round(max(rss) / (1024 * 1024), 1),
+            'threads_max': max(threads)
+        }
+
+
+def scrape_metrics(url):
+    """Selected gauges from the server's /metrics endpoint"""
+    wanted = ('noc_sessions', 'noc_queue_depth', 'noc_running_jobs', 'noc_active_processes')
+    try:
+        with urllib.request.urlopen(url.rstrip('/') + '/metrics', timeout=5) as response:
+            text = response.read().decode('utf-8')
+    except OSError:
+        return {}
+    values = {}
+    for line in text.splitlines():
+        name, _, value = line.partition(' ')
+        if name in wanted:
+            values[name] = float(value)
+    return values
+
+
+def start_local_server(port, log_path=None):
+    """Run app.start_server in a child process"""
+    log = open(log_path, 'w') if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, '-c', f'import app; app.start_server({port})'],
+        cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT
+    )
+    if not wait_for_port('127.0.0.1', port, SERVER_START_TIMEOUT, alive=lambda: process.poll() is None):
+        process.kill()
+        raise RuntimeError(f"Server did not start on port {port}")
+    return process
+
+
+def run_stage(url, clients, duration, ramp, think, language, seed, server_pid):
+    """Drive `clients` simulated clients for `duration` seconds"""
+    recorder = Recorder()
+    sampler = ServerSampler(server_pid).start() if server_pid else None
+    simulated = [
+        SimulatedClient(index, url, language, recorder, think, random.Random(seed + index))
+        for index in range(clients)
+    ]
+    peaks = {}
+    stop_at = time.monotonic() + ramp + duration
+    started = time.perf_counter()
+
+    def client_main(client, delay):
+        time.sleep(delay)
+        if client.connect():
+            client.loop(stop_at)
+
+    threads = [
+        threading.Thread(target=client_main, args=(client, ramp * i / max(1, clients)), daemon=True)
+        for i, client in enumerate(simulated)
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for name, value in scrape_metrics(url).items():
+            peaks[name] = max(peaks.get(name, 0), value)
+        time.sleep(SAMPLE_INTERVAL)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for client in simulated:
+        client.close()
+
+    samples, counts = recorder.snapshot()
+    started_runs = counts.get('runs_started', 0)
+    completed = counts.get('runs_completed', 0)
+    failures = started_runs - completed + counts.get('connect_failures', 0)
+    attempts = started_runs + counts.get('connect_failures', 0)
+    error_rate = failures / attempts if attempts else 1.0
+    latency = {name: latency_summary(values) for name, values in samples.items()}
+    run_p95 = (latency.get('run') or {}).get('p95')
+    stage = {
+        'clients': clients,
+        'duration_seconds': round(elapsed, 1),
+        'runs_started': started_runs,
+        'runs_completed': completed,
+        'runs_per_second': round(completed / elapsed, 2) if elapsed else None,
+        'error_rate': round(error_rate, 4),
+        'dropped': counts.get('dropped', 0),
+        'frame_gaps': counts.get('frame_gaps', 0),
+        'counts': counts,
+        'latency_ms': latency,
+        'server': sampler.stop() if sampler else None,
+        'server_metrics_peak': peaks,
+        'sustainable': (error_rate <= LOADTEST_MAX_ERROR_RATE and run_p95 is not None
+                        and run_p95 <= LOADTEST_SLO_SECONDS * 1000)
+    }
+    return stage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test a NOC server with simulated clients')
+    parser.add_argument('-n', '--clients', type=int, nargs='+', default=[10, 50, 100],
+                        help='concurrent clients per stage')
+    parser.add_argument('-d', '--duration', type=float, default=30, help='seconds per stage')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds to connect all clients')
+    parser.add_argument('--think', type=float, default=2, help='mean think time between runs (s)')
+    parser.add_argument('-l', '--language', choices=sorted(PROGRAMS), default='python')
+    parser.add_argument('--url', help='existing server to test (default: spawn one)')
+    parser.add_argument('--port', type=int, default=LOADTEST_PORT, help='port for the spawned server')
+    parser.add_argument('--server-log', help='file for the spawned server output')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    if not CLIENT_AVAILABLE:
+        print("Load testing needs the Socket.IO client transport: pip install websocket-client requests",
+              file=sys.stderr)
+        return 2
+
+    server = None
+    url = args.url
+    if not url:
+        server = start_local_server(args.port, args.server_log)
+        url = f'http://127.0.0.1:{args.port}'
+
+    stages = []
+    try:
+        for clients in args.clients:
+            stage = run_stage(url, clients, args.duration, args.ramp, args.think, args.language,
+                              args.seed, server.pid if server else None)
+            stages.append(stage)
+            run = stage['latency_ms'].get('run') or {}
+            print(f"clients={clients:<5} runs={stage['runs_completed']:<6} "
+                  f"{stage['runs_per_second']}/s p50={run.get('p50')}ms p95={run.get('p95')}ms "
+                  f"errors={stage['error_rate']:.2%} dropped={stage['dropped']} "
+                  f"server={stage['server']}", file=sys.stderr)
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    sustainable = [stage['clients'] for stage in stages if stage['sustainable']]
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'url': url,
+            'spawned_server': server is not None,
+            'language': args.language,
+            'duration_seconds': args.duration,
+            'think_seconds': args.think,
+            'cpu_count': os.cpu_count(),
+            'max_error_rate': LOADTEST_MAX_ERROR_RATE,
+            'slo_p95_seconds': LOADTEST_SLO_SECONDS
+        },
+        'stages': stages,
+        'max_sustainable_clients': max(sustainable) if sustainable else None
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,71 +1,135 @@
 """
 Main Entry Point for NOC (Neofilisoft Open Compiler)
 """
+from startup import startup_profile  # first import: zero point of the startup profile
 import threading
 import time
 import subprocess
 import sys
-import importlib
-
-# Ensure dependencies
-def ensure_dependencies():
-    required_packages = [
-        'flask', 
-        'flask-socketio', 
-        'PySide6', 
-        'pywebview'
-    ]
-    
-    for package in required_packages:
-        try:
-            importlib.import_module(package.lower().replace('-', '_'))
-        except ImportError:
+import importlib.util
+import argparse
+from config import APP_NAME, APP_VERSION, FLASK_PORT, STARTUP_TIMEOUT, STARTUP_POLL_INTERVAL
+from utils import wait_for_port
+
+# pip package -> module it provides
+DEPENDENCIES = {
+    'flask': 'flask',
+    'flask-socketio': 'flask_socketio',
+    'PySide6': 'PySide6',
+    'pywebview': 'webview'
+}
+
+# Shown while the server is still importing
+SPLASH_HTML = """<!DOCTYPE html>
+<html><body style="margin:0;height:100vh;display:flex;align-items:center;justify-content:center;
+background:#1e1e1e;color:#ccc;font-family:sans-serif">Starting {name}...</body></html>"""
+
+def install_dependencies(packages):
+    """pip install the packages whose module cannot be found"""
+    for package in packages:
+        if importlib.util.find_spec(DEPENDENCIES[package]) is None:
             print(f"Installing {package}...")
             subprocess.check_call([
                 sys.executable, "-m", "pip", "install", package
             ])
 
-ensure_dependencies()
+def parse_args():
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} desktop app")
+    parser.add_argument('--install-deps', action='store_true',
+                        help='pip install missing dependencies before starting')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print when each launch phase finished')
+    return parser.parse_args()
 
-from app import start_server
-from config import APP_NAME, APP_VERSION, FLASK_PORT
+def run_server(errors):
+    """Import the app and serve it; runs on the server thread"""
+    # Imported here: batch pool processes re-import this module as __mp_main__
+    try:
+        from app import start_server
+    except ImportError as e:
+        errors.append(e)
+        return
+    start_server()
 
-try:
-    import webview
-    WEBVIEW_AVAILABLE = True
-except ImportError:
-    WEBVIEW_AVAILABLE = False
-    import webbrowser
+def start_server_thread():
+    """Start the Flask server in a background thread; returns (thread, import errors)"""
+    errors = []
+    server_thread = threading.Thread(target=run_server, args=(errors,), name='noc-server', daemon=True)
+    server_thread.start()
+    return server_thread, errors
+
+def wait_for_server(server_thread):
+    """True once the server accepts connections"""
+    ready = wait_for_port('127.0.0.1', FLASK_PORT, STARTUP_TIMEOUT,
+                          alive=server_thread.is_alive, interval=STARTUP_POLL_INTERVAL)
+    if ready:
+        startup_profile.mark('server_ready')
+    return ready
 
 def main():
+    args = parse_args()
     print(f"Starting {APP_NAME} v{APP_VERSION}...")
-    
-    # Start Flask server in background thread
-    server_thread = threading.Thread(target=start_server, daemon=True)
-    server_thread.start()
-    
-    # Wait for server to start
-    time.sleep(1.5)
-    
+
+    if args.install_deps:
+        install_dependencies(DEPENDENCIES)
+
+    server_thread, errors = start_server_thread()
+
+    try:
+        import webview
+        WEBVIEW_AVAILABLE = True
+    except ImportError:
+        WEBVIEW_AVAILABLE = False
+        import webbrowser
+    startup_profile.mark('ui_imported')
+
     url = f'http://127.0.0.1:{FLASK_PORT}'
-    
+
+    def report():
+        if args.profile_startup:
+            print(startup_profile.format(), file=sys.stderr)
+
+    def server_failed():
+        if errors:
+            print(f"Cannot start the server: {errors[0]}")
+            print("Install the missing packages with: python main.py --install-deps")
+        else:
+            print(f"Server did not start listening on port {FLASK_PORT}")
+
     # Launch UI
     if WEBVIEW_AVAILABLE:
         print("Launching desktop window...")
-        webview.create_window(
+        # The window opens at once on a splash page; the app loads into it when ready
+        window = webview.create_window(
             APP_NAME,
-            url,
+            html=SPLASH_HTML.format(name=APP_NAME),
             width=1400,
             height=900,
             background_color='#1e1e1e',
             resizable=True,
             frameless=False
         )
-        webview.start()
+
+        def load_app():
+            startup_profile.mark('window_shown')
+            if not wait_for_server(server_thread):
+                server_failed()
+                window.destroy()
+                return
+            window.load_url(url)
+            startup_profile.mark('ui_loaded')
+            report()
+
+        webview.start(load_app)
     else:
+        if not wait_for_server(server_thread):
+            server_failed()
+            sys.exit(1)
         print("pywebview not available. Opening in browser...")
         webbrowser.open(url)
-        
+        startup_profile.mark('browser_opened')
+        report()
+
         # Keep alive
         try:
             while True:
@@ -74,4 +138,4 @@ def main():
             print("\nShutting down...")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,206 @@
+"""
+Prometheus Metrics
+Minimal counters, gauges and histograms rendered in the text exposition format
+"""
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Render every metric in Prometheus text format"""
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.children = {}
+        registry.register(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self.lock:
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = self._new_child()
+            return child
+
+    def _default(self):
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self):
+        with self.lock:
+            return list(self.children.items())
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def render(self):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}'
+            for key, child in self._items()
+        ]
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set(self, value):
+        self._default().set(value)
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def render(self):
+        lines = []
+        for key, child in self._items():
+            with child.lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose samples are read from callback() at scrape time"""
+
+    def __init__(self, name, documentation, callback, labelnames=(), type='gauge', registry=REGISTRY):
+        self.callback = callback
+        self.type = type
+        super().__init__(name, documentation, labelnames, registry)
+
+    def render(self):
+        try:
+            samples = self.callback()
+        except Exception as e:
+            print(f"Metrics callback error ({self.name}): {e}")
+            return []
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in samples.items()
+        ]
+
+
+# Server-wide instruments
+RUNS_TOTAL = Counter('noc_runs_total', 'Finished runs by language and outcome', ['language', 'status'])
+COMPILE_SECONDS = Histogram('noc_compile_seconds', 'Time spent in compiler processes', ['language'])
+QUEUE_WAIT_SECONDS = Histogram('noc_queue_wait_seconds', 'Time runs waited for a scheduler worker')
+RUN_WALL_SECONDS = Histogram('noc_run_wall_seconds', 'Wall time of executed programs', ['language'])
+ACTIVE_PROCESSES = Gauge('noc_active_processes', 'Programs currently executing')
+SOCKETIO_EMITS = Counter('noc_socketio_emits_total', 'Socket.IO messages emitted by event', ['event'])
+OUTPUT_BYTES = Counter('noc_output_bytes_total', 'Program output bytes read', ['language', 'stream'])
+DIAGNOSTICS_SECONDS = Histogram('noc_diagnostics_seconds', 'Time to analyse an open document', ['language'])
+AI_REQUEST_SECONDS = Histogram('noc_ai_request_seconds', 'AI provider request latency', ['provider', 'success'])
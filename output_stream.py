@@ -0,0 +1,285 @@
+"""
+Output Streaming
+Multiplexes a process's stdout and stderr into coalesced output frames
+"""
+import codecs
+import os
+import queue
+import selectors
+import threading
+import time
+from collections import deque
+from config import (
+    OUTPUT_FRAME_INTERVAL, OUTPUT_FRAME_MAX_BYTES, OUTPUT_MAX_BYTES, OUTPUT_MAX_LINES,
+    OUTPUT_TAIL_BYTES, OUTPUT_ACK_WINDOW, OUTPUT_ACK_TIMEOUT
+)
+
+READ_CHUNK = 65536
+
+# Windows select() only accepts sockets, so pipes are read on threads there
+_SELECTORS_USABLE = os.name != 'nt'
+
+
+class TailBuffer:
+    """Ring buffer keeping the last `limit` characters written to it"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.chunks = deque()
+        self.size = 0
+
+    def append(self, text):
+        self.chunks.append(text)
+        self.size += len(text)
+        while self.size > self.limit:
+            excess = self.size - self.limit
+            head = self.chunks[0]
+            if len(head) <= excess:
+                self.chunks.popleft()
+                self.size -= len(head)
+            else:
+                self.chunks[0] = head[excess:]
+                self.size -= excess
+
+    def getvalue(self):
+        return ''.join(self.chunks)
+
+
+class OutputPump:
+    """
+    Reads both pipes as bytes in arrival order and hands decoded text to
+    on_frame(text, seq) at most every `interval` seconds or `max_bytes` bytes
+
+    Past `max_output_bytes` / `max_output_lines` only a tail is kept, sent
+    after a truncation marker when the program exits. Reading pauses while
+    more than `ack_window` frames are unacknowledged by the client.
+    """
+
+    def __init__(self, process, on_frame, interval=OUTPUT_FRAME_INTERVAL,
+                 max_bytes=OUTPUT_FRAME_MAX_BYTES, max_output_bytes=OUTPUT_MAX_BYTES,
+                 max_output_lines=OUTPUT_MAX_LINES, tail_bytes=OUTPUT_TAIL_BYTES,
+                 ack_window=OUTPUT_ACK_WINDOW, ack_timeout=OUTPUT_ACK_TIMEOUT):
+        self.process = process
+        self.on_frame = on_frame
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.max_output_bytes = max_output_bytes
+        self.max_output_lines = max_output_lines
+        self.ack_window = ack_window
+        self.ack_timeout = ack_timeout
+        self.stdout_bytes = 0
+        self.stderr_bytes = 0
+        self.emitted_bytes = 0
+        self.emitted_lines = 0
+        self.frames = 0
+        self.acked = 0
+        self.truncated = False
+        self.omitted_bytes = 0
+        self.omitted_lines = 0
+
+        self._decoders = {}
+        self._pending = []
+        self._pending_bytes = 0
+        self._deadline = None
+        self._tail = TailBuffer(tail_bytes)
+        self._ack_event = threading.Event()
+        self._released = False
+
+    def ack(self, seq):
+        """Client has rendered every frame up to seq"""
+        if seq > self.acked:
+            self.acked = seq
+            self._ack_event.set()
+
+    def release(self):
+        """Stop applying backpressure (client gone or run killed)"""
+        self._released = True
+        self._ack_event.set()
+
+    def run(self):
+        """Pump until both pipes reach EOF"""
+        streams = {
+            name: pipe for name, pipe in (
+                ('stdout', self.process.stdout),
+                ('stderr', self.process.stderr)
+            ) if pipe is not None
+        }
+        for name in streams:
+            self._decoders[name] = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        try:
+            if _SELECTORS_USABLE:
+                self._run_selector(streams)
+            else:
+                self._run_threads(streams)
+        finally:
+            for name in streams:
+                self._feed(name, b'', final=True)
+            if self.truncated:
+                self._finish_truncation()
+            self._flush()
+            for pipe in streams.values():
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+    def _run_selector(self, streams):
+        selector = selectors.DefaultSelector()
+        for name, pipe in streams.items():
+            selector.register(pipe.fileno(), selectors.EVENT_READ, name)
+
+        try:
+            while selector.get_map():
+                self._wait_for_client()
+                events = selector.select(self._timeout())
+                for key, _ in events:
+                    data = os.read(key.fd, READ_CHUNK)
+                    if data:
+                        self._feed(key.data, data)
+                    else:
+                        selector.unregister(key.fd)
+                self._flush_if_due()
+        finally:
+            selector.close()
+
+    def _run_threads(self, streams):
+        chunks = queue.Queue()
+
+        def reader(name, pipe):
+            try:
+                while True:
+                    data = pipe.read1(READ_CHUNK) if hasattr(pipe, 'read1') else pipe.read(READ_CHUNK)
+                    if not data:
+                        break
+                    chunks.put((name, data))
+            finally:
+                chunks.put((name, None))
+
+        for name, pipe in streams.items():
+            threading.Thread(target=reader, args=(name, pipe), daemon=True).start()
+
+        open_streams = len(streams)
+        while open_streams:
+            self._wait_for_client()
+            try:
+                name, data = chunks.get(timeout=self._timeout())
+            except queue.Empty:
+                self._flush_if_due()
+                continue
+            if data is None:
+                open_streams -= 1
+            else:
+                self._feed(name, data)
+            self._flush_if_due()
+
+    def _wait_for_client(self):
+        """Leave the pipes unread (blocking the child) while the client lags"""
+        if not self.ack_window or self.truncated:
+            return
+        deadline = time.monotonic() + self.ack_timeout
+        while self.frames - self.acked >= self.ack_window and not self._released:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Output backpressure: no ack for {self.ack_timeout}s, resuming")
+                return
+            self._ack_event.clear()
+            if self.frames - self.acked < self.ack_window:
+                return
+            self._ack_event.wait(remaining)
+
+    def _timeout(self):
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def _feed(self, name, data, final=False):
+        if name == 'stderr':
+            self.stderr_bytes += len(data)
+        else:
+            self.stdout_bytes += len(data)
+
+        text = self._decoders[name].decode(data, final)
+        if not text:
+            return
+
+        if self.truncated:
+            self._tail.append(text)
+            self.omitted_bytes += len(data)
+            self.omitted_lines += text.count('\n')
+            return
+
+        head, rest = self._split_at_limit(text)
+        if head:
+            self._queue(head)
+        if rest is not None:
+            self.truncated = True
+            self._queue(
+                f"\n[Output limit reached ({self.emitted_bytes} bytes, {self.emitted_lines} lines): "
+                f"showing the end of the output when the program exits]\n"
+            )
+            self._tail.append(rest)
+            encoded = rest.encode('utf-8', 'replace')
+            self.omitted_bytes += len(encoded)
+            self.omitted_lines += rest.count('\n')
+
+    def _split_at_limit(self, text):
+        """
+        Split text where the byte or line budget runs out
+        Returns: (head, rest) where rest is None if text fits
+        """
+        encoded = text.encode('utf-8', 'replace')
+        lines = text.count('\n')
+        if (self.emitted_bytes + len(encoded) <= self.max_output_bytes
+                and self.emitted_lines + lines <= self.max_output_lines):
+            self.emitted_bytes += len(encoded)
+            self.emitted_lines += lines
+            return text, None
+
+        byte_budget = max(0, self.max_output_bytes - self.emitted_bytes)
+        cut = len(encoded[:byte_budget].decode('utf-8', 'ignore'))
+
+        if self.emitted_lines + lines > self.max_output_lines:
+            # Keep text up to and including the last newline within budget
+            index = -1
+            for _ in range(max(0, self.max_output_lines - self.emitted_lines)):
+                index = text.find('\n', index + 1)
+            cut = min(cut, index + 1)
+
+        head = text[:cut]
+        self.emitted_bytes += len(head.encode('utf-8', 'replace'))
+        self.emitted_lines += head.count('\n')
+        return head, text[cut:]
+
+    def _finish_truncation(self):
+        """Queue the omission marker followed by the retained tail"""
+        tail = self._tail.getvalue()
+        self.omitted_bytes = max(0, self.omitted_bytes - len(tail.encode('utf-8', 'replace')))
+        self.omitted_lines = max(0, self.omitted_lines - tail.count('\n'))
+        self._queue(
+            f"\n[... {self.omitted_bytes} bytes ({self.omitted_lines} lines) of output omitted ...]\n"
+        )
+        self._queue(tail)
+
+    def _queue(self, text):
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.interval
+        self._pending.append(text)
+        self._pending_bytes += len(text)
+
+    def _flush_if_due(self):
+        if self._pending and (
+            self._pending_bytes >= self.max_bytes
+            or time.monotonic() >= self._deadline
+        ):
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        self._deadline = None
+        self.frames += 1
+        self.on_frame(text, self.frames)
@@ -0,0 +1,222 @@
+"""
+Precompiled Header Cache
+Keeps GCC precompiled headers for the include sets programs start with
+
+A program whose leading lines are only `#include <...>` system headers has
+that set precompiled once into <root>/<key>/pch.h.gch. Later compiles of
+any program with the same set, compiler and flags pass `-include pch.h`,
+so GCC loads the .gch instead of parsing the headers again. Sets are built
+in the background the first time they are seen; until then (or if the
+.gch is rejected) compiles fall back to parsing the headers as usual.
+"""
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from config import CPP_PCH_ENABLED, CPP_PCH_DIR, CPP_PCH_MAX_SETS
+from utils import ensure_directory
+
+PCH_HEADER = 'pch.h'
+
+# A build marker older than this is from a crashed builder
+STALE_BUILD_SECONDS = 300
+
+# A set looked up this recently may still be read by a running compile
+IN_USE_SECONDS = 300
+
+_SYSTEM_INCLUDE = re.compile(r'#\s*include\s*<([\w./+-]+)>')
+
+
+def leading_includes(code):
+    """
+    System headers included before any other code or directive
+    A #define, #pragma or quoted include ends the set, since precompiling
+    past it could change what the program sees
+    """
+    headers = []
+    in_comment = False
+    for line in code.splitlines():
+        stripped = line.strip()
+        if in_comment:
+            if '*/' in stripped:
+                in_comment = False
+                stripped = stripped.split('*/', 1)[1].strip()
+            else:
+                continue
+        if stripped.startswith('/*'):
+            if '*/' not in stripped:
+                in_comment = True
+                continue
+            stripped = stripped.split('*/', 1)[1].strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        match = _SYSTEM_INCLUDE.fullmatch(stripped.split('//', 1)[0].strip())
+        if not match:
+            break
+        if match.group(1) not in headers:
+            headers.append(match.group(1))
+    return headers
+
+
+class PrecompiledHeaders:
+    def __init__(self, root=CPP_PCH_DIR, max_sets=CPP_PCH_MAX_SETS):
+        self.root = ensure_directory(root)
+        self.max_sets = max_sets
+        self.enabled = CPP_PCH_ENABLED
+        self.lock = threading.Lock()
+        self.building = set()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.failures = set()  # keys GCC could not precompile
+        self._clean_stale()
+
+    def _clean_stale(self):
+        """Remove staging directories left by interrupted builds"""
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if name.startswith('.') and time.time() - os.path.getmtime(path) > STALE_BUILD_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def make_key(self, compiler, compiler_version, flags, headers):
+        digest = hashlib.sha256()
+        for part in [compiler, compiler_version or ''] + list(flags) + ['--'] + list(headers):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:32]
+
+    def lookup(self, compiler, compiler_version, flags, code):
+        """
+        Path to pass with -include, or None if this program's include set
+        has no ready precompiled header (one is then built in the background)
+        """
+        if not self.enabled:
+            return None
+        headers = leading_includes(code)
+        if not headers:
+            return None
+
+        key = self.make_key(compiler, compiler_version, flags, headers)
+        entry = os.path.join(self.root, key)
+        header = os.path.join(entry, PCH_HEADER)
+        if os.path.isfile(header + '.gch'):
+            try:
+                os.utime(entry)  # LRU, and marks the set in use (see _evict)
+            except OSError:
+                return None  # evicted meanwhile
+            with self.lock:
+                self.hits += 1
+            return header
+
+        with self.lock:
+            self.misses += 1
+            if key in self.building or key in self.failures:
+                return None
+            self.building.add(key)
+        threading.Thread(
+            target=self._build, args=(key, compiler, flags, headers),
+            name='noc-pch-build', daemon=True
+        ).start()
+        return None
+
+    def _build(self, key, compiler, flags, headers):
+        entry = os.path.join(self.root, key)
+        marker = entry + '.building'
+        claimed = False
+        try:
+            claimed = self._claim(marker)
+            if not claimed:
+                return  # another process is building this set
+            staging = ensure_directory(os.path.join(self.root, f'.{key}-{uuid.uuid4().hex[:8]}'))
+            header = os.path.join(staging, PCH_HEADER)
+            with open(header, 'w', encoding='utf-8') as f:
+                f.write(''.join(f'#include <{name}>\n' for name in headers))
+
+            result = subprocess.run(
+                [compiler] + list(flags) + ['-x', 'c++-header', header, '-o', header + '.gch'],
+                capture_output=True, text=True, cwd=staging,
+                # Yield the CPU to the compile that is waiting on a user
+                preexec_fn=(lambda: os.nice(10)) if os.name != 'nt' else None
+            )
+            if result.returncode != 0:
+                print(f"PCH: cannot precompile {', '.join(headers)}: {result.stderr.strip()[:200]}")
+                with self.lock:
+                    self.failures.add(key)
+                shutil.rmtree(staging, ignore_errors=True)
+                return
+
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)  # built concurrently
+            with self.lock:
+                self.builds += 1
+            self._evict(keep=key)
+        except OSError as e:
+            print(f"PCH: build failed: {e}")
+        finally:
+            with self.lock:
+                self.building.discard(key)
+            if claimed:
+                try:
+                    os.remove(marker)
+                except OSError:
+                    pass
+
+    def _claim(self, marker):
+        """Create the build marker, replacing one left by a crashed builder"""
+        for _ in range(2):
+            try:
+                os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(marker) < STALE_BUILD_SECONDS:
+                        return False
+                    os.remove(marker)
+                except OSError:
+                    return False
+        return False
+
+    def _evict(self, keep):
+        """
+        Drop least recently used sets beyond max_sets
+        Sets looked up within IN_USE_SECONDS are kept even past the bound
+        """
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith('.') or name.endswith('.building') or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), name, path))
+            except OSError:
+                pass  # evicted by another process
+        entries.sort()
+        now = time.time()
+        excess = len(entries) - self.max_sets
+        for mtime, name, path in entries:
+            if excess <= 0:
+                break
+            if name == keep or now - mtime < IN_USE_SECONDS:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            excess -= 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'builds': self.builds,
+                'building': len(self.building),
+                'failed_sets': len(self.failures)
+            }
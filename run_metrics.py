@@ -0,0 +1,248 @@
+"""
+Run Metrics
+Per-run performance telemetry: queue wait, compile, wall and CPU time, memory, output
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from config import RUN_METRICS_HISTORY, RSS_SAMPLE_INTERVAL, SERVER_ASYNC_MODE, PROCESS_POLL_INTERVAL
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+# Runs in these states have not produced final metrics yet
+ACTIVE_STATUSES = ('queued', 'compiling', 'running')
+
+# Linux charges the forking server's resident pages to a child's ru_maxrss,
+# so peak memory is sampled from /proc/<pid>/status (VmHWM) there instead
+_PROC_STATUS = sys.platform.startswith('linux')
+
+# The CPU fields of a wait4 rusage, read from /proc/<pid>/stat instead
+ProcRusage = namedtuple('ProcRusage', 'ru_utime ru_stime ru_maxrss')
+
+
+def read_proc_cpu(pid):
+    """
+    CPU time of a live or zombie process and its reaped children, from /proc/<pid>/stat
+    Returns: ProcRusage or None once the process has been reaped
+    """
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # Fields after the parenthesised command name, which may contain spaces
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = os.sysconf('SC_CLK_TCK')
+        utime, stime, cutime, cstime = (int(value) for value in fields[11:15])
+    except (OSError, ValueError, IndexError):
+        return None
+    return ProcRusage((utime + cutime) / ticks, (stime + cstime) / ticks, 0)
+
+
+def _wait_sampling_cpu(process):
+    """
+    Green wait for process under gevent, whose loop reaps children itself
+    /proc/<pid>/stat is sampled until the exit is seen; a zombie keeps its
+    final counters until reaped, so the last sample lags by one poll at most.
+    """
+    rusage = None
+    while True:
+        sample = read_proc_cpu(process.pid)
+        if process.poll() is not None:
+            return process.returncode, sample or rusage
+        rusage = sample or rusage
+        time.sleep(PROCESS_POLL_INTERVAL)  # green sleep
+
+
+def wait_with_rusage(process):
+    """
+    Wait for process, collecting its resource usage where wait4 exists
+    On cooperative servers the wait must not block the event loop: eventlet
+    polls wait4; gevent's loop reaps every child itself (SIGCHLD), so there
+    the green wait samples CPU time from /proc and ru_maxrss is 0.
+    Returns: (return_code, rusage or None)
+    """
+    if SERVER_ASYNC_MODE == 'gevent':
+        if _PROC_STATUS and process.returncode is None:
+            return _wait_sampling_cpu(process)
+        return process.wait(), None
+    if hasattr(os, 'wait4') and process.returncode is None:
+        try:
+            if SERVER_ASYNC_MODE == 'eventlet':
+                while True:
+                    pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+                    if pid:
+                        break
+                    time.sleep(PROCESS_POLL_INTERVAL)  # green sleep
+            else:
+                _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return process.returncode, rusage
+        except ChildProcessError:
+            pass  # already reaped by a concurrent poll()
+    return process.wait(), None
+
+
+class PeakMemorySampler:
+    """Polls a process's high-water resident set size until stopped"""
+
+    def __init__(self, pid, interval=RSS_SAMPLE_INTERVAL):
+        self.path = f'/proc/{pid}/status'
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._sample():
+                return
+
+    def _sample(self):
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        value = int(line.split()[1]) * 1024
+                        self.peak = max(self.peak or 0, value)
+                        return True
+        except (OSError, ValueError, IndexError):
+            pass
+        return False  # exited (zombies have no Vm* fields)
+
+    def stop(self):
+        self._stop.set()
+        return self.peak
+
+
+class RunMetrics:
+    def __init__(self, run_id, language):
+        self.run_id = run_id
+        self.language = language
+        self.created_at = time.time()
+        self.queue_wait_seconds = None
+        self.prepare_seconds = None  # time inside compile_and_run
+        self.compile_seconds = None  # time spent in compiler processes
+        self.cache_hit = None
+        self.warm_start = None
+        self.wall_seconds = None
+        self.user_cpu_seconds = None
+        self.sys_cpu_seconds = None
+        self.peak_rss_bytes = None
+        self.stdout_bytes = 0
+        self.stderr_bytes = 0
+        self.output_frames = 0
+        self.output_truncated = False
+        self.exit_code = None
+        self.kill_reason = None
+        self.status = 'queued'
+
+        self._started = None
+        self._sampler = None
+
+    def process_started(self, process, warm):
+        self.warm_start = warm
+        self.status = 'running'
+        self._started = time.perf_counter()
+        if _PROC_STATUS:
+            self._sampler = PeakMemorySampler(process.pid).start()
+
+    def process_finished(self, return_code, rusage, pump=None, peak_memory=None):
+        """peak_memory: whole-tree peak (e.g. cgroup memory.peak) if known"""
+        if self._started is not None:
+            self.wall_seconds = time.perf_counter() - self._started
+        self.exit_code = return_code
+        sampled_peak = self._sampler.stop() if self._sampler else None
+        if rusage is not None:
+            self.user_cpu_seconds = rusage.ru_utime
+            self.sys_cpu_seconds = rusage.ru_stime
+            if not _PROC_STATUS:
+                self.peak_rss_bytes = rusage.ru_maxrss * _MAXRSS_UNIT
+        if peak_memory or sampled_peak:
+            self.peak_rss_bytes = peak_memory or sampled_peak
+        if pump is not None:
+            self.stdout_bytes = pump.stdout_bytes
+            self.stderr_bytes = pump.stderr_bytes
+            self.output_frames = pump.frames
+            self.output_truncated = pump.truncated
+        self.status = 'finished'
+
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'language': self.language,
+            'created_at': self.created_at,
+            'status': self.status,
+            'queue_wait_seconds': self.queue_wait_seconds,
+            'prepare_seconds': self.prepare_seconds,
+            'compile_seconds': self.compile_seconds,
+            'cache_hit': self.cache_hit,
+            'warm_start': self.warm_start,
+            'wall_seconds': self.wall_seconds,
+            'user_cpu_seconds': self.user_cpu_seconds,
+            'sys_cpu_seconds': self.sys_cpu_seconds,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'stdout_bytes': self.stdout_bytes,
+            'stderr_bytes': self.stderr_bytes,
+            'output_frames': self.output_frames,
+            'output_truncated': self.output_truncated,
+            'exit_code': self.exit_code,
+            'kill_reason': self.kill_reason
+        }
+
+
+class RunMetricsStore:
+    """Bounded history of recent runs"""
+
+    def __init__(self, history=RUN_METRICS_HISTORY):
+        self.history = history
+        self.runs = OrderedDict()  # run_id -> RunMetrics, oldest first
+        self.lock = threading.Lock()
+
+    def create(self, run_id, language):
+        metrics = RunMetrics(run_id, language)
+        with self.lock:
+            self.runs[run_id] = metrics
+            while len(self.runs) > self.history:
+                self.runs.popitem(last=False)
+        return metrics
+
+    def get(self, run_id):
+        with self.lock:
+            return self.runs.get(run_id)
+
+    def recent(self, limit=50):
+        with self.lock:
+            runs = list(self.runs.values())[-limit:]
+        return [metrics.to_dict() for metrics in reversed(runs)]
+
+    def summary(self):
+        """Per-language averages over the completed runs in history"""
+        with self.lock:
+            runs = [m for m in self.runs.values() if m.status not in ACTIVE_STATUSES]
+
+        fields = ('queue_wait_seconds', 'prepare_seconds', 'compile_seconds', 'wall_seconds',
+                  'user_cpu_seconds', 'sys_cpu_seconds', 'peak_rss_bytes', 'stdout_bytes')
+        languages = {}
+        for metrics in runs:
+            entry = languages.setdefault(metrics.language, {'runs': 0, 'cache_hits': 0, 'warm_starts': 0})
+            entry['runs'] += 1
+            entry['cache_hits'] += 1 if metrics.cache_hit else 0
+            entry['warm_starts'] += 1 if metrics.warm_start else 0
+            for field in fields:
+                value = getattr(metrics, field)
+                if value is not None:
+                    total, count = entry.get(field, (0, 0))
+                    entry[field] = (total + value, count + 1)
+
+        for entry in languages.values():
+            for field in fields:
+                if field in entry:
+                    total, count = entry.pop(field)
+                    entry[f'avg_{field}'] = total / count
+        return languages
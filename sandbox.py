@@ -0,0 +1,272 @@
+"""
+Sandbox
+Per-language resource limits and wall-clock watchdog for executed programs
+
+On Linux/macOS limits are applied with setrlimit in the child before exec.
+When CGROUP_ROOT points at a writable cgroup v2 directory, each run also
+gets its own cgroup with memory.max and pids.max, which (unlike rlimits)
+cover the whole process tree and let memory kills be reported reliably.
+Without a cgroup, max_processes falls back to RLIMIT_NPROC. That limit is
+per user: it counts every process and thread of the server's user (run the
+server as a dedicated user) and the kernel ignores it for root, so a root
+server without a cgroup has no process limit and says so once.
+"""
+import os
+import signal
+import threading
+import uuid
+from config import RESOURCE_LIMITS_ENABLED, RESOURCE_LIMITS, CGROUP_ROOT
+from utils import kill_process_tree, new_process_group_kwargs
+from languages import language_registry
+
+try:
+    import resource
+except ImportError:  # Windows: only the wall-clock watchdog applies
+    resource = None
+
+# Human readable kill reasons reported in the term_stop payload
+REASON_MESSAGES = {
+    'wall_time': 'Time limit exceeded ({limit}s)',
+    'cpu_time': 'CPU time limit exceeded ({limit}s)',
+    'memory': 'Memory limit exceeded ({limit_mb} MB)',
+    'file_size': 'File size limit exceeded ({limit_mb} MB)',
+    'processes': 'Process limit exceeded ({limit})'
+}
+
+# Limit setting behind each kill reason
+REASON_LIMITS = {
+    'wall_time': 'wall_seconds',
+    'cpu_time': 'cpu_seconds',
+    'memory': 'memory_bytes',
+    'file_size': 'file_size_bytes',
+    'processes': 'max_processes'
+}
+
+
+def limits_for(language):
+    """Default limits merged with the backend's profile and configured overrides"""
+    limits = dict(RESOURCE_LIMITS['default'])
+    backend = language_registry.get(language)
+    if backend:
+        limits.update(backend.resource_limits)
+    limits.update(RESOURCE_LIMITS.get(language, {}))
+    return limits
+
+
+def _rlimit_pairs(limits):
+    """(resource, (soft, hard)) pairs for the configured limits"""
+    if resource is None:
+        return []
+    pairs = []
+    if limits.get('cpu_seconds'):
+        # SIGXCPU at the soft limit, SIGKILL one second later
+        pairs.append((resource.RLIMIT_CPU, (limits['cpu_seconds'], limits['cpu_seconds'] + 1)))
+    if limits.get('memory_bytes'):
+        pairs.append((resource.RLIMIT_AS, (limits['memory_bytes'], limits['memory_bytes'])))
+    if limits.get('file_size_bytes'):
+        pairs.append((resource.RLIMIT_FSIZE, (limits['file_size_bytes'], limits['file_size_bytes'])))
+    if limits.get('max_processes') and _nproc_applies():
+        pairs.append((resource.RLIMIT_NPROC, (limits['max_processes'], limits['max_processes'])))
+    return pairs
+
+
+def _nproc_applies():
+    """True where RLIMIT_NPROC limits the children (it is per user and ignored for root)"""
+    return hasattr(resource, 'RLIMIT_NPROC') and os.geteuid() != 0
+
+
+_process_limit_warned = False
+
+
+def _warn_no_process_limit():
+    global _process_limit_warned
+    if not _process_limit_warned:
+        _process_limit_warned = True
+        print("Sandbox: WARNING: max_processes is not enforced: no cgroup (set CGROUP_ROOT) "
+              "and RLIMIT_NPROC does not apply to root")
+
+
+def rlimit_popen_kwargs(language):
+    """
+    Popen kwargs applying the language's rlimits in a new process group
+    Used for warm pool workers, which are started before any run exists
+    """
+    kwargs = dict(new_process_group_kwargs())
+    pairs = _rlimit_pairs(limits_for(language)) if RESOURCE_LIMITS_ENABLED else []
+    if CGROUP_ROOT and resource is not None:
+        # Adopted into the run's cgroup, whose pids.max limits the tree instead
+        pairs = [(res, values) for res, values in pairs if res != getattr(resource, 'RLIMIT_NPROC', None)]
+    if pairs:
+        def preexec():
+            for res, values in pairs:
+                resource.setrlimit(res, values)
+        kwargs['preexec_fn'] = preexec
+    return kwargs
+
+
+class Sandbox:
+    """Limits and watchdog for a single run"""
+
+    def __init__(self, language, overrides=None):
+        """overrides: limit settings replacing the language's for this run"""
+        self.language = language
+        self.enabled = RESOURCE_LIMITS_ENABLED
+        self.limits = limits_for(language)
+        self.limits.update(overrides or {})
+        self.reason = None
+        self.memory_peak = None  # bytes, from the cgroup when available
+        self.cgroup = self._create_cgroup() if self.enabled else None
+        self._timer = None
+        self._process = None
+
+    def _create_cgroup(self):
+        if not CGROUP_ROOT or os.name == 'nt':
+            return None
+        path = os.path.join(CGROUP_ROOT, f'noc-{uuid.uuid4().hex[:12]}')
+        try:
+            os.mkdir(path)
+            if self.limits.get('memory_bytes'):
+                self._write(path, 'memory.max', str(self.limits['memory_bytes']))
+                self._write(path, 'memory.swap.max', '0')
+            if self.limits.get('max_processes'):
+                self._write(path, 'pids.max', str(self.limits['max_processes']))
+            return path
+        except OSError as e:
+            print(f"Sandbox: cgroup unavailable ({e}), using rlimits only")
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+            return None
+
+    @staticmethod
+    def _write(path, name, value):
+        try:
+            with open(os.path.join(path, name), 'w') as f:
+                f.write(value)
+        except FileNotFoundError:
+            pass  # controller not enabled for this subtree
+
+    def popen_kwargs(self):
+        """Popen kwargs for a cold start of this run's program"""
+        kwargs = dict(new_process_group_kwargs())
+        if not self.enabled or resource is None:
+            return kwargs
+
+        pairs = _rlimit_pairs(self.limits)
+        if self.cgroup:
+            # cgroup memory/pids limits replace the per-process rlimits
+            pairs = [(res, values) for res, values in pairs
+                     if res not in (resource.RLIMIT_AS, getattr(resource, 'RLIMIT_NPROC', None))]
+        elif self.limits.get('max_processes') and not _nproc_applies():
+            _warn_no_process_limit()
+        procs_file = os.path.join(self.cgroup, 'cgroup.procs') if self.cgroup else None
+
+        def preexec():
+            if procs_file:
+                with open(procs_file, 'w') as f:
+                    f.write('0')
+            for res, values in pairs:
+                resource.setrlimit(res, values)
+
+        kwargs['preexec_fn'] = preexec
+        return kwargs
+
+    def adopt(self, process):
+        """Move an already running (warm) process into this run's cgroup"""
+        if self.cgroup:
+            try:
+                self._write(self.cgroup, 'cgroup.procs', str(process.pid))
+            except OSError as e:
+                print(f"Sandbox: cannot move {process.pid} into cgroup: {e}")
+
+    def start(self, process):
+        """Arm the wall-clock watchdog"""
+        self._process = process
+        wall = self.limits.get('wall_seconds')
+        if wall:
+            self._timer = threading.Timer(wall, self._on_timeout)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timeout(self):
+        # Fires while the run is unfinished, even if the leader has exited:
+        # a background child may still hold the output pipe open
+        process = self._process
+        if process is not None:
+            self.reason = 'wall_time'
+            kill_process_tree(process)
+
+    def finish(self, return_code, rusage=None):
+        """
+        Stop the watchdog, kill what is left of the process group, release
+        the cgroup and classify the exit
+        rusage (from wait4) tells a hard RLIMIT_CPU kill from other SIGKILLs
+        Returns: reason string or None if no limit was hit
+        """
+        if self._timer:
+            self._timer.cancel()
+        process, self._process = self._process, None
+        if process is not None:
+            kill_process_tree(process)  # background children outliving the program
+
+        if self.reason is None and self.cgroup:
+            if self._cgroup_event('memory.events', 'oom_kill'):
+                self.reason = 'memory'
+            elif self._cgroup_event('pids.events', 'max'):
+                self.reason = 'processes'
+        if self.reason is None and return_code is not None and return_code < 0:
+            sig = -return_code
+            if sig == getattr(signal, 'SIGXCPU', None):
+                self.reason = 'cpu_time'
+            elif sig == getattr(signal, 'SIGXFSZ', None):
+                self.reason = 'file_size'
+            elif (sig == getattr(signal, 'SIGKILL', None) and rusage is not None
+                    and self.limits.get('cpu_seconds')
+                    and rusage.ru_utime + rusage.ru_stime >= self.limits['cpu_seconds']):
+                self.reason = 'cpu_time'
+
+        if self.cgroup:
+            self.memory_peak = self._read_int('memory.peak')
+        self._remove_cgroup()
+        return self.reason
+
+    def _read_int(self, filename):
+        try:
+            with open(os.path.join(self.cgroup, filename)) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _cgroup_event(self, filename, event):
+        """True if a cgroup event counter (e.g. oom_kill) is non-zero"""
+        try:
+            with open(os.path.join(self.cgroup, filename)) as f:
+                for line in f:
+                    key, _, value = line.partition(' ')
+                    if key == event and int(value) > 0:
+                        return True
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def _remove_cgroup(self):
+        if not self.cgroup:
+            return
+        try:
+            self._write(self.cgroup, 'cgroup.kill', '1')
+            os.rmdir(self.cgroup)
+        except OSError:
+            pass
+        self.cgroup = None
+
+    def limit_value(self):
+        """Configured value of the limit that was hit"""
+        return self.limits.get(REASON_LIMITS[self.reason]) if self.reason else None
+
+    def describe(self):
+        """Message for the kill reason, e.g. 'Time limit exceeded (10s)'"""
+        if not self.reason:
+            return None
+        limit = self.limit_value() or 0
+        return REASON_MESSAGES[self.reason].format(limit=limit, limit_mb=limit // (1024 * 1024))
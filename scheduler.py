@@ -0,0 +1,161 @@
+"""
+Execution Scheduler
+Bounded worker pool with fair per-session queueing and admission control
+
+A new run supersedes its session's queued one (app.supersede_runs), so
+each session has at most one job waiting. Queue positions are pushed to
+the jobs about to start on every change and to the rest of the queue at
+most every QUEUE_POSITION_INTERVAL, since every dispatch moves them all.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from config import MAX_CONCURRENT_RUNS, MAX_QUEUED_RUNS, QUEUE_POSITION_INTERVAL
+
+class Job:
+    def __init__(self, sid, run_id, target):
+        self.sid = sid
+        self.run_id = run_id
+        self.target = target
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self.position = None  # last position reported to the client
+
+    @property
+    def queue_wait(self):
+        """Seconds spent waiting for a worker"""
+        return (self.started_at or time.time()) - self.enqueued_at
+
+
+class ExecutionScheduler:
+    def __init__(self, workers=MAX_CONCURRENT_RUNS, max_queued=MAX_QUEUED_RUNS,
+                 on_position=None, position_interval=QUEUE_POSITION_INTERVAL):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.on_position = on_position  # callback(job, position), position 0 = started
+        self.position_interval = position_interval
+        self._last_sweep = 0.0  # when every queued job last got its position
+        self.queues = OrderedDict()  # sid -> deque of jobs, in round-robin order
+        self.queued = 0
+        self.running = 0
+        self.rejected = 0
+        self.cond = threading.Condition()
+
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker,
+                name=f'noc-run-worker-{i}',
+                daemon=True
+            ).start()
+
+    def submit(self, sid, run_id, target):
+        """
+        Queue target() to run on a worker
+        Returns: (accepted, job, error_message)
+        """
+        with self.cond:
+            queue = self.queues.get(sid)
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                return False, None, "Server is busy: run queue is full. Please try again shortly."
+
+            job = Job(sid, run_id, target)
+            if queue is None:
+                queue = self.queues[sid] = deque()
+            queue.append(job)
+            self.queued += 1
+            self.cond.notify()
+            positions = self._positions()
+
+        self._report(positions)
+        return True, job, None
+
+    def cancel(self, sid, run_id=None):
+        """Remove queued (not yet started) jobs of a session; returns them"""
+        with self.cond:
+            queue = self.queues.get(sid)
+            if not queue:
+                return []
+            removed = [job for job in queue if run_id is None or job.run_id == run_id]
+            for job in removed:
+                queue.remove(job)
+            self.queued -= len(removed)
+            if not queue:
+                del self.queues[sid]
+            positions = self._positions()
+
+        self._report(positions)
+        return removed
+
+    def _next_job(self):
+        """Pop the head of the next session's queue (round robin)"""
+        sid, queue = next(iter(self.queues.items()))
+        job = queue.popleft()
+        del self.queues[sid]
+        if queue:
+            self.queues[sid] = queue  # re-append: this session goes to the back
+        self.queued -= 1
+        return job
+
+    def _positions(self):
+        """Dispatch order of every queued job (1 = next to start)"""
+        pending = [list(queue) for queue in self.queues.values()]
+        positions = []
+        depth = 0
+        while True:
+            round_jobs = [jobs[depth] for jobs in pending if depth < len(jobs)]
+            if not round_jobs:
+                break
+            positions.extend(round_jobs)
+            depth += 1
+        return [(job, i + 1) for i, job in enumerate(positions)]
+
+    def _report(self, positions):
+        """
+        Send changed positions: always for started, new and next-up jobs,
+        for the rest of the queue only once per position_interval
+        """
+        if not self.on_position:
+            return
+        now = time.monotonic()
+        sweep = now - self._last_sweep >= self.position_interval
+        if sweep:
+            self._last_sweep = now
+        for job, position in positions:
+            if job.position == position:
+                continue
+            if not sweep and job.position is not None and position > self.workers:
+                continue
+            job.position = position
+            try:
+                self.on_position(job, position)
+            except Exception as e:
+                print(f"Queue position error: {e}")
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                while not self.queues:
+                    self.cond.wait()
+                job = self._next_job()
+                self.running += 1
+                positions = self._positions()
+
+            job.started_at = time.time()
+            self._report([(job, 0)] + positions)
+            try:
+                job.target()
+            except Exception as e:
+                print(f"Run worker error: {e}")
+            finally:
+                with self.cond:
+                    self.running -= 1
+
+    def stats(self):
+        with self.cond:
+            return {
+                'workers': self.workers,
+                'running': self.running,
+                'queued': self.queued,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,177 @@
+"""
+Production Server
+Serves the NOC web app on a cooperative (gevent/eventlet) server
+
+The desktop app (main.py) keeps Flask-SocketIO's threading dev server. For
+a shared deployment this entry point monkey-patches the standard library
+first, so every socket, pipe read, sleep and lock in the app becomes
+non-blocking and an idle websocket costs a greenlet instead of an OS
+thread. Program runs still go through the ExecutionScheduler.
+
+With --workers N the supervisor starts N processes on the same port
+(SO_REUSEPORT, the kernel balances connections). Each worker has its own
+sessions, scheduler and caches (MAX_CONCURRENT_RUNS is divided between the
+workers' schedulers, at least one slot each), and clients use websocket-only
+transport so a connection never hops between workers mid-handshake. Pass
+--message-queue (e.g. redis://localhost:6379/0) so emits to rooms reach
+clients connected to other workers.
+
+Notes:
+    - /metrics reports the worker that answered the request
+    - under gevent the event loop reaps child processes, so per-run CPU
+      time is sampled from /proc/<pid>/stat (Linux only) instead of wait4
+
+CLI:
+    python server.py [--mode gevent|eventlet] [--workers N] [--host 0.0.0.0] [--port 5000]
+                     [--message-queue redis://localhost:6379/0]
+
+Needs: pip install gevent   (or: pip install eventlet)
+"""
+import argparse
+import os
+import sys
+
+# Only the standard library modules above may be imported before serve()
+# monkey-patches: anything holding a real socket, lock or thread would block
+
+MODES = ('gevent', 'eventlet')
+
+# Supervisor: give up on a worker that keeps dying right after start
+RESTART_WINDOW = 30  # seconds
+MAX_RESTARTS = 5  # per window and worker
+
+
+def raise_file_limit():
+    """Thousands of websockets need as many descriptors as the hard limit allows"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or hard > soft:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def serve(mode, host, port, reuse_port):
+    """Run one server process (blocks)"""
+    # Must happen before anything imports socket, threading or subprocess
+    if mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    else:
+        import eventlet
+        eventlet.monkey_patch()
+
+    raise_file_limit()
+    from config import SERVER_BACKLOG
+    from app import app
+
+    print(f"NOC worker {os.getpid()} serving on http://{host}:{port} ({mode})", flush=True)
+    if mode == 'gevent':
+        import socket
+        from gevent.pywsgi import WSGIServer
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        listener.bind((host, port))
+        listener.listen(SERVER_BACKLOG)
+        try:
+            from geventwebsocket.handler import WebSocketHandler
+            server = WSGIServer(listener, app, handler_class=WebSocketHandler, log=None)
+        except ImportError:
+            server = WSGIServer(listener, app, log=None)  # engine.io falls back to simple-websocket
+        server.serve_forever()
+    else:
+        import eventlet.wsgi
+        listener = eventlet.listen((host, port), backlog=SERVER_BACKLOG, reuse_port=reuse_port)
+        eventlet.wsgi.server(listener, app, log_output=False)
+
+
+def supervise(args):
+    """Start args.workers server processes and restart the ones that crash"""
+    import signal
+    import socket
+    import subprocess
+    import time
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        sys.exit("--workers > 1 needs SO_REUSEPORT (Linux/BSD)")
+
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--mode', args.mode,
+               '--host', args.host, '--port', str(args.port), '--workers', str(args.workers)]
+    if args.message_queue:
+        command += ['--message-queue', args.message_queue]
+
+    workers = {}  # slot -> (process, recent start times)
+    stopping = False
+
+    def start(slot, starts):
+        workers[slot] = (subprocess.Popen(command), starts + [time.monotonic()])
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process, _ in workers.values():
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for slot in range(args.workers):
+        start(slot, [])
+
+    while not stopping:
+        time.sleep(1)
+        for slot, (process, starts) in list(workers.items()):
+            if process.poll() is None or stopping:
+                continue
+            now = time.monotonic()
+            starts = [t for t in starts if now - t < RESTART_WINDOW]
+            if len(starts) >= MAX_RESTARTS:
+                print(f"Worker {slot} keeps exiting (code {process.returncode}), not restarting",
+                      file=sys.stderr)
+                del workers[slot]
+                continue
+            print(f"Worker {slot} exited with code {process.returncode}, restarting", file=sys.stderr)
+            start(slot, starts)
+        if not workers:
+            sys.exit(1)
+
+    for process, _ in workers.values():
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve NOC on a cooperative production server')
+    parser.add_argument('--mode', choices=MODES, default='gevent')
+    parser.add_argument('--workers', type=int, default=1, help='server processes sharing the port')
+    parser.add_argument('--host', default=None, help='bind address (default: SERVER_HOST)')
+    parser.add_argument('--port', type=int, default=None, help='port (default: FLASK_PORT)')
+    parser.add_argument('--message-queue', help='pub/sub URL shared by the workers (e.g. redis://...)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    # config.py reads these when app is imported
+    os.environ['NOC_SERVER_MODE'] = args.mode
+    os.environ['NOC_SERVER_WORKERS'] = str(args.workers)
+    if args.message_queue:
+        os.environ['NOC_MESSAGE_QUEUE'] = args.message_queue
+
+    from config import SERVER_HOST, FLASK_PORT  # only imports os, safe before patching
+    args.host = args.host or SERVER_HOST
+    args.port = args.port or FLASK_PORT
+
+    if args.worker or args.workers == 1:
+        serve(args.mode, args.host, args.port, reuse_port=args.workers > 1)
+    else:
+        supervise(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Session Manager
+Per-connection build workspaces and process registry
+"""
+import os
+import shutil
+import threading
+import uuid
+from config import SESSIONS_DIR
+from utils import ensure_directory, kill_process_tree, sanitize_filename
+
+class Session:
+    """State owned by one Socket.IO connection"""
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.root = os.path.join(SESSIONS_DIR, sanitize_filename(sid))
+        self.lock = threading.Lock()
+        self.processes = {}  # run_id -> Popen
+        self.cancel_events = {}  # run_id -> Event, set to abort compilation
+        self.pumps = {}  # run_id -> OutputPump, for client acks
+        self.current_run = None
+
+    def new_run(self):
+        """
+        Create an isolated workspace for a single run
+        Returns: (run_id, workspace_path)
+        """
+        run_id = uuid.uuid4().hex[:12]
+        path = ensure_directory(os.path.join(self.root, run_id))
+        with self.lock:
+            self.current_run = run_id
+            self.cancel_events[run_id] = threading.Event()
+        return run_id, path
+
+    def get_cancel_event(self, run_id):
+        with self.lock:
+            return self.cancel_events.setdefault(run_id, threading.Event())
+
+    def is_current(self, run_id):
+        """True until a newer run of this session replaces run_id"""
+        with self.lock:
+            return self.current_run == run_id
+
+    def attach_process(self, run_id, process):
+        with self.lock:
+            self.processes[run_id] = process
+
+    def attach_pump(self, run_id, pump):
+        with self.lock:
+            self.pumps[run_id] = pump
+
+    def get_pump(self, run_id=None):
+        with self.lock:
+            return self.pumps.get(run_id or self.current_run)
+
+    def get_process(self, run_id=None):
+        """Get the process for run_id (default: the latest run)"""
+        with self.lock:
+            return self.processes.get(run_id or self.current_run)
+
+    def kill_running(self, except_run=None):
+        """Cancel compiles and kill every live process of this session"""
+        with self.lock:
+            for run_id, event in self.cancel_events.items():
+                if run_id != except_run:
+                    event.set()
+            processes = [
+                process for run_id, process in self.processes.items()
+                if run_id != except_run
+            ]
+            for run_id, pump in self.pumps.items():
+                if run_id != except_run:
+                    pump.release()
+        for process in processes:
+            try:
+                kill_process_tree(process)
+            except Exception as e:
+                print(f"Kill error: {e}")
+
+    def finish_run(self, run_id):
+        """Forget the run's process and remove its workspace"""
+        with self.lock:
+            self.processes.pop(run_id, None)
+            self.cancel_events.pop(run_id, None)
+            self.pumps.pop(run_id, None)
+            if self.current_run == run_id:
+                self.current_run = None
+        shutil.rmtree(os.path.join(self.root, run_id), ignore_errors=True)
+
+    def close(self):
+        self.kill_running()
+        with self.lock:
+            self.processes.clear()
+            self.cancel_events.clear()
+            self.pumps.clear()
+            self.current_run = None
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class SessionManager:
+    def __init__(self):
+        self.sessions = {}
+        self.lock = threading.Lock()
+        ensure_directory(SESSIONS_DIR)
+
+    def get(self, sid):
+        """Get or create the session for a connection"""
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                session = self.sessions[sid] = Session(sid)
+            return session
+
+    def close(self, sid):
+        """Kill the session's processes and drop its workspaces"""
+        with self.lock:
+            session = self.sessions.pop(sid, None)
+        if session:
+            session.close()
+
+    def active_count(self):
+        with self.lock:
+            return len(self.sessions)
@@ -0,0 +1,223 @@
+"""
+SQL Engine
+Executes a SQL script statement by statement on an in-memory SQLite database
+
+Run as a program (usually inside a warm Python worker):
+    python sql_engine.py script.sql [--fixture db] [--max-rows N]
+
+Every result set is printed as a table with its column names and timing;
+runs of statements without results are summarized in one line. The first
+failing statement stops the script with exit code 1. A fixture database
+file is memory-mapped and deserialized into the connection, so the run
+starts from a private in-memory copy without replaying its setup SQL.
+"""
+import argparse
+import mmap
+import os
+import sqlite3
+import sys
+import time
+
+MAX_COLUMN_WIDTH = 40
+
+
+def split_statements(script):
+    """
+    Yield (line_number, statement) for each complete statement in script
+    sqlite3.complete_statement handles quotes, comments and trigger bodies
+    """
+    start = 0
+    line = 1
+    position = 0
+    while True:
+        position = script.find(';', position)
+        if position == -1:
+            break
+        position += 1
+        candidate = script[start:position]
+        if sqlite3.complete_statement(candidate):
+            offset = _code_start(candidate)
+            if offset is not None:
+                yield line + candidate[:offset].count('\n'), candidate[offset:].strip()
+            line += candidate.count('\n')
+            start = position
+
+    rest = script[start:]
+    offset = _code_start(rest)
+    if offset is not None:
+        yield line + rest[:offset].count('\n'), rest[offset:].strip()
+
+
+def _code_start(text):
+    """
+    Offset of the first character that is not whitespace or a comment
+    Returns: None for empty statements and ones made only of comments
+    """
+    offset = 0
+    while offset < len(text):
+        if text[offset].isspace():
+            offset += 1
+        elif text.startswith('--', offset):
+            newline = text.find('\n', offset)
+            offset = len(text) if newline == -1 else newline + 1
+        elif text.startswith('/*', offset):
+            end = text.find('*/', offset)
+            offset = len(text) if end == -1 else end + 2
+        elif text[offset] == ';':
+            offset += 1
+        else:
+            return offset
+    return None
+
+
+def format_value(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bytes):
+        return "x'" + value.hex() + "'"
+    text = str(value).replace('\n', '\\n').replace('\t', ' ')
+    if len(text) > MAX_COLUMN_WIDTH:
+        text = text[:MAX_COLUMN_WIDTH - 1] + '…'
+    return text
+
+
+def format_table(columns, rows):
+    """Render rows as an aligned text table with a header"""
+    cells = [[format_value(value) for value in row] for row in rows]
+    headers = [format_value(name) for name in columns]
+    widths = [len(header) for header in headers]
+    for row in cells:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(cell))
+
+    def line(values):
+        return ' | '.join(value.ljust(width) for value, width in zip(values, widths)).rstrip()
+
+    out = [line(headers), '-+-'.join('-' * width for width in widths)]
+    out.extend(line(row) for row in cells)
+    return '\n'.join(out)
+
+
+def format_ms(seconds):
+    return f'{seconds * 1000:.2f} ms'
+
+
+def load_fixture(con, path):
+    """Copy a database file into the in-memory connection"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # empty database: nothing to copy (and mmap rejects it)
+        if hasattr(con, 'deserialize'):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as image:
+                con.deserialize(image)
+            return
+    # Python < 3.11: page-level copy through the backup API
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        source.backup(con)
+    finally:
+        source.close()
+
+
+class Runner:
+    def __init__(self, con, max_rows, out=sys.stdout):
+        self.con = con
+        self.max_rows = max_rows
+        self.out = out
+        self.pending_count = 0  # statements without results since the last output
+        self.pending_changes = 0
+        self.pending_seconds = 0.0
+
+    def run(self, script):
+        """Returns: True if every statement succeeded"""
+        started = time.perf_counter()
+        executed = 0
+        for line, statement in split_statements(script):
+            if not self.execute(line, statement):
+                return False
+            executed += 1
+        self.flush_pending()
+        self.write(f'-- {executed} statement{"s" if executed != 1 else ""} '
+                   f'in {format_ms(time.perf_counter() - started)}')
+        return True
+
+    def execute(self, line, statement):
+        cursor = self.con.cursor()
+        began = time.perf_counter()
+        try:
+            cursor.execute(statement)
+            if cursor.description is None:
+                elapsed = time.perf_counter() - began
+                self.pending_count += 1
+                self.pending_changes += max(cursor.rowcount, 0)
+                self.pending_seconds += elapsed
+                return True
+
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchmany(self.max_rows + 1)
+            more = len(rows) > self.max_rows
+            extra = len(rows) - self.max_rows + sum(1 for _ in cursor) if more else 0
+            rows = rows[:self.max_rows]
+            elapsed = time.perf_counter() - began
+        except sqlite3.Error as e:
+            self.flush_pending()
+            self.write(f'SQL Error at line {line}: {e}\n  {_first_line(statement)}', error=True)
+            return False
+        finally:
+            cursor.close()
+
+        self.flush_pending()
+        self.write(f'-- line {line}: {_first_line(statement)}')
+        self.write(format_table(columns, rows))
+        total = len(rows) + extra
+        summary = f'({total} row{"s" if total != 1 else ""}, {format_ms(elapsed)})'
+        if more:
+            summary = f'... {extra} more rows not shown\n' + summary
+        self.write(summary + '\n')
+        return True
+
+    def flush_pending(self):
+        if not self.pending_count:
+            return
+        noun = 'statement' if self.pending_count == 1 else 'statements'
+        changes = f', {self.pending_changes} rows affected' if self.pending_changes else ''
+        self.write(f'OK: {self.pending_count} {noun}{changes} ({format_ms(self.pending_seconds)})\n')
+        self.pending_count = self.pending_changes = 0
+        self.pending_seconds = 0.0
+
+    def write(self, text, error=False):
+        stream = sys.stderr if error else self.out
+        stream.write(text + '\n')
+        stream.flush()
+
+
+def _first_line(statement, limit=80):
+    line = statement.strip().splitlines()[0] if statement.strip() else ''
+    if len(line) > limit or '\n' in statement.strip():
+        line = line[:limit].rstrip() + ' ...'
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a SQL script on in-memory SQLite')
+    parser.add_argument('script')
+    parser.add_argument('--fixture', help='database file to start from')
+    parser.add_argument('--max-rows', type=int, default=1000, help='rows printed per result set')
+    args = parser.parse_args(argv)
+
+    with open(args.script, 'r', encoding='utf-8') as f:
+        script = f.read()
+
+    # Autocommit: BEGIN/COMMIT in the script behave as written
+    con = sqlite3.connect(':memory:', isolation_level=None)
+    try:
+        if args.fixture:
+            load_fixture(con, args.fixture)
+        ok = Runner(con, max(0, args.max_rows)).run(script)
+    finally:
+        con.close()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
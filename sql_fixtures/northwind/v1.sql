@@ -0,0 +1,224 @@
+-- Northwind sample database (trimmed): reference tables are listed in
+-- full, orders and order lines are generated deterministically.
+
+CREATE TABLE categories (
+    category_id INTEGER PRIMARY KEY,
+    category_name TEXT NOT NULL,
+    description TEXT
+);
+
+CREATE TABLE suppliers (
+    supplier_id INTEGER PRIMARY KEY,
+    company_name TEXT NOT NULL,
+    contact_name TEXT,
+    city TEXT,
+    country TEXT
+);
+
+CREATE TABLE products (
+    product_id INTEGER PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    supplier_id INTEGER REFERENCES suppliers(supplier_id),
+    category_id INTEGER REFERENCES categories(category_id),
+    quantity_per_unit TEXT,
+    unit_price REAL NOT NULL DEFAULT 0,
+    units_in_stock INTEGER NOT NULL DEFAULT 0,
+    discontinued INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE customers (
+    customer_id TEXT PRIMARY KEY,
+    company_name TEXT NOT NULL,
+    contact_name TEXT,
+    city TEXT,
+    country TEXT
+);
+
+CREATE TABLE employees (
+    employee_id INTEGER PRIMARY KEY,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    title TEXT,
+    hire_date TEXT,
+    reports_to INTEGER REFERENCES employees(employee_id)
+);
+
+CREATE TABLE shippers (
+    shipper_id INTEGER PRIMARY KEY,
+    company_name TEXT NOT NULL,
+    phone TEXT
+);
+
+CREATE TABLE orders (
+    order_id INTEGER PRIMARY KEY,
+    customer_id TEXT REFERENCES customers(customer_id),
+    employee_id INTEGER REFERENCES employees(employee_id),
+    order_date TEXT,
+    shipped_date TEXT,
+    ship_via INTEGER REFERENCES shippers(shipper_id),
+    freight REAL
+);
+
+CREATE TABLE order_details (
+    order_id INTEGER REFERENCES orders(order_id),
+    product_id INTEGER REFERENCES products(product_id),
+    unit_price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    discount REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (order_id, product_id)
+);
+
+INSERT INTO categories VALUES
+    (1, 'Beverages', 'Soft drinks, coffees, teas, beers, and ales'),
+    (2, 'Condiments', 'Sweet and savory sauces, relishes, spreads, and seasonings'),
+    (3, 'Confections', 'Desserts, candies, and sweet breads'),
+    (4, 'Dairy Products', 'Cheeses'),
+    (5, 'Grains/Cereals', 'Breads, crackers, pasta, and cereal'),
+    (6, 'Meat/Poultry', 'Prepared meats'),
+    (7, 'Produce', 'Dried fruit and bean curd'),
+    (8, 'Seafood', 'Seaweed and fish');
+
+INSERT INTO suppliers VALUES
+    (1, 'Exotic Liquids', 'Charlotte Cooper', 'London', 'UK'),
+    (2, 'New Orleans Cajun Delights', 'Shelley Burke', 'New Orleans', 'USA'),
+    (3, 'Grandma Kelly''s Homestead', 'Regina Murphy', 'Ann Arbor', 'USA'),
+    (4, 'Tokyo Traders', 'Yoshi Nagase', 'Tokyo', 'Japan'),
+    (5, 'Cooperativa de Quesos ''Las Cabras''', 'Antonio del Valle Saavedra', 'Oviedo', 'Spain'),
+    (6, 'Mayumi''s', 'Mayumi Ohno', 'Osaka', 'Japan'),
+    (7, 'Pavlova, Ltd.', 'Ian Devling', 'Melbourne', 'Australia'),
+    (8, 'Specialty Biscuits, Ltd.', 'Peter Wilson', 'Manchester', 'UK'),
+    (9, 'PB Knäckebröd AB', 'Lars Peterson', 'Göteborg', 'Sweden'),
+    (10, 'Refrescos Americanas LTDA', 'Carlos Diaz', 'São Paulo', 'Brazil'),
+    (11, 'Heli Süßwaren GmbH & Co. KG', 'Petra Winkler', 'Berlin', 'Germany'),
+    (12, 'Plutzer Lebensmittelgroßmärkte AG', 'Martin Bein', 'Frankfurt', 'Germany');
+
+INSERT INTO products VALUES
+    (1, 'Chai', 1, 1, '10 boxes x 20 bags', 18.00, 39, 0),
+    (2, 'Chang', 1, 1, '24 - 12 oz bottles', 19.00, 17, 0),
+    (3, 'Aniseed Syrup', 1, 2, '12 - 550 ml bottles', 10.00, 13, 0),
+    (4, 'Chef Anton''s Cajun Seasoning', 2, 2, '48 - 6 oz jars', 22.00, 53, 0),
+    (5, 'Chef Anton''s Gumbo Mix', 2, 2, '36 boxes', 21.35, 0, 1),
+    (6, 'Grandma''s Boysenberry Spread', 3, 2, '12 - 8 oz jars', 25.00, 120, 0),
+    (7, 'Uncle Bob''s Organic Dried Pears', 3, 7, '12 - 1 lb pkgs.', 30.00, 15, 0),
+    (8, 'Northwoods Cranberry Sauce', 3, 2, '12 - 12 oz jars', 40.00, 6, 0),
+    (9, 'Mishi Kobe Niku', 4, 6, '18 - 500 g pkgs.', 97.00, 29, 1),
+    (10, 'Ikura', 4, 8, '12 - 200 ml jars', 31.00, 31, 0),
+    (11, 'Queso Cabrales', 5, 4, '1 kg pkg.', 21.00, 22, 0),
+    (12, 'Queso Manchego La Pastora', 5, 4, '10 - 500 g pkgs.', 38.00, 86, 0),
+    (13, 'Konbu', 6, 8, '2 kg box', 6.00, 24, 0),
+    (14, 'Tofu', 6, 7, '40 - 100 g pkgs.', 23.25, 35, 0),
+    (15, 'Genen Shouyu', 6, 2, '24 - 250 ml bottles', 15.50, 39, 0),
+    (16, 'Pavlova', 7, 3, '32 - 500 g boxes', 17.45, 29, 0),
+    (17, 'Alice Mutton', 7, 6, '20 - 1 kg tins', 39.00, 0, 1),
+    (18, 'Carnarvon Tigers', 7, 8, '16 kg pkg.', 62.50, 42, 0),
+    (19, 'Teatime Chocolate Biscuits', 8, 3, '10 boxes x 12 pieces', 9.20, 25, 0),
+    (20, 'Sir Rodney''s Marmalade', 8, 3, '30 gift boxes', 81.00, 40, 0),
+    (21, 'Sir Rodney''s Scones', 8, 3, '24 pkgs. x 4 pieces', 10.00, 3, 0),
+    (22, 'Gustaf''s Knäckebröd', 9, 5, '24 - 500 g pkgs.', 21.00, 104, 0),
+    (23, 'Tunnbröd', 9, 5, '12 - 250 g pkgs.', 9.00, 61, 0),
+    (24, 'Guaraná Fantástica', 10, 1, '12 - 355 ml cans', 4.50, 20, 1),
+    (25, 'NuNuCa Nuß-Nougat-Creme', 11, 3, '20 - 450 g glasses', 14.00, 76, 0),
+    (26, 'Gumbär Gummibärchen', 11, 3, '100 - 250 g bags', 31.23, 15, 0),
+    (27, 'Schoggi Schokolade', 11, 3, '100 - 100 g pieces', 43.90, 49, 0),
+    (28, 'Rössle Sauerkraut', 12, 7, '25 - 825 g cans', 45.60, 26, 1),
+    (29, 'Thüringer Rostbratwurst', 12, 6, '50 bags x 30 sausgs.', 123.79, 0, 1),
+    (30, 'Nord-Ost Matjeshering', 12, 8, '10 - 200 g glasses', 25.89, 10, 0);
+
+INSERT INTO employees VALUES
+    (1, 'Davolio', 'Nancy', 'Sales Representative', '1992-05-01', 2),
+    (2, 'Fuller', 'Andrew', 'Vice President, Sales', '1992-08-14', NULL),
+    (3, 'Leverling', 'Janet', 'Sales Representative', '1992-04-01', 2),
+    (4, 'Peacock', 'Margaret', 'Sales Representative', '1993-05-03', 2),
+    (5, 'Buchanan', 'Steven', 'Sales Manager', '1993-10-17', 2),
+    (6, 'Suyama', 'Michael', 'Sales Representative', '1993-10-17', 5),
+    (7, 'King', 'Robert', 'Sales Representative', '1994-01-02', 5),
+    (8, 'Callahan', 'Laura', 'Inside Sales Coordinator', '1994-03-05', 2),
+    (9, 'Dodsworth', 'Anne', 'Sales Representative', '1994-11-15', 5);
+
+INSERT INTO shippers VALUES
+    (1, 'Speedy Express', '(503) 555-9831'),
+    (2, 'United Package', '(503) 555-3199'),
+    (3, 'Federal Shipping', '(503) 555-9931');
+
+INSERT INTO customers VALUES
+    ('ALFKI', 'Alfreds Futterkiste', 'Maria Anders', 'Berlin', 'Germany'),
+    ('ANATR', 'Ana Trujillo Emparedados y helados', 'Ana Trujillo', 'México D.F.', 'Mexico'),
+    ('ANTON', 'Antonio Moreno Taquería', 'Antonio Moreno', 'México D.F.', 'Mexico'),
+    ('AROUT', 'Around the Horn', 'Thomas Hardy', 'London', 'UK'),
+    ('BERGS', 'Berglunds snabbköp', 'Christina Berglund', 'Luleå', 'Sweden'),
+    ('BLAUS', 'Blauer See Delikatessen', 'Hanna Moos', 'Mannheim', 'Germany'),
+    ('BLONP', 'Blondesddsl père et fils', 'Frédérique Citeaux', 'Strasbourg', 'France'),
+    ('BOLID', 'Bólido Comidas preparadas', 'Martín Sommer', 'Madrid', 'Spain'),
+    ('BONAP', 'Bon app''', 'Laurence Lebihan', 'Marseille', 'France'),
+    ('BOTTM', 'Bottom-Dollar Markets', 'Elizabeth Lincoln', 'Tsawassen', 'Canada'),
+    ('BSBEV', 'B''s Beverages', 'Victoria Ashworth', 'London', 'UK'),
+    ('CACTU', 'Cactus Comidas para llevar', 'Patricio Simpson', 'Buenos Aires', 'Argentina'),
+    ('CHOPS', 'Chop-suey Chinese', 'Yang Wang', 'Bern', 'Switzerland'),
+    ('COMMI', 'Comércio Mineiro', 'Pedro Afonso', 'São Paulo', 'Brazil'),
+    ('CONSH', 'Consolidated Holdings', 'Elizabeth Brown', 'London', 'UK'),
+    ('DRACD', 'Drachenblut Delikatessen', 'Sven Ottlieb', 'Aachen', 'Germany'),
+    ('DUMON', 'Du monde entier', 'Janine Labrune', 'Nantes', 'France'),
+    ('EASTC', 'Eastern Connection', 'Ann Devon', 'London', 'UK'),
+    ('ERNSH', 'Ernst Handel', 'Roland Mendel', 'Graz', 'Austria'),
+    ('FAMIA', 'Familia Arquibaldo', 'Aria Cruz', 'São Paulo', 'Brazil'),
+    ('FOLKO', 'Folk och fä HB', 'Maria Larsson', 'Bräcke', 'Sweden'),
+    ('FRANK', 'Frankenversand', 'Peter Franken', 'München', 'Germany'),
+    ('GODOS', 'Godos Cocina Típica', 'José Pedro Freyre', 'Sevilla', 'Spain'),
+    ('HANAR', 'Hanari Carnes', 'Mario Pontes', 'Rio de Janeiro', 'Brazil'),
+    ('HUNGC', 'Hungry Coyote Import Store', 'Yoshi Latimer', 'Elgin', 'USA'),
+    ('ISLAT', 'Island Trading', 'Helen Bennett', 'Cowes', 'UK'),
+    ('KOENE', 'Königlich Essen', 'Philip Cramer', 'Brandenburg', 'Germany'),
+    ('LAZYK', 'Lazy K Kountry Store', 'John Steel', 'Walla Walla', 'USA'),
+    ('MAGAA', 'Magazzini Alimentari Riuniti', 'Giovanni Rovelli', 'Bergamo', 'Italy'),
+    ('OCEAN', 'Océano Atlántico Ltda.', 'Yvonne Moncada', 'Buenos Aires', 'Argentina'),
+    ('QUICK', 'QUICK-Stop', 'Horst Kloss', 'Cunewalde', 'Germany'),
+    ('RATTC', 'Rattlesnake Canyon Grocery', 'Paula Wilson', 'Albuquerque', 'USA'),
+    ('SAVEA', 'Save-a-lot Markets', 'Jose Pavarotti', 'Boise', 'USA'),
+    ('SEVES', 'Seven Seas Imports', 'Hari Kumar', 'London', 'UK'),
+    ('VAFFE', 'Vaffeljernet', 'Palle Ibsen', 'Århus', 'Denmark'),
+    ('WOLZA', 'Wolski Zajazd', 'Zbyszek Piestrzeniewicz', 'Warszawa', 'Poland');
+
+-- 830 orders between 1996-07-04 and 1998-05-06, spread over customers,
+-- employees and shippers with a fixed linear congruential sequence
+INSERT INTO orders (order_id, customer_id, employee_id, order_date, shipped_date, ship_via, freight)
+WITH RECURSIVE seq(n, r) AS (
+    SELECT 1, 12345
+    UNION ALL
+    SELECT n + 1, (r * 1103515245 + 12345) % 2147483648 FROM seq WHERE n < 830
+),
+numbered_customers AS (
+    SELECT customer_id, row_number() OVER (ORDER BY customer_id) - 1 AS idx FROM customers
+)
+SELECT
+    10247 + n,
+    (SELECT customer_id FROM numbered_customers WHERE idx = r % (SELECT count(*) FROM customers)),
+    1 + (r / 7) % 9,
+    date('1996-07-04', '+' || (n * 671 / 830) || ' days'),
+    CASE WHEN (r / 11) % 37 = 0 THEN NULL
+         ELSE date('1996-07-04', '+' || (n * 671 / 830 + 1 + (r / 13) % 30) || ' days') END,
+    1 + (r / 17) % 3,
+    round(((r / 19) % 100000) / 100.0, 2)
+FROM seq;
+
+-- One to four lines per order
+INSERT INTO order_details (order_id, product_id, unit_price, quantity, discount)
+WITH RECURSIVE lines(order_id, line, r) AS (
+    SELECT order_id, 1, (order_id * 2654435761) % 2147483648 FROM orders
+    UNION ALL
+    SELECT order_id, line + 1, (r * 1103515245 + 12345) % 2147483648
+    FROM lines WHERE line < 1 + (order_id * 7) % 4
+)
+SELECT DISTINCT
+    l.order_id,
+    1 + (l.r / 3) % 30 AS product_id,
+    p.unit_price,
+    1 + (l.r / 5) % 60,
+    CASE (l.r / 23) % 5 WHEN 0 THEN 0.05 WHEN 1 THEN 0.1 ELSE 0 END
+FROM lines l
+JOIN products p ON p.product_id = 1 + (l.r / 3) % 30
+WHERE true
+ON CONFLICT (order_id, product_id) DO NOTHING;
+
+CREATE INDEX idx_orders_customer ON orders(customer_id);
+CREATE INDEX idx_orders_employee ON orders(employee_id);
+CREATE INDEX idx_order_details_product ON order_details(product_id);
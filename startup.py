@@ -0,0 +1,56 @@
+"""
+Startup Profile
+Records when each launch phase finished, relative to the launcher's start
+
+main.py imports this module first, so its import time is the zero point.
+Phases are marked from any thread (server import, UI, background loading);
+the report is printed with `python main.py --profile-startup` and served
+at /api/startup.
+"""
+import threading
+import time
+
+STARTED = time.perf_counter()
+
+
+class StartupProfile:
+    def __init__(self, started=STARTED):
+        self.started = started
+        self.phases = []  # (name, seconds since start, thread name)
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        """Record that phase `name` finished now"""
+        with self.lock:
+            self.phases.append((name, time.perf_counter() - self.started, threading.current_thread().name))
+
+    def seconds(self, name):
+        """When a phase finished, or None if it has not"""
+        with self.lock:
+            return next((at for phase, at, _ in self.phases if phase == name), None)
+
+    def report(self):
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        previous = 0.0
+        rows = []
+        for name, at, thread in phases:
+            rows.append({
+                'phase': name,
+                'at_ms': round(at * 1000, 1),
+                'delta_ms': round((at - previous) * 1000, 1),
+                'thread': thread
+            })
+            previous = at
+        return {'phases': rows, 'total_ms': rows[-1]['at_ms'] if rows else 0.0}
+
+    def format(self):
+        """Plain-text table of the report"""
+        lines = [f"{'phase':<24} {'at':>9} {'delta':>9}  thread"]
+        for row in self.report()['phases']:
+            lines.append(f"{row['phase']:<24} {row['at_ms']:>7.1f}ms {row['delta_ms']:>7.1f}ms  {row['thread']}")
+        return '\n'.join(lines)
+
+
+# Startup Profile Singleton
+startup_profile = StartupProfile()
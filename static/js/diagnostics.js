@@ -0,0 +1,98 @@
+/**
+ * Live Diagnostics
+ * Streams editor edits to the server's extension analysers and shows their results as markers
+ */
+
+// Marker owner per result source: extension heuristics, compiler check-only pass
+const DIAGNOSTICS_OWNERS = { extensions: 'noc-extensions', compiler: 'noc-compiler' };
+const diagnosticLanguages = new Set(window.DIAGNOSTIC_LANGUAGES || []);
+
+// tabId -> version of the text the server last received
+const diagnosticsDocs = {};
+
+function diagnosticsOpen(tabId) {
+    const editorData = editorState.editors[tabId];
+    if (!editorData) return;
+    const model = editorData.editor.getModel();
+
+    if (!diagnosticLanguages.has(editorData.language)) {
+        diagnosticsClose(tabId);
+        return;
+    }
+    diagnosticsDocs[tabId] = model.getVersionId();
+    socket.emit('diagnostics_open', {
+        doc_id: tabId,
+        language: editorData.language,
+        code: model.getValue(),
+        version: model.getVersionId()
+    });
+}
+
+function diagnosticsChange(tabId, event) {
+    if (!(tabId in diagnosticsDocs)) return;
+    // Only the edit travels; the server applies it to its copy and debounces analysis
+    socket.emit('diagnostics_change', {
+        doc_id: tabId,
+        base_version: diagnosticsDocs[tabId],
+        version: event.versionId,
+        changes: event.changes.map(change => ({
+            range: {
+                startLineNumber: change.range.startLineNumber,
+                startColumn: change.range.startColumn,
+                endLineNumber: change.range.endLineNumber,
+                endColumn: change.range.endColumn
+            },
+            text: change.text
+        }))
+    });
+    diagnosticsDocs[tabId] = event.versionId;
+}
+
+function diagnosticsClose(tabId) {
+    if (!(tabId in diagnosticsDocs)) return;
+    delete diagnosticsDocs[tabId];
+    socket.emit('diagnostics_close', { doc_id: tabId });
+
+    const editorData = editorState.editors[tabId];
+    if (editorData) {
+        Object.values(DIAGNOSTICS_OWNERS).forEach(owner =>
+            editorState.monaco.editor.setModelMarkers(editorData.editor.getModel(), owner, []));
+    }
+}
+
+function toMarker(model, diagnostic) {
+    const severities = editorState.monaco.MarkerSeverity;
+    const line = Math.min(Math.max(diagnostic.line || 1, 1), model.getLineCount());
+    const endColumn = model.getLineMaxColumn(line);
+    const startColumn = Math.min(Math.max(diagnostic.column || 1, 1), Math.max(endColumn - 1, 1));
+    return {
+        severity: diagnostic.severity === 'error' ? severities.Error
+            : diagnostic.severity === 'warning' ? severities.Warning : severities.Info,
+        message: diagnostic.message,
+        startLineNumber: line,
+        startColumn: startColumn,
+        endLineNumber: line,
+        endColumn: endColumn
+    };
+}
+
+socket.on('diagnostics', function(msg) {
+    const editorData = editorState.editors[msg.doc_id];
+    if (!editorData || !(msg.doc_id in diagnosticsDocs)) return;
+    const model = editorData.editor.getModel();
+    // Results for text the user has already changed would point at the wrong lines
+    if (msg.version !== model.getVersionId()) return;
+
+    editorState.monaco.editor.setModelMarkers(model, DIAGNOSTICS_OWNERS[msg.source] || DIAGNOSTICS_OWNERS.extensions,
+        msg.diagnostics.map(diagnostic => toMarker(model, diagnostic)));
+    if (editorState.activeTabId === msg.doc_id) checkSyntaxErrors(msg.doc_id);
+});
+
+socket.on('diagnostics_resync', function(msg) {
+    if (msg.doc_id in diagnosticsDocs) diagnosticsOpen(msg.doc_id);
+});
+
+// The server forgets documents when the connection drops
+socket.on('connect', function() {
+    Object.keys(diagnosticsDocs).forEach(diagnosticsOpen);
+});
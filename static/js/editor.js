@@ -10,9 +10,11 @@ const editorState = {
 
 const templates = {
     python: "# Python Example\nprint('Hello from NOC!')\nname = input('What is your name? ')\nprint(f'Nice to meet you, {name}!')",
+    c: "#include <stdio.h>\n\nint main(void) {\n    printf(\"Hello from C!\\n\");\n    return 0;\n}",
     cpp: "#include <iostream>\nusing namespace std;\n\nint main() {\n    cout << \"Hello from C++!\" << endl;\n    return 0;\n}",
     csharp: "using System;\n\nclass Program {\n    static void Main() {\n        Console.WriteLine(\"Hello from C#!\");\n    }\n}",
     java: "public class Main {\n    public static void main(String[] args) {\n        System.out.println(\"Hello from Java!\");\n    }\n}",
+    typescript: "// TypeScript Example\nconst greet = (name: string): string => `Hello from ${name}!`;\nconsole.log(greet('TypeScript'));",
     javascript: "// Node.js Example\nconsole.log('Hello from Node.js!');\n\nconst readline = require('readline').createInterface({\n    input: process.stdin,\n    output: process.stdout\n});\n\nreadline.question('What is your name? ', name => {\n    console.log(`Nice to meet you, ${name}!`);\n    readline.close();\n});",
     sql: "-- SQLite In-Memory Database\nCREATE TABLE Users (ID INT, Name TEXT);\nINSERT INTO Users VALUES (1, 'Neo'), (2, 'Trinity');\nSELECT * FROM Users;",
     rust: "fn main() {\n    println!(\"Hello from Rust!\");\n}",
@@ -20,10 +22,19 @@ const templates = {
     bash: "#!/bin/bash\n\necho 'Hello from Bash!'\necho 'Current directory:'\npwd\necho ''\necho 'Files:'\nls -la",
     zig: "const std = @import(\"std\");\n\npub fn main() void {\n    std.debug.print(\"Hello from Zig!\\n\", .{});\n}",
     scala: "object Main extends App {\n    println(\"Hello from Scala!\")\n}",
+    kotlin: "fun main() {\n    println(\"Hello from Kotlin!\")\n    print(\"What is your name? \")\n    val name = readLine()\n    println(\"Nice to meet you, $name!\")\n}",
     go: "package main\n\nimport \"fmt\"\n\nfunc main() {\n    fmt.Println(\"Hello from Go!\")\n}"
 };
 
+// Languages registered on the server (name, label, monaco, template, ...)
+const languageInfo = Object.fromEntries((window.LANGUAGES || []).map(info => [info.name, info]));
+
+function getTemplate(lang) {
+    return templates[lang] || (languageInfo[lang] && languageInfo[lang].template) || '';
+}
+
 function getMonacoLanguage(lang) {
+    if (languageInfo[lang]) return languageInfo[lang].monaco;
     const mappings = {
         'cpp': 'cpp',
         'csharp': 'csharp',
@@ -74,7 +85,7 @@ function createEditorInstance(tabId, language, initialCode) {
     document.getElementById('editor-container').appendChild(container);
     
     const editor = editorState.monaco.editor.create(container, {
-        value: initialCode || templates[language] || '',
+        value: initialCode || getTemplate(language),
         language: getMonacoLanguage(language),
         theme: 'vs-dark',
         automaticLayout: true,
@@ -95,8 +106,9 @@ function createEditorInstance(tabId, language, initialCode) {
     });
     
     // Listen to content changes
-    editor.onDidChangeModelContent(() => {
+    editor.onDidChangeModelContent((e) => {
         updateTabModifiedState(tabId, true);
+        diagnosticsChange(tabId, e);
         checkSyntaxErrors(tabId);
     });
     
@@ -46,6 +46,7 @@ function createNewTab(language = 'python', name = null, code = null) {
         name: tabName,
         modified: false
     };
+    diagnosticsOpen(tabId);
     
     // Switch to new tab
     switchTab(tabId);
@@ -104,6 +105,7 @@ function closeTab(tabId, event) {
     
     // Dispose editor
     if (tabData) {
+        diagnosticsClose(tabId);
         tabData.editor.dispose();
         const editorView = document.getElementById(`editor-${tabId}`);
         if (editorView) editorView.remove();
@@ -132,11 +134,12 @@ function changeLanguage() {
     editorState.monaco.editor.setModelLanguage(editor.getModel(), monacoLang);
     
     // Set template
-    editor.setValue(templates[newLang] || '');
+    editor.setValue(getTemplate(newLang));
     
     // Update tab data
     editorData.language = newLang;
     editorData.modified = false;
+    diagnosticsOpen(tabId);
     
     // Update tab icon
     updateTabDisplay(tabId);
@@ -170,6 +173,9 @@ function getLanguageIcon(language) {
         'python': 'fa-file-code',
         'javascript': 'fa-file-code',
         'cpp': 'fa-file-code',
+        'c': 'fa-file-code',
+        'typescript': 'fa-file-code',
+        'kotlin': 'fa-file-code',
         'csharp': 'fa-file-code',
         'java': 'fa-coffee',
         'sql': 'fa-database',
@@ -215,10 +221,14 @@ document.addEventListener('keydown', (e) => {
         switchTab(tabIds[nextIndex]);
     }
     
-    // F5: Run code
+    // F5: Run code, Shift+F5: Stop
     if (e.key === 'F5') {
         e.preventDefault();
-        runCode();
+        if (e.shiftKey) {
+            stopCode();
+        } else {
+            runCode();
+        }
     }
     
     // Ctrl+Shift+A: Toggle AI
@@ -226,4 +236,10 @@ document.addEventListener('keydown', (e) => {
         e.preventDefault();
         toggleAIPanel();
     }
+    
+    // Ctrl+Shift+E: Toggle test cases
+    if (e.ctrlKey && e.shiftKey && e.key === 'E') {
+        e.preventDefault();
+        toggleTestsPanel();
+    }
 });
\ No newline at end of file
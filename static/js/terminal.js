@@ -2,10 +2,19 @@
  * Terminal I/O Management
  */
 
-const socket = io();
+const socket = io(window.SOCKETIO_OPTIONS || {});
 const outputDiv = document.getElementById('output-container');
 const inputField = document.getElementById('term-input');
 
+// Oldest output nodes are dropped beyond this many
+const MAX_OUTPUT_NODES = 5000;
+
+function trimOutput() {
+    while (outputDiv.childNodes.length > MAX_OUTPUT_NODES) {
+        outputDiv.removeChild(outputDiv.firstChild);
+    }
+}
+
 // Socket event listeners
 socket.on('term_output', function(msg) {
     const text = msg.data;
@@ -20,7 +29,22 @@ socket.on('term_output', function(msg) {
         .replace(/(Success|SUCCESS|Passed|PASSED)/gi, '<span class="success-text">$1</span>');
     
     outputDiv.insertAdjacentHTML('beforeend', formattedText);
+    trimOutput();
     outputDiv.scrollTop = outputDiv.scrollHeight;
+    
+    // Acknowledge once rendered so the server keeps reading program output
+    if (msg.seq) {
+        setTimeout(() => socket.emit('term_ack', { seq: msg.seq }), 0);
+    }
+});
+
+socket.on('queue_position', function(msg) {
+    const status = document.getElementById('queue-status');
+    if (!status) return;
+    
+    status.textContent = msg.position > 0
+        ? `⏳ Waiting in queue (position ${msg.position})...\n`
+        : '';
 });
 
 socket.on('term_stop', function(msg) {
@@ -32,6 +56,31 @@ socket.on('term_stop', function(msg) {
     outputDiv.scrollTop = outputDiv.scrollHeight;
 });
 
+// Per-run telemetry summary
+function formatBytes(bytes) {
+    if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+    if (bytes >= 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+    return `${bytes} B`;
+}
+
+function formatSeconds(seconds) {
+    return seconds < 1 ? `${Math.round(seconds * 1000)} ms` : `${seconds.toFixed(2)} s`;
+}
+
+socket.on('run_metrics', function(m) {
+    const parts = [];
+    if (m.queue_wait_seconds > 0.05) parts.push(`queue ${formatSeconds(m.queue_wait_seconds)}`);
+    if (m.compile_seconds != null) parts.push(`compile ${formatSeconds(m.compile_seconds)}`);
+    else if (m.cache_hit) parts.push('compile cached');
+    if (m.wall_seconds != null) parts.push(`run ${formatSeconds(m.wall_seconds)}${m.warm_start ? ' (warm)' : ''}`);
+    if (m.user_cpu_seconds != null) parts.push(`CPU ${formatSeconds(m.user_cpu_seconds + m.sys_cpu_seconds)}`);
+    if (m.peak_rss_bytes != null) parts.push(`peak ${formatBytes(m.peak_rss_bytes)}`);
+    parts.push(`output ${formatBytes(m.stdout_bytes + m.stderr_bytes)}`);
+    
+    outputDiv.insertAdjacentHTML('beforeend', `\n<span style="color: #858585;">⏱ ${parts.join(' · ')}</span>`);
+    outputDiv.scrollTop = outputDiv.scrollHeight;
+});
+
 // Run code
 function runCode() {
     const editorData = getActiveEditor();
@@ -44,7 +93,7 @@ function runCode() {
     const language = editorData.language;
     
     // Clear output
-    outputDiv.innerHTML = '<span style="color: #007acc;">▶ Running...</span>\n\n';
+    outputDiv.innerHTML = '<span style="color: #007acc;">▶ Running...</span>\n<span id="queue-status" class="warning-text"></span>\n';
     
     // Enable input
     inputField.disabled = false;
@@ -57,6 +106,11 @@ function runCode() {
     });
 }
 
+// Stop the queued, compiling or running program
+function stopCode() {
+    socket.emit('stop_code', {});
+}
+
 // Send input to process
 function sendInput() {
     const text = inputField.value;
@@ -70,6 +124,7 @@ function sendInput() {
 
 // Event listeners
 document.getElementById('run-btn').addEventListener('click', runCode);
+document.getElementById('stop-btn').addEventListener('click', stopCode);
 
 inputField.addEventListener('keypress', function(e) {
     if (e.key === 'Enter') {
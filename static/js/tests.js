@@ -0,0 +1,135 @@
+/**
+ * Test Cases Panel
+ * Runs the active editor's code against several stdin cases (one build, parallel runs)
+ */
+
+const testsPanel = document.getElementById('tests-panel');
+const testCasesDiv = document.getElementById('test-cases');
+const testSummaryDiv = document.getElementById('test-summary');
+let currentTestRun = null;
+
+function toggleTestsPanel() {
+    testsPanel.classList.toggle('open');
+    if (testsPanel.classList.contains('open')) {
+        aiPanel.classList.remove('open');
+        if (!testCasesDiv.children.length) addTestCase();
+    }
+}
+
+document.getElementById('tests-toggle-btn').addEventListener('click', toggleTestsPanel);
+
+function addTestCase() {
+    const caseDiv = document.createElement('div');
+    caseDiv.className = 'test-case';
+    caseDiv.innerHTML = `
+        <div class="test-case-header">
+            <strong class="test-case-name"></strong>
+            <button class="ai-close" title="Remove case"><i class="fas fa-times"></i></button>
+        </div>
+        <textarea class="test-stdin" placeholder="Input (stdin)"></textarea>
+        <textarea class="test-expected" placeholder="Expected output (optional)"></textarea>
+        <div class="test-result"></div>`;
+    caseDiv.querySelector('.ai-close').addEventListener('click', function() {
+        caseDiv.remove();
+        renumberTestCases();
+    });
+    testCasesDiv.appendChild(caseDiv);
+    renumberTestCases();
+    caseDiv.querySelector('.test-stdin').focus();
+}
+
+function renumberTestCases() {
+    Array.from(testCasesDiv.children).forEach((caseDiv, index) => {
+        caseDiv.querySelector('.test-case-name').textContent = `Case ${index + 1}`;
+    });
+}
+
+function runTests() {
+    const editorData = getActiveEditor();
+    if (!editorData) {
+        alert('No active editor');
+        return;
+    }
+
+    const caseDivs = Array.from(testCasesDiv.children);
+    if (!caseDivs.length) {
+        addTestCase();
+        return;
+    }
+
+    const tests = caseDivs.map((caseDiv, index) => {
+        caseDiv.className = 'test-case running';
+        caseDiv.querySelector('.test-result').innerHTML = '<i class="fas fa-spinner fa-spin"></i> Waiting...';
+        return {
+            name: `Case ${index + 1}`,
+            stdin: caseDiv.querySelector('.test-stdin').value,
+            expected_output: caseDiv.querySelector('.test-expected').value
+        };
+    });
+
+    currentTestRun = 'pending';
+    testSummaryDiv.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Building and running ${tests.length} case(s)...`;
+    outputDiv.innerHTML = '<span style="color: #007acc;">▶ Building for tests...</span>\n';
+
+    socket.emit('run_tests', {
+        code: editorData.editor.getValue(),
+        language: editorData.language,
+        tests: tests,
+        time_limit: document.getElementById('test-time-limit').value,
+        memory_limit_mb: document.getElementById('test-memory-limit').value
+    });
+}
+
+const TEST_STATUS_LABELS = {
+    passed: 'Passed',
+    wrong_answer: 'Wrong answer',
+    completed: 'Completed',
+    runtime_error: 'Runtime error',
+    killed: 'Killed'
+};
+
+socket.on('test_result', function(r) {
+    if (currentTestRun !== 'pending' && currentTestRun !== r.run_id) return;
+    currentTestRun = r.run_id;
+
+    const caseDiv = testCasesDiv.children[r.index];
+    if (!caseDiv) return;
+
+    const ok = r.status === 'passed' || r.status === 'completed';
+    caseDiv.className = `test-case ${ok ? 'passed' : 'failed'}`;
+
+    const parts = [];
+    if (r.wall_seconds != null) parts.push(formatSeconds(r.wall_seconds));
+    if (r.cpu_seconds != null) parts.push(`CPU ${formatSeconds(r.cpu_seconds)}`);
+    if (r.peak_rss_bytes != null) parts.push(formatBytes(r.peak_rss_bytes));
+
+    let html = `<span class="${ok ? 'success-text' : 'error-text'}">${TEST_STATUS_LABELS[r.status] || r.status}</span>`;
+    if (parts.length) html += ` <span style="color: #858585;">⏱ ${parts.join(' · ')}</span>`;
+    if (r.error) html += `\n<span class="error-text">${escapeHtml(r.error)}</span>`;
+    if (r.status !== 'passed' && r.stdout) html += `\n<span style="color: #858585;">Output:</span>\n${escapeHtml(r.stdout)}`;
+    if (r.stderr) html += `\n<span class="error-text">${escapeHtml(r.stderr)}</span>`;
+    caseDiv.querySelector('.test-result').innerHTML = html;
+});
+
+socket.on('test_summary', function(s) {
+    if (s.run_id && currentTestRun !== 'pending' && currentTestRun !== s.run_id) return;
+    currentTestRun = null;
+
+    if (s.error) {
+        testSummaryDiv.innerHTML = `<span class="error-text">${escapeHtml(s.error)}</span>`;
+        Array.from(testCasesDiv.children).forEach(caseDiv => {
+            if (caseDiv.classList.contains('running')) {
+                caseDiv.className = 'test-case';
+                caseDiv.querySelector('.test-result').textContent = '';
+            }
+        });
+        return;
+    }
+
+    const allOk = !s.failed && !s.cancelled;
+    const build = s.compile_seconds != null ? `build ${formatSeconds(s.compile_seconds)}` : (s.cache_hit ? 'build cached' : '');
+    testSummaryDiv.innerHTML = `<span class="${allOk ? 'success-text' : 'error-text'}">` +
+        `${s.passed}/${s.total} passed${s.failed ? `, ${s.failed} failed` : ''}${s.cancelled ? ' (cancelled)' : ''}</span>` +
+        ` <span style="color: #858585;">⏱ ${formatSeconds(s.seconds)}${build ? ' · ' + build : ''}</span>\n`;
+    outputDiv.insertAdjacentHTML('beforeend', `<span class="${allOk ? 'success-text' : 'error-text'}">\n[Tests: ${s.passed}/${s.total} passed]</span>`);
+});
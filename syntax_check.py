@@ -0,0 +1,196 @@
+"""
+Syntax Check
+Compiler-backed diagnostics from a check-only pass (no codegen or linking)
+
+Each language backend with a check_format supplies the command:
+`g++ -fsyntax-only`, `rustc --emit=metadata`, `python -m py_compile`,
+`javac` into a throwaway directory, ... The source is written to a fresh
+workspace, the compiler output is parsed into diagnostics and the result is
+cached by a hash of the language, compiler version, command and source, so
+undoing an edit or reopening a file costs nothing. Live diagnostics run
+checks once the editor is idle and cancel them when the text changes.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from config import SYNTAX_CHECK_DIR, SYNTAX_CHECK_CACHE_SIZE
+from compiler_handler import BuildContext
+from toolchains import toolchains
+from utils import ensure_directory
+
+# file:line:col: severity: message (gcc, clang, rustc --error-format=short, zig)
+GCC_DIAGNOSTIC = re.compile(
+    r'^(?P<file>[^:\n]+):(?P<line>\d+):(?:(?P<column>\d+):)? '
+    r'(?P<severity>fatal error|error|warning)(?:\[[^\]]*\])?: (?P<message>.*)$'
+)
+JAVAC_DIAGNOSTIC = re.compile(r'^(?P<file>.+?\.java):(?P<line>\d+): (?P<severity>error|warning): (?P<message>.*)$')
+JAVAC_CARET = re.compile(r'^\s*\^\s*$')
+PYTHON_LOCATION = re.compile(r'^  File "(?P<file>[^"]+)", line (?P<line>\d+)')
+PYTHON_ERROR = re.compile(r'^(?P<kind>\w+(?:Error|Exception)): (?P<message>.*)$')
+# Errors without a code excerpt: "Sorry: IndentationError: unexpected indent (main.py, line 2)"
+PYTHON_SORRY = re.compile(r'^Sorry: (?P<kind>\w+): (?P<message>.*) \((?P<file>[^,]+), line (?P<line>\d+)\)$')
+
+
+def _same_file(path, src):
+    return os.path.basename(path) == os.path.basename(src)
+
+
+def parse_gcc(output, src, code):
+    diagnostics = []
+    for line in output.splitlines():
+        match = GCC_DIAGNOSTIC.match(line)
+        if match and _same_file(match.group('file'), src):
+            diagnostics.append({
+                'line': int(match.group('line')),
+                'column': int(match.group('column') or 1),
+                'severity': 'warning' if match.group('severity') == 'warning' else 'error',
+                'message': match.group('message')
+            })
+    return diagnostics
+
+
+def parse_javac(output, src, code):
+    diagnostics = []
+    lines = output.splitlines()
+    for i, line in enumerate(lines):
+        match = JAVAC_DIAGNOSTIC.match(line)
+        if not match or not _same_file(match.group('file'), src):
+            continue
+        # javac echoes the source line, then a caret under the column
+        caret = lines[i + 2] if i + 2 < len(lines) else ''
+        diagnostics.append({
+            'line': int(match.group('line')),
+            'column': caret.index('^') + 1 if JAVAC_CARET.match(caret) else 1,
+            'severity': match.group('severity'),
+            'message': match.group('message')
+        })
+    return diagnostics
+
+
+def parse_python(output, src, code):
+    lines = output.splitlines()
+    source_lines = code.split('\n')
+    for line in lines:
+        match = PYTHON_SORRY.match(line)
+        if match and _same_file(match.group('file'), src):
+            return [{
+                'line': int(match.group('line')),
+                'column': 1,
+                'severity': 'error',
+                'message': f"{match.group('kind')}: {match.group('message')}"
+            }]
+
+    location, column, error = None, 1, None
+    for line in lines:
+        match = PYTHON_LOCATION.match(line)
+        if match and _same_file(match.group('file'), src):
+            location = int(match.group('line'))
+            continue
+        if location and line.strip() and set(line.strip()) <= {'^', '~'}:
+            # The excerpt is shown dedented and indented by 4 spaces
+            source = source_lines[location - 1] if location <= len(source_lines) else ''
+            indent = len(source) - len(source.lstrip())
+            column = max(1, line.index('^') - 4 + indent + 1)
+            continue
+        match = PYTHON_ERROR.match(line)
+        if match:
+            error = f"{match.group('kind')}: {match.group('message')}"
+    if location is None or error is None:
+        return []
+    return [{'line': location, 'column': column, 'severity': 'error', 'message': error}]
+
+
+PARSERS = {
+    'gcc': parse_gcc,
+    'javac': parse_javac,
+    'python': parse_python
+}
+
+
+class SyntaxChecker:
+    def __init__(self, handler, cache_size=SYNTAX_CHECK_CACHE_SIZE):
+        """handler: CompilerHandler providing the language registry and toolchain services"""
+        self.handler = handler
+        self.languages = handler.languages
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # key -> diagnostics, least recently used first
+        self.lock = threading.Lock()
+        self.stats_data = {'hits': 0, 'misses': 0, 'cancelled': 0, 'check_ms_total': 0.0}
+
+    def supports(self, language):
+        """True if the language has a check mode and its toolchain is installed"""
+        backend = self.languages.get(language)
+        return backend is not None and backend.check_format is not None and backend.missing_toolchain() is None
+
+    def _key(self, language, cmd, code):
+        """Hash of language, compiler version, check command and source text"""
+        digest = hashlib.sha256()
+        for part in (language, toolchains.version(cmd[0]), '\0'.join(cmd), code):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def check(self, code, language, cancel_event=None):
+        """
+        Check code without building it
+        Returns: [{'line', 'column', 'severity', 'message'}], or None if the
+        language has no check mode or the check was cancelled or timed out
+        """
+        if not self.supports(language):
+            return None
+        backend = self.languages.get(language)
+        ctx = BuildContext(self.handler, code, None, cancel_event=cancel_event)
+        src, out_dir = backend.source_name, 'out'
+        cmd = backend.check_command(ctx, src, out_dir)
+        key = self._key(language, cmd, code)
+
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.stats_data['hits'] += 1
+                return list(cached)
+            self.stats_data['misses'] += 1
+
+        started = time.perf_counter()
+        ctx.workdir = tempfile.mkdtemp(prefix='check-', dir=ensure_directory(SYNTAX_CHECK_DIR))
+        try:
+            ctx.write_file(src, code)
+            ensure_directory(os.path.join(ctx.workdir, out_dir))
+            return_code, output = backend.check(ctx, src, out_dir)
+        finally:
+            shutil.rmtree(ctx.workdir, ignore_errors=True)
+
+        with self.lock:
+            self.stats_data['check_ms_total'] += (time.perf_counter() - started) * 1000
+            if return_code is None or ctx.cancelled:
+                self.stats_data['cancelled'] += 1
+                return None
+
+        diagnostics = PARSERS[backend.check_format](output, src, code)
+        if return_code != 0 and not any(d['severity'] == 'error' for d in diagnostics):
+            # Failed without a diagnostic we understand (crash, missing header path, ...)
+            lines = output.strip().splitlines()
+            diagnostics.append({
+                'line': 1,
+                'column': 1,
+                'severity': 'error',
+                'message': lines[-1] if lines else f"{backend.label} check failed (exit code {return_code})"
+            })
+
+        with self.lock:
+            self.cache[key] = diagnostics
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return list(diagnostics)
+
+    def stats(self):
+        with self.lock:
+            data = dict(self.stats_data, entries=len(self.cache))
+        data['check_ms_total'] = round(data['check_ms_total'], 2)
+        return data
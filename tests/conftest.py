@@ -0,0 +1,7 @@
+"""
+Shared test setup: the modules under test live at the repository root
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+"""
+Compile cache: hits and misses, LRU eviction and in-use protection
+"""
+import os
+import pytest
+from compile_cache import CompileCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CompileCache(str(tmp_path / 'cache'), max_bytes=250, in_use_seconds=0)
+    cache.compiler_version = lambda compiler: 'test 1.0'
+    return cache
+
+
+def put(cache, key, size=100):
+    staging = cache.create_staging(key)
+    with open(os.path.join(staging, 'main.exe'), 'wb') as f:
+        f.write(b'x' * size)
+    return cache.store(key, staging, 'c')
+
+
+def test_lookup_hits_stored_entry(cache):
+    assert cache.lookup('a') is None
+    path = put(cache, 'a')
+    assert cache.lookup('a') == path
+    assert os.path.isfile(os.path.join(path, 'main.exe'))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_code_and_flags(cache):
+    key = cache.make_key('c', 'int main(){}', 'gcc', ['-O2'])
+    assert key == cache.make_key('c', 'int main(){}', 'gcc', ['-O2'])
+    assert key != cache.make_key('c', 'int main(){return 0;}', 'gcc', ['-O2'])
+    assert key != cache.make_key('c', 'int main(){}', 'gcc', ['-O0'])
+
+
+def test_evicts_least_recently_used(cache):
+    put(cache, 'a')
+    put(cache, 'b')
+    cache.lookup('a')  # b is now the least recently used
+    put(cache, 'c')
+    assert cache.lookup('b') is None
+    assert cache.lookup('a') and cache.lookup('c')
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_keeps_entries_in_use(cache):
+    cache.in_use_seconds = 300
+    put(cache, 'a')
+    put(cache, 'b')
+    put(cache, 'c')
+    # Every entry was used just now: the bound is exceeded rather than
+    # deleting an entry a run may be executing from
+    assert all(cache.lookup(key) for key in 'abc')
+    assert cache.total_bytes == 300
+
+
+def test_evicts_only_entries_past_the_in_use_window(cache):
+    cache.in_use_seconds = 300
+    old = put(cache, 'old')
+    put(cache, 'new')
+    past = os.path.getmtime(os.path.join(old, 'manifest.json')) - 600
+    os.utime(os.path.join(old, 'manifest.json'), (past, past))
+    put(cache, 'newest')
+    assert not os.path.exists(old)
+    assert cache.lookup('new') and cache.lookup('newest')
+
+
+def test_entry_deleted_on_disk_is_a_miss(cache):
+    path = put(cache, 'a')
+    for name in os.listdir(path):
+        os.remove(os.path.join(path, name))
+    os.rmdir(path)
+    assert cache.lookup('a') is None
+    assert cache.total_bytes == 0
+
+
+def test_second_store_of_a_key_is_discarded(cache):
+    first = put(cache, 'a')
+    second = put(cache, 'a')
+    assert first == second
+    assert os.listdir(cache.staging_root) == []
+    assert cache.total_bytes == 100
+
+
+def test_index_is_rebuilt_from_disk(cache, tmp_path):
+    put(cache, 'a')
+    reopened = CompileCache(cache.root, max_bytes=250)
+    assert reopened.total_bytes == 100
+    assert reopened.lookup('a') == os.path.join(cache.root, 'a')
@@ -0,0 +1,71 @@
+"""
+Live diagnostics: applying Monaco incremental edits to a document
+"""
+import pytest
+from diagnostics import ResyncNeeded, apply_change
+
+
+def edit(lines, start, end, text):
+    """Apply an edit over (line, column) positions, 1-based, end exclusive"""
+    apply_change(lines, {
+        'range': {
+            'startLineNumber': start[0], 'startColumn': start[1],
+            'endLineNumber': end[0], 'endColumn': end[1]
+        },
+        'text': text
+    })
+    return lines
+
+
+def test_insert_character():
+    assert edit(['int x = 1', 'return x'], (1, 10), (1, 10), ';') == ['int x = 1;', 'return x']
+
+
+def test_insert_at_line_start_and_end():
+    lines = edit(['b'], (1, 1), (1, 1), 'a')
+    assert edit(lines, (1, 3), (1, 3), 'c') == ['abc']
+
+
+def test_replace_within_a_line():
+    assert edit(['foo(bar)'], (1, 5), (1, 8), 'baz') == ['foo(baz)']
+
+
+def test_delete_across_lines():
+    lines = ['first', 'second', 'third']
+    assert edit(lines, (1, 6), (3, 1), '') == ['firstthird']
+
+
+def test_insert_newlines_splits_the_line():
+    assert edit(['ab'], (1, 2), (1, 2), '\nx\n') == ['a', 'x', 'b']
+
+
+def test_crlf_text_is_normalized():
+    assert edit(['ab'], (1, 2), (1, 2), '1\r\n2') == ['a1', '2b']
+
+
+def test_replace_whole_document():
+    assert edit(['one', 'two'], (1, 1), (2, 4), 'new') == ['new']
+
+
+@pytest.mark.parametrize('start, end', [
+    ((0, 1), (1, 1)),   # line before the document
+    ((1, 1), (3, 1)),   # line past the end
+    ((2, 1), (1, 1)),   # end before start
+    ((1, 5), (1, 5)),   # column past the end of 'abc'
+    ((1, 0), (1, 1)),   # column before the line
+])
+def test_edit_outside_the_document_needs_resync(start, end):
+    lines = ['abc', 'def']
+    with pytest.raises(ResyncNeeded):
+        edit(lines, start, end, 'x')
+    assert lines == ['abc', 'def']
+
+
+def test_malformed_change_needs_resync():
+    with pytest.raises(ResyncNeeded):
+        apply_change(['abc'], {'text': 'x'})
+    with pytest.raises(ResyncNeeded):
+        apply_change(['abc'], {'range': {'startLineNumber': 'a', 'startColumn': 1,
+                                         'endLineNumber': 1, 'endColumn': 1}, 'text': 'x'})
+    with pytest.raises(ResyncNeeded):
+        edit(['abc'], (1, 1), (1, 1), None)
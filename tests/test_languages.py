@@ -0,0 +1,28 @@
+"""
+Language backends: Scala entry point detection
+"""
+from languages import ScalaBackend
+
+
+def main_class(code):
+    return ScalaBackend()._main_class(code)
+
+
+def test_scala3_main_method():
+    assert main_class('@main def hello(): Unit =\n  println("hi")\n') == 'hello'
+
+
+def test_object_defining_main():
+    code = (
+        'object Helpers {\n  def twice(x: Int) = x * 2\n}\n'
+        'object Program {\n  def main(args: Array[String]): Unit = println(Helpers.twice(2))\n}\n'
+    )
+    assert main_class(code) == 'Program'
+
+
+def test_object_extending_app():
+    assert main_class('object Greeter extends App {\n  println("hi")\n}\n') == 'Greeter'
+
+
+def test_defaults_to_main():
+    assert main_class('class Point(x: Int, y: Int)\n') == 'Main'
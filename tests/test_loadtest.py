@@ -0,0 +1,65 @@
+"""
+Load test harness: server metric scraping and process sampling
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from loadtest import Recorder, ServerSampler, scrape_metrics
+
+METRICS = (
+    '# HELP noc_sessions Connected Socket.IO sessions\n'
+    'noc_sessions 12\n'
+    'noc_queue_depth 3\n'
+    'noc_compile_cache_hits_total 99\n'
+)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = METRICS.encode('utf-8')
+        self.send_response(200 if self.path == '/metrics' else 404)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def metrics_url():
+    server = HTTPServer(('127.0.0.1', 0), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrape_keeps_the_watched_gauges(metrics_url):
+    assert scrape_metrics(metrics_url) == {'noc_sessions': 12.0, 'noc_queue_depth': 3.0}
+
+
+def test_scrape_of_an_unreachable_server_is_empty():
+    assert scrape_metrics('http://127.0.0.1:9') == {}
+
+
+def test_recorder_snapshot_is_a_copy():
+    recorder = Recorder()
+    recorder.sample('run', 0.5)
+    recorder.count('runs_started')
+    recorder.count('runs_started', 2)
+    samples, counts = recorder.snapshot()
+    recorder.sample('run', 1.0)
+    assert samples == {'run': [0.5]}
+    assert counts == {'runs_started': 3}
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+def test_sampler_reads_this_process():
+    sampler = ServerSampler(os.getpid(), interval=0.05).start()
+    threading.Event().wait(0.3)
+    summary = sampler.stop()
+    assert summary['threads_max'] >= 2  # the test thread and the sampler
+    assert summary['rss_mb_max'] > 0
@@ -0,0 +1,71 @@
+"""
+Output pump: head + tail truncation by bytes and by lines
+"""
+import os
+import threading
+from types import SimpleNamespace
+from output_stream import OutputPump, TailBuffer
+
+
+def pump_output(data, **limits):
+    """Run an OutputPump over data written to a pipe; returns (pump, text)"""
+    read_fd, write_fd = os.pipe()
+    process = SimpleNamespace(stdout=os.fdopen(read_fd, 'rb', buffering=0), stderr=None)
+
+    def write():
+        with os.fdopen(write_fd, 'wb') as pipe:
+            pipe.write(data)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    frames = []
+    pump = OutputPump(process, lambda text, seq: frames.append(text), interval=0, ack_window=0, **limits)
+    pump.run()
+    writer.join()
+    return pump, ''.join(frames)
+
+
+def numbered_lines(count):
+    return ''.join(f'line {i:04}\n' for i in range(count))  # 10 bytes each
+
+
+def test_output_within_limits_is_unchanged():
+    text = numbered_lines(50)
+    pump, output = pump_output(text.encode(), max_output_bytes=1000, max_output_lines=100)
+    assert output == text
+    assert not pump.truncated
+    assert pump.stdout_bytes == 500
+
+
+def test_byte_limit_keeps_head_and_tail():
+    text = numbered_lines(100)
+    pump, output = pump_output(text.encode(), max_output_bytes=100, max_output_lines=1000, tail_bytes=30)
+    assert pump.truncated
+    assert output.startswith(text[:100] + '\n[Output limit reached (100 bytes, 10 lines)')
+    assert output.endswith('\n[... 870 bytes (87 lines) of output omitted ...]\n' + text[-30:])
+    assert pump.stdout_bytes == 1000
+
+
+def test_line_limit_cuts_after_a_whole_line():
+    text = numbered_lines(100)
+    pump, output = pump_output(text.encode(), max_output_bytes=10000, max_output_lines=5, tail_bytes=20)
+    head, _, rest = output.partition('\n[Output limit reached')
+    assert head == text[:50]
+    assert rest.startswith(' (50 bytes, 5 lines)')
+    assert output.endswith('lines) of output omitted ...]\n' + text[-20:])
+
+
+def test_byte_limit_does_not_split_a_character():
+    text = 'é' * 100  # 2 bytes each
+    _, output = pump_output(text.encode(), max_output_bytes=51, max_output_lines=1000, tail_bytes=4)
+    head = output.split('\n[Output limit reached')[0]
+    assert head == 'é' * 25
+    assert '�' not in output
+    assert output.endswith('éééé')
+
+
+def test_tail_buffer_keeps_last_characters():
+    tail = TailBuffer(5)
+    for chunk in ('abc', 'defg', 'h'):
+        tail.append(chunk)
+    assert tail.getvalue() == 'defgh'
@@ -0,0 +1,37 @@
+"""
+Precompiled headers: which leading includes form a program's header set
+"""
+from pch_cache import leading_includes
+
+
+def test_collects_leading_system_includes():
+    code = '#include <vector>\n#include <bits/stdc++.h>\n\nint main() {}\n'
+    assert leading_includes(code) == ['vector', 'bits/stdc++.h']
+
+
+def test_skips_comments_and_blank_lines():
+    code = (
+        '// solution\n'
+        '/* multi\n   line */\n'
+        '#include <iostream> // for cout\n'
+        '/* one line */ #include <string>\n'
+        '#  include<map>\n'
+        'using namespace std;\n'
+        '#include <set>\n'
+    )
+    assert leading_includes(code) == ['iostream', 'string', 'map']
+
+
+def test_directive_or_quoted_include_ends_the_set():
+    assert leading_includes('#include <vector>\n#define N 10\n#include <map>\n') == ['vector']
+    assert leading_includes('#include <vector>\n#include "local.h"\n#include <map>\n') == ['vector']
+    assert leading_includes('#pragma once\n#include <vector>\n') == []
+
+
+def test_duplicates_are_dropped():
+    assert leading_includes('#include <cstdio>\n#include <cstdio>\n') == ['cstdio']
+
+
+def test_no_includes():
+    assert leading_includes('int main() { return 0; }\n') == []
+    assert leading_includes('') == []
@@ -0,0 +1,98 @@
+"""
+Sandbox: kill reason classification and the wall-clock watchdog
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+import pytest
+from sandbox import Sandbox
+
+posix = pytest.mark.skipif(os.name == 'nt', reason='POSIX signals and rlimits')
+
+
+def sandbox(**limits):
+    return Sandbox('python', dict(cpu_seconds=2, wall_seconds=None, **limits))
+
+
+def cpu(seconds):
+    return SimpleNamespace(ru_utime=seconds, ru_stime=0.0, ru_maxrss=0)
+
+
+def test_clean_exit_has_no_reason():
+    assert sandbox().finish(0) is None
+    assert sandbox().finish(1, cpu(0.1)) is None
+    assert sandbox().finish(None) is None
+
+
+@posix
+def test_signals_map_to_reasons():
+    assert sandbox().finish(-signal.SIGXCPU) == 'cpu_time'
+    box = sandbox(file_size_bytes=2 * 1024 * 1024)
+    assert box.finish(-signal.SIGXFSZ) == 'file_size'
+    assert box.limit_value() == 2 * 1024 * 1024
+    assert box.describe() == 'File size limit exceeded (2 MB)'
+
+
+@posix
+def test_sigkill_is_cpu_time_only_past_the_cpu_limit():
+    box = sandbox()
+    assert box.finish(-signal.SIGKILL, cpu(2.5)) == 'cpu_time'
+    assert box.describe() == 'CPU time limit exceeded (2s)'
+    assert sandbox().finish(-signal.SIGKILL, cpu(0.5)) is None
+    assert sandbox().finish(-signal.SIGKILL, None) is None
+
+
+def test_wall_clock_watchdog_kills_the_program():
+    box = Sandbox('python', {'wall_seconds': 0.5})
+    process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'], **box.popen_kwargs())
+    box.start(process)
+    started = time.monotonic()
+    return_code = process.wait(10)
+    assert time.monotonic() - started < 5
+    assert box.finish(return_code) == 'wall_time'
+
+
+@posix
+def test_watchdog_kills_children_left_behind_by_the_program():
+    # The program exits at once, but its background child keeps stdout open
+    box = Sandbox('bash', {'wall_seconds': 0.5})
+    process = subprocess.Popen(['sh', '-c', 'sleep 30 & echo started'], stdout=subprocess.PIPE,
+                               **box.popen_kwargs())
+    box.start(process)
+    assert process.stdout.read() == b'started\n'  # EOF once the child is killed
+    assert box.finish(process.wait(10)) == 'wall_time'
+
+
+def running(pid):
+    """True while pid exists and is not a zombie waiting to be reaped"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+def test_finish_kills_background_children(tmp_path):
+    box = Sandbox('bash', {'wall_seconds': 30})
+    pid_file = tmp_path / 'child.pid'
+    process = subprocess.Popen(['sh', '-c', f'sleep 30 >/dev/null 2>&1 & echo $! > {pid_file}'],
+                               **box.popen_kwargs())
+    box.start(process)
+    assert box.finish(process.wait(10)) is None
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while running(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not running(child)
+
+
+@posix
+def test_cpu_rlimit_stops_a_busy_loop():
+    box = Sandbox('python', {'cpu_seconds': 1, 'wall_seconds': 30})
+    process = subprocess.Popen([sys.executable, '-c', 'while True: pass'], **box.popen_kwargs())
+    box.start(process)
+    assert box.finish(process.wait(30)) == 'cpu_time'
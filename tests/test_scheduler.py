@@ -0,0 +1,94 @@
+"""
+Execution scheduler: round-robin dispatch, admission limits, cancellation
+and queue position reports
+"""
+import threading
+from scheduler import ExecutionScheduler
+
+WAIT = 5  # seconds before a test gives up on a job
+
+
+def blocked_scheduler(**kwargs):
+    """One-worker scheduler whose worker is held until the returned event is set"""
+    release = threading.Event()
+    started = threading.Event()
+    scheduler = ExecutionScheduler(workers=1, **kwargs)
+
+    def hold():
+        started.set()
+        release.wait(WAIT)
+
+    scheduler.submit('holder', 'hold', hold)
+    assert started.wait(WAIT)
+    return scheduler, release
+
+
+def test_sessions_take_turns():
+    scheduler, release = blocked_scheduler()
+    order = []
+    done = threading.Event()
+    for sid, run_id in (('a', 'a1'), ('a', 'a2'), ('b', 'b1')):
+        scheduler.submit(sid, run_id, lambda run_id=run_id: order.append(run_id))
+    scheduler.submit('c', 'last', done.set)
+    release.set()
+    assert done.wait(WAIT)
+    # b1 goes before a's second job even though it was queued later
+    assert order == ['a1', 'b1', 'a2']
+
+
+def test_rejects_when_queue_is_full():
+    scheduler, release = blocked_scheduler(max_queued=2)
+    assert scheduler.submit('a', 'r1', lambda: None)[0]
+    assert scheduler.submit('b', 'r2', lambda: None)[0]
+    accepted, job, error = scheduler.submit('c', 'r3', lambda: None)
+    assert not accepted and job is None and 'queue is full' in error
+    assert scheduler.stats()['rejected'] == 1
+    release.set()
+
+
+def test_cancel_removes_only_queued_jobs():
+    scheduler, release = blocked_scheduler()
+    ran = []
+    scheduler.submit('a', 'a1', lambda: ran.append('a1'))
+    scheduler.submit('a', 'a2', lambda: ran.append('a2'))
+    scheduler.submit('b', 'b1', lambda: ran.append('b1'))
+    removed = scheduler.cancel('a', 'a1')
+    assert [job.run_id for job in removed] == ['a1']
+    assert [job.run_id for job in scheduler.cancel('a')] == ['a2']
+    assert scheduler.stats()['queued'] == 1
+    done = threading.Event()
+    scheduler.submit('c', 'last', done.set)
+    release.set()
+    assert done.wait(WAIT)
+    assert ran == ['b1']
+
+
+def test_reports_positions_and_start():
+    reports = []
+    scheduler, release = blocked_scheduler(
+        on_position=lambda job, position: reports.append((job.run_id, position)),
+        position_interval=3600
+    )
+    scheduler.submit('a', 'a1', lambda: None)
+    scheduler.submit('b', 'b1', lambda: None)
+    assert ('a1', 1) in reports and ('b1', 2) in reports
+    done = threading.Event()
+    scheduler.submit('c', 'last', done.set)
+    release.set()
+    assert done.wait(WAIT)
+    assert ('a1', 0) in reports and ('b1', 0) in reports
+
+
+def test_position_updates_to_the_back_of_the_queue_are_throttled():
+    reports = []
+    scheduler, release = blocked_scheduler(
+        on_position=lambda job, position: reports.append((job.run_id, position)),
+        position_interval=3600
+    )
+    for i in range(10):
+        scheduler.submit(f's{i}', f'r{i}', lambda: None)
+    # The first submit swept the queue; later changes deep in the queue wait
+    scheduler.cancel('s0')
+    assert ('r9', 9) not in reports
+    assert ('r1', 1) in reports  # next to start: always reported
+    release.set()
@@ -0,0 +1,57 @@
+"""
+SQL engine: splitting scripts into statements
+"""
+from sql_engine import split_statements
+
+
+def statements(script):
+    return list(split_statements(script))
+
+
+def test_splits_on_semicolons_with_line_numbers():
+    script = 'CREATE TABLE t (x);\nINSERT INTO t VALUES (1);\n\nSELECT * FROM t;\n'
+    assert statements(script) == [
+        (1, 'CREATE TABLE t (x);'),
+        (2, 'INSERT INTO t VALUES (1);'),
+        (4, 'SELECT * FROM t;'),
+    ]
+
+
+def test_semicolons_inside_quotes_and_comments_do_not_split():
+    script = (
+        "INSERT INTO t VALUES ('a;b', \"c;d\");\n"
+        "-- a comment; still a comment\n"
+        "SELECT 1 /* ; */ + 1;\n"
+    )
+    assert statements(script) == [
+        (1, "INSERT INTO t VALUES ('a;b', \"c;d\");"),
+        (3, 'SELECT 1 /* ; */ + 1;'),
+    ]
+
+
+def test_trigger_body_stays_one_statement():
+    script = (
+        'CREATE TRIGGER log AFTER INSERT ON t\n'
+        'BEGIN\n'
+        '    INSERT INTO audit VALUES (new.x);\n'
+        '    UPDATE counts SET n = n + 1;\n'
+        'END;\n'
+        'SELECT 2;\n'
+    )
+    result = statements(script)
+    assert [line for line, _ in result] == [1, 6]
+    assert result[0][1].startswith('CREATE TRIGGER') and result[0][1].endswith('END;')
+
+
+def test_comment_only_and_empty_statements_are_skipped():
+    script = '-- header\n/* note */\n;;\nSELECT 1;\n-- trailing comment\n'
+    assert statements(script) == [(4, 'SELECT 1;')]
+
+
+def test_last_statement_may_omit_its_semicolon():
+    assert statements('SELECT 1;\nSELECT 2') == [(1, 'SELECT 1;'), (2, 'SELECT 2')]
+
+
+def test_line_numbers_skip_leading_comments():
+    script = 'SELECT 1;\n-- explain the next one\n\nSELECT 2;'
+    assert statements(script) == [(1, 'SELECT 1;'), (4, 'SELECT 2;')]
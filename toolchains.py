@@ -0,0 +1,197 @@
+"""
+Toolchain Discovery
+Finds compilers and interpreters once and remembers them across restarts
+
+At startup every executable the language backends can use is probed in
+parallel on a background thread: its PATH location and its version banner.
+Results are written to TOOLCHAIN_PROBE_CACHE. A cached version is reused
+while the executable's resolved path, size and mtime are unchanged, so
+restarts skip slow banners like `javac -version`; PATH lookups (cheap) are
+redone on every probe so newly installed or removed tools are noticed.
+
+Lookups made before the probe reaches a tool resolve it on the spot, and
+the answer is memoized: runs never repeat PATH searches or version checks.
+"""
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import TOOLCHAIN_PROBE_CACHE, TOOLCHAIN_PROBE_WORKERS, TOOLCHAIN_VERSION_TIMEOUT
+from utils import ensure_directory
+
+# Version flag of tools that do not understand --version
+VERSION_ARGS = {
+    'csc': ['-version'],
+    'javac': ['-version'],
+    'java': ['-version'],
+    'go': ['version'],
+    'zig': ['version'],
+    'scalac': ['-version'],
+    'fsc': ['-version'],
+    'scala': ['-version'],
+    'kotlinc': ['-version'],
+    'kotlinc-jvm': ['-version'],
+    'lua': ['-v']
+}
+
+CACHE_FORMAT = 1
+
+
+def fingerprint(path):
+    """(resolved path, size, mtime) identifying an installed executable"""
+    real = os.path.realpath(path)
+    stat = os.stat(real)
+    return [real, stat.st_size, stat.st_mtime]
+
+
+def read_version(path, timeout=TOOLCHAIN_VERSION_TIMEOUT):
+    """First line of the tool's version banner ('' if it has none)"""
+    args = VERSION_ARGS.get(os.path.splitext(os.path.basename(path))[0], ['--version'])
+    try:
+        result = subprocess.run([path] + args, capture_output=True, text=True,
+                                timeout=timeout, stdin=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError):
+        return ''
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else ''
+
+
+class ToolchainCache:
+    def __init__(self, cache_path=TOOLCHAIN_PROBE_CACHE, workers=TOOLCHAIN_PROBE_WORKERS):
+        self.cache_path = cache_path
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.tools = {}  # name -> {'path', 'version', 'fingerprint'}; path None = missing
+        self.stored = self._load()  # previous run's results (version reuse)
+        self.done = threading.Event()
+        self.thread = None
+        self.probe_stats = {'probed_at': None, 'seconds': None, 'tools': 0, 'versions_run': 0}
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('format') != CACHE_FORMAT:
+            return {}
+        return data.get('tools', {})
+
+    def _save(self):
+        with self.lock:
+            tools = {name: entry for name, entry in self.tools.items() if not os.path.isabs(name)}
+            data = {'format': CACHE_FORMAT, 'tools': tools}
+        try:
+            ensure_directory(os.path.dirname(self.cache_path))
+            staging = f'{self.cache_path}.{os.getpid()}'
+            with open(staging, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+            os.replace(staging, self.cache_path)
+        except OSError as e:
+            print(f"Toolchains: cannot write {self.cache_path}: {e}")
+
+    def _locate(self, name):
+        """Find name on PATH; the cached version is kept while the executable is unchanged"""
+        path = shutil.which(name)
+        if path is None:
+            return {'path': None, 'version': None, 'fingerprint': None}
+        try:
+            current = fingerprint(path)
+        except OSError:
+            current = None
+        stored = self.stored.get(name)
+        version = stored['version'] if current and stored and stored.get('fingerprint') == current else None
+        return {'path': path, 'version': version, 'fingerprint': current}
+
+    def _resolve(self, name):
+        """
+        Locate name and read its version unless the cached one is still valid
+        Returns: (entry, whether the version command ran)
+        """
+        entry = self._locate(name)
+        if entry['path'] and entry['version'] is None:
+            entry['version'] = read_version(entry['path'])
+            return entry, True
+        return entry, False
+
+    def _entry(self, name):
+        """Memoized entry; only the PATH lookup happens here, versions on demand"""
+        with self.lock:
+            entry = self.tools.get(name)
+        if entry is None:
+            entry = self._locate(name)
+            with self.lock:
+                entry = self.tools.setdefault(name, entry)
+        return entry
+
+    def which(self, name):
+        """Full path of an executable on PATH (memoized), or None"""
+        if os.path.isabs(name):
+            return name if os.path.exists(name) else None
+        return self._entry(name)['path']
+
+    def version(self, name):
+        """Version banner of an executable name or path ('' if unknown)"""
+        if os.path.isabs(name):
+            with self.lock:
+                cached = self.tools.get(name)
+            if cached is None:
+                cached = {'path': name, 'version': read_version(name), 'fingerprint': None}
+                with self.lock:
+                    self.tools[name] = cached
+            return cached['version'] or ''
+        entry = self._entry(name)
+        if entry['path'] and entry['version'] is None:
+            version = read_version(entry['path'])
+            with self.lock:
+                entry['version'] = version
+        return entry['version'] or ''
+
+    def start(self, names):
+        """Probe names in parallel on a background thread (refreshes memoized results)"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.done.clear()
+            self.thread = threading.Thread(target=self._probe, args=(sorted(set(names)),),
+                                           name='noc-toolchains', daemon=True)
+            self.thread.start()
+
+    def _probe(self, names):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='noc-probe') as pool:
+            results = dict(zip(names, pool.map(self._resolve, names)))
+        with self.lock:
+            for name, (entry, _) in results.items():
+                self.tools[name] = entry
+            self.probe_stats = {
+                'probed_at': time.time(),
+                'seconds': round(time.perf_counter() - started, 3),
+                'tools': len(names),
+                'versions_run': sum(1 for _, ran in results.values() if ran)
+            }
+        self.stored = {name: entry for name, (entry, _) in results.items()}
+        self._save()
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """Block until the running probe finishes; True if it did"""
+        return self.done.wait(timeout)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'probing': self.thread is not None and self.thread.is_alive(),
+                **self.probe_stats,
+                'executables': {
+                    name: {'path': entry['path'], 'version': entry['version']}
+                    for name, entry in sorted(self.tools.items()) if not os.path.isabs(name)
+                }
+            }
+
+
+# Toolchain Cache Singleton
+toolchains = ToolchainCache()
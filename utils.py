@@ -3,7 +3,11 @@ Utility functions for NOC
 """
 import os
 import sys
+import signal
+import socket
 import platform
+import subprocess
+import time
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and PyInstaller"""
@@ -17,8 +21,16 @@ def ensure_directory(path):
         os.makedirs(path)
     return path
 
+_bash_path = False  # not looked up yet
+
 def get_bash_path():
-    """Get bash executable path based on OS"""
+    """Get bash executable path based on OS (looked up once)"""
+    global _bash_path
+    if _bash_path is False:
+        _bash_path = _find_bash()
+    return _bash_path
+
+def _find_bash():
     system = platform.system()
     
     if system == 'Windows':
@@ -37,41 +49,48 @@ def get_bash_path():
         # Linux/Mac
         return 'bash'
 
-def get_language_extension(language):
-    """Get file extension for language"""
-    extensions = {
-        'python': '.py',
-        'cpp': '.cpp',
-        'csharp': '.cs',
-        'java': '.java',
-        'javascript': '.js',
-        'sql': '.sql',
-        'rust': '.rs',
-        'lua': '.lua',
-        'bash': '.sh',
-        'zig': '.zig',
-        'scala': '.scala',
-        'go': '.go'
-    }
-    return extensions.get(language, '.txt')
+def new_process_group_kwargs():
+    """Popen kwargs that put the child in its own process group"""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+def kill_process_tree(process):
+    """
+    Kill a process started with new_process_group_kwargs() and its children
+    The group is killed even after its leader has exited, so background
+    children it left behind (holding the output pipe open) die too.
+    """
+    try:
+        if os.name == 'nt':
+            # taskkill finds the tree through the parent, so it must be alive
+            if process.poll() is None:
+                subprocess.run(
+                    ['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                    capture_output=True
+                )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass  # the whole group has exited
+    except (OSError, subprocess.SubprocessError):
+        process.kill()
 
-def get_monaco_language(language):
-    """Get Monaco editor language identifier"""
-    mappings = {
-        'cpp': 'cpp',
-        'csharp': 'csharp',
-        'javascript': 'javascript',
-        'bash': 'shell',
-        'python': 'python',
-        'java': 'java',
-        'sql': 'sql',
-        'rust': 'rust',
-        'lua': 'lua',
-        'zig': 'zig',
-        'scala': 'scala',
-        'go': 'go'
-    }
-    return mappings.get(language, language)
+def wait_for_port(host, port, timeout, alive=None, interval=0.1):
+    """
+    True once a TCP connection to host:port succeeds
+    Gives up early when alive() (e.g. the server's process/thread) returns False
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if alive is not None and not alive():
+            return False
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(interval)
+    return False
 
 def sanitize_filename(name):
     """Remove invalid characters from filename"""
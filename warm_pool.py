@@ -0,0 +1,319 @@
+"""
+Warm Interpreter Pool
+Pre-started Python, Node, Lua and JVM workers that receive a script over stdin
+
+Each worker blocks on its first stdin line, a tab-separated header
+(cwd, script, args...), then runs the script as its main program with a
+fresh namespace. Workers own the run's stdio pipes, so every worker serves
+exactly one run and is replaced in the background.
+"""
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from config import WARM_POOL_ENABLED, WARM_POOL_SIZES, WARM_POOL_DIR
+from utils import ensure_directory, kill_process_tree
+from java_daemon import launcher_argv
+from languages import language_registry
+from toolchains import toolchains
+
+PYTHON_BOOTSTRAP = r'''
+import os, sys, runpy, traceback
+import json, math, random, re, collections, itertools, functools, datetime, sqlite3
+line = sys.stdin.readline()
+if not line:
+    sys.exit(0)
+cwd, script, *argv = line.rstrip('\n').split('\t')
+os.chdir(cwd)
+sys.argv = [script] + argv
+sys.path[0] = os.path.dirname(script)
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit:
+    raise
+except BaseException as e:
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb or e.__traceback__)
+    sys.exit(1)
+'''
+
+NODE_BOOTSTRAP = r'''
+const fs = require('fs');
+const Module = require('module');
+const buf = Buffer.alloc(1);
+let line = '';
+for (;;) {
+    let n;
+    try { n = fs.readSync(0, buf, 0, 1, null); }
+    catch (e) { if (e.code === 'EAGAIN') continue; throw e; }
+    if (n === 0) process.exit(0);
+    if (buf[0] === 10) break;
+    line += String.fromCharCode(buf[0]);
+}
+const [cwd, script, ...argv] = Buffer.from(line, 'latin1').toString('utf8').split('\t');
+process.chdir(cwd);
+process.argv = [process.argv[0], script, ...argv];
+Module.runMain();
+'''
+
+# Standard Lua has no chdir: workers start inside a private scratch directory
+LUA_BOOTSTRAP = r'''
+local line = io.read('l')
+if not line then os.exit(0) end
+local fields = {}
+for field in (line .. '\t'):gmatch('([^\t]*)\t') do fields[#fields + 1] = field end
+arg = { [0] = fields[2] }
+for i = 3, #fields do arg[i - 2] = fields[i] end
+dofile(fields[2])
+'''
+
+# interpreter -> (bootstrap argv or a callable returning it, flags accepted before the script path)
+INTERPRETERS = {
+    'python': (['-u', '-c', PYTHON_BOOTSTRAP], ['-u']),
+    'node': (['-e', NODE_BOOTSTRAP], []),
+    'lua': (['-e', LUA_BOOTSTRAP], []),
+    'java': (launcher_argv, [])
+}
+
+# Interpreters that cannot chdir (the JVM resolves relative paths against the
+# directory it started in): their workers start in a private scratch directory,
+# which is renamed to the run's workspace when the worker is taken
+NO_CHDIR = ('lua', 'java')
+
+
+class WarmWorker:
+    def __init__(self, interpreter, process, scratch_dir, spawn_time):
+        self.interpreter = interpreter
+        self.process = process
+        self.scratch_dir = scratch_dir
+        self.spawn_time = spawn_time
+        self.created_at = time.time()
+
+
+class WarmPool:
+    def __init__(self, popen_kwargs, sizes=WARM_POOL_SIZES, enabled=WARM_POOL_ENABLED,
+                 worker_kwargs=None):
+        """
+        popen_kwargs: arguments shared with cold runs (pipes, env, ...)
+        worker_kwargs: callable(language) -> extra Popen kwargs for workers
+        """
+        self.popen_kwargs = popen_kwargs
+        self.worker_kwargs = worker_kwargs
+        self.sizes = {
+            name: size for name, size in sizes.items()
+            if name in INTERPRETERS and size > 0 and toolchains.which(name)
+        }
+        self.enabled = enabled and bool(self.sizes)
+        self.idle = {name: [] for name in self.sizes}
+        self.retired_dirs = []  # (process, scratch_dir) awaiting cleanup
+        self.cond = threading.Condition()
+        self.stats_data = {
+            name: {
+                'warm_hits': 0,
+                'cold_misses': 0,
+                'spawned': 0,
+                'died_idle': 0,
+                'spawn_ms_total': 0.0,
+                'acquire_ms_total': 0.0
+            } for name in self.sizes
+        }
+
+        if self.enabled:
+            self.root = ensure_directory(WARM_POOL_DIR)
+            threading.Thread(target=self._refill_loop, name='noc-warm-pool', daemon=True).start()
+
+    def spawn(self, cmd, cwd, extra_kwargs=None):
+        """
+        Start cmd using a warm worker when possible, else a cold Popen
+        with extra_kwargs added
+        cwd must be the run's own workspace: a NO_CHDIR worker's scratch
+        directory takes its place
+        Returns: (process, warm)
+        """
+        started = time.perf_counter()
+        parsed = self._parse(cmd)
+        worker = self._take(parsed[0]) if parsed else None
+        if worker is not None and worker.scratch_dir and not self._move_into(worker, cwd):
+            self._discard(worker)
+            worker = None
+
+        if worker is None:
+            if parsed:
+                self._bump(parsed[0], 'cold_misses')
+            kwargs = dict(self.popen_kwargs, **(extra_kwargs or {}))
+            return subprocess.Popen(cmd, cwd=cwd, **kwargs), False
+
+        interpreter, script, argv = parsed
+        header = '\t'.join([cwd, script] + argv) + '\n'
+        worker.process.stdin.write(header.encode('utf-8'))
+        worker.process.stdin.flush()
+
+        with self.cond:
+            stats = self.stats_data[interpreter]
+            stats['warm_hits'] += 1
+            stats['acquire_ms_total'] += (time.perf_counter() - started) * 1000
+            if worker.scratch_dir:
+                self.retired_dirs.append((worker.process, worker.scratch_dir))
+            self.cond.notify()
+        return worker.process, True
+
+    def _parse(self, cmd):
+        """Split [interpreter, flags..., script, args...] if poolable"""
+        if not self.enabled or not cmd or cmd[0] not in self.sizes:
+            return None
+        _, allowed_flags = INTERPRETERS[cmd[0]]
+        rest = list(cmd[1:])
+        if any('\t' in part or '\n' in part for part in rest):
+            return None
+        if cmd[0] == 'java':
+            # [java, -cp, classpath, MainClass, args...]: the classpath stands in for the script
+            if len(rest) < 3 or rest[0] not in ('-cp', '-classpath') or rest[2].startswith('-'):
+                return None
+            classpath = os.pathsep.join(os.path.abspath(entry) for entry in rest[1].split(os.pathsep))
+            return cmd[0], classpath, rest[2:]
+        while rest and rest[0] in allowed_flags:
+            rest.pop(0)
+        if not rest or rest[0].startswith('-'):
+            return None
+        return cmd[0], os.path.abspath(rest[0]), rest[1:]
+
+    def _move_into(self, worker, workspace):
+        """
+        Make the worker's scratch directory (its working directory) the
+        workspace: the workspace's files move into it, then it is renamed
+        to the workspace's path, so relative paths resolve as in a cold run
+        Returns: False if the directories could not be swapped
+        """
+        aside = f'{workspace}.{uuid.uuid4().hex[:8]}'
+        try:
+            os.rename(workspace, aside)
+        except OSError:
+            return False
+        try:
+            os.rename(worker.scratch_dir, workspace)
+        except OSError as e:
+            print(f"Warm pool: cannot move {worker.interpreter} worker into {workspace}: {e}")
+            os.rename(aside, workspace)
+            return False
+        worker.scratch_dir = None  # now the workspace, removed with the run
+        for name in os.listdir(aside):
+            os.rename(os.path.join(aside, name), os.path.join(workspace, name))
+        os.rmdir(aside)
+        return True
+
+    def _take(self, interpreter):
+        with self.cond:
+            idle = self.idle[interpreter]
+            while idle:
+                worker = idle.pop(0)
+                if worker.process.poll() is None:
+                    return worker
+                self.stats_data[interpreter]['died_idle'] += 1
+                self._discard(worker)
+            self.cond.notify()
+            return None
+
+    def _spawn_worker(self, interpreter):
+        bootstrap, _ = INTERPRETERS[interpreter]
+        if callable(bootstrap):
+            bootstrap = bootstrap()
+            if bootstrap is None:
+                return None
+        scratch_dir = None
+        cwd = self.root
+        if interpreter in NO_CHDIR:
+            scratch_dir = cwd = ensure_directory(os.path.join(self.root, uuid.uuid4().hex[:12]))
+
+        kwargs = dict(self.popen_kwargs)
+        if self.worker_kwargs:
+            # Workers get the limits of the first language whose runs they start
+            kwargs.update(self.worker_kwargs(language_registry.for_interpreter(interpreter)))
+
+        started = time.perf_counter()
+        try:
+            process = subprocess.Popen([interpreter] + bootstrap, cwd=cwd, **kwargs)
+        except OSError as e:
+            print(f"Warm pool: cannot start {interpreter}: {e}")
+            if scratch_dir:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+            return None
+        spawn_ms = (time.perf_counter() - started) * 1000
+
+        with self.cond:
+            stats = self.stats_data[interpreter]
+            stats['spawned'] += 1
+            stats['spawn_ms_total'] += spawn_ms
+        return WarmWorker(interpreter, process, scratch_dir, spawn_ms)
+
+    def _discard(self, worker):
+        kill_process_tree(worker.process)
+        if worker.scratch_dir:
+            shutil.rmtree(worker.scratch_dir, ignore_errors=True)
+
+    def _refill_loop(self):
+        while True:
+            with self.cond:
+                self._collect_retired()
+                missing = [
+                    name for name, size in self.sizes.items()
+                    if len(self.idle[name]) < size
+                ]
+                if not missing:
+                    self.cond.wait(timeout=5)
+                    continue
+
+            for name in missing:
+                worker = self._spawn_worker(name)
+                if worker is None:
+                    with self.cond:
+                        self.sizes.pop(name, None)
+                    continue
+                with self.cond:
+                    self.idle[name].append(worker)
+
+    def _collect_retired(self):
+        """Remove scratch directories of workers whose run has exited"""
+        still_running = []
+        for process, scratch_dir in self.retired_dirs:
+            if process.poll() is None:
+                still_running.append((process, scratch_dir))
+            else:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+        self.retired_dirs = still_running
+
+    def _bump(self, interpreter, counter):
+        with self.cond:
+            self.stats_data[interpreter][counter] += 1
+
+    def shutdown(self):
+        with self.cond:
+            workers = [worker for idle in self.idle.values() for worker in idle]
+            for idle in self.idle.values():
+                idle.clear()
+            self.sizes = {}
+        for worker in workers:
+            self._discard(worker)
+
+    def stats(self):
+        """Hit rate and timing metrics per interpreter"""
+        with self.cond:
+            report = {}
+            for name, data in self.stats_data.items():
+                runs = data['warm_hits'] + data['cold_misses']
+                report[name] = {
+                    'isolation': 'process-per-run',
+                    'idle': len(self.idle.get(name, [])),
+                    'target_size': self.sizes.get(name, 0),
+                    'warm_hits': data['warm_hits'],
+                    'cold_misses': data['cold_misses'],
+                    'hit_rate': data['warm_hits'] / runs if runs else 0.0,
+                    'spawned': data['spawned'],
+                    'died_idle': data['died_idle'],
+                    'avg_spawn_ms': data['spawn_ms_total'] / data['spawned'] if data['spawned'] else 0.0,
+                    'avg_acquire_ms': data['acquire_ms_total'] / data['warm_hits'] if data['warm_hits'] else 0.0
+                }
+            return {'enabled': self.enabled, 'interpreters': report}